@@ -0,0 +1,554 @@
+import logging
+import queue
+import re
+import threading
+from config import STATEMENT_CACHE_SIZE, DATE_FORMAT
+
+# Matches a quoted string literal (left untouched) or an Oracle positional bind like :1
+POSITIONAL_BIND = re.compile(r"('(?:[^']|'')*')|:(\d+)")
+FETCH_FIRST = re.compile(r"\bFETCH\s+FIRST\s+(\S+)\s+ROWS\s+ONLY\b", re.IGNORECASE)
+# Matches a quoted string literal or anything up to the next one
+LITERAL_OR_TEXT = re.compile(r"('(?:[^']|'')*')|([^']+)")
+# Matches a quoted string literal, a named bind like :name or a numbered one like ?1
+BIND_OR_LITERAL = re.compile(r"('(?:[^']|'')*')|:([A-Za-z_]\w*)|\?(\d*)")
+TYPE_ARGS = re.compile(r"^\s*([A-Z0-9_ ]+?)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?\s*$")
+
+class OracleBackend:
+    """
+    Oracle through cx_Oracle; statements are already written in its dialect
+    """
+    name = 'oracle'
+    supports_pool = True
+
+    def __init__(self):
+        # Imported here so the SQLite backend runs without the Oracle client
+        import cx_Oracle
+        self.driver = cx_Oracle
+        self.Error = cx_Oracle.Error
+        self.DatabaseError = cx_Oracle.DatabaseError
+        # Cursor.prefetchrows arrived in cx_Oracle 8
+        self.supports_prefetch = hasattr(cx_Oracle.Cursor, 'prefetchrows')
+
+    def make_dsn(self, config):
+        return self.driver.makedsn(
+            host=config['host'],
+            port=int(config['port']),
+            sid=config['sid']
+        )
+
+    def connect(self, config):
+        connection = self.driver.connect(
+            user=config['username'],
+            password=config['password'],
+            dsn=self.make_dsn(config),
+            threaded=True
+        )
+        connection.stmtcachesize = STATEMENT_CACHE_SIZE
+        self.setup_session(connection)
+        return connection
+
+    def setup_session(self, connection, requested_tag=None):
+        """
+        Exchange DATE values as DATE_FORMAT text, so the application and
+        imports keep working with the strings the VARCHAR2 dates used to hold
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"ALTER SESSION SET NLS_DATE_FORMAT = '{DATE_FORMAT}'")
+        finally:
+            cursor.close()
+        connection.outputtypehandler = self.date_as_text
+
+    def date_as_text(self, cursor, name, default_type, size, precision, scale):
+        if default_type == self.driver.DATETIME:
+            return cursor.var(str, arraysize=cursor.arraysize)
+        return None
+
+    def create_pool(self, config, pool_config):
+        pool = self.driver.SessionPool(
+            user=config['username'],
+            password=config['password'],
+            dsn=self.make_dsn(config),
+            min=pool_config['min'],
+            max=pool_config['max'],
+            increment=pool_config['increment'],
+            threaded=True,
+            getmode=self.driver.SPOOL_ATTRVAL_WAIT,
+            # Runs once for every new session in the pool
+            sessionCallback=self.setup_session
+        )
+        # Applies to every session the pool creates
+        pool.stmtcachesize = STATEMENT_CACHE_SIZE
+        return pool
+
+    def interrupt(self, connection):
+        connection.cancel()
+
+    def execute_batch(self, cursor, query, rows):
+        """
+        Array-insert rows in one round trip; returns [(offset, message)] for rejected rows
+        """
+        cursor.executemany(query, rows, batcherrors=True)
+        return [(error.offset, error.message) for error in cursor.getbatcherrors()]
+
+    def translate(self, query):
+        return query
+
+    def configure_fetch(self, cursor, arraysize, prefetchrows):
+        """
+        Rows per fetch round trip, and rows returned with the execute itself;
+        must be set before the cursor executes
+        """
+        cursor.arraysize = arraysize
+        if self.supports_prefetch:
+            cursor.prefetchrows = prefetchrows
+
+    def round_trip_count(self, connection):
+        """
+        SQL*Net round trips of the session so far, or None without access to v$mystat
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+            SELECT s.value
+            FROM v$mystat s JOIN v$statname n ON n.statistic# = s.statistic#
+            WHERE n.name = 'SQL*Net roundtrips to/from client'
+            """)
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except self.DatabaseError as e:
+            logging.warning(f"Server round trip count unavailable: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def parse_counts(self, connection):
+        """
+        Server-side parse counters of the session, or None without access to v$mystat
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+            SELECT n.name, s.value
+            FROM v$mystat s JOIN v$statname n ON n.statistic# = s.statistic#
+            WHERE n.name IN ('parse count (total)', 'parse count (hard)', 'session cursor cache hits')
+            """)
+            return dict(cursor.fetchall())
+        except self.DatabaseError as e:
+            logging.warning(f"Server parse counts unavailable: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def translate_ddl(self, ddl):
+        return ddl
+
+    def drop_table_sql(self, table):
+        return f"DROP TABLE {table} CASCADE CONSTRAINTS"
+
+    def index_names(self, fetch):
+        return [row[0] for row in fetch("SELECT index_name FROM user_indexes")]
+
+    def read_table_stats(self, fetch, table_name=None):
+        """
+        Rows of (table, row count, average row length) from optimizer
+        statistics; both are None for tables never analyzed
+        """
+        query = "SELECT table_name, num_rows, avg_row_len FROM user_tables {where}".format(
+            where="WHERE table_name = :table_name" if table_name else ""
+        )
+        params = {'table_name': table_name} if table_name else None
+        return fetch(query, params)
+
+    def explain(self, connection, query):
+        """
+        Execution plan of query as text lines, from EXPLAIN PLAN and DBMS_XPLAN.
+        Bind variables need no values to be explained.
+        """
+        statement_id = f"DCMS_{threading.get_ident() % 1000000}"
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {query}")
+            cursor.execute(
+                "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :statement_id, 'TYPICAL'))",
+                {'statement_id': statement_id}
+            )
+            lines = [row[0] for row in cursor.fetchall()]
+            cursor.execute("DELETE FROM plan_table WHERE statement_id = :statement_id", {'statement_id': statement_id})
+            connection.commit()
+            return lines
+        finally:
+            cursor.close()
+
+    def migrate_date_column(self, connection, metadata, column):
+        """
+        Convert a VARCHAR2 date column to DATE in place. The converted column
+        is added at the end of the table, so the columns after it are cycled
+        through INVISIBLE to restore the original order, and the unique
+        constraints that included the old column are recreated.
+        Each DDL statement commits, so every value is checked before the
+        first one and a staging column left by a failed run is dropped.
+        """
+        table = metadata.name
+        staging = f"{column}_DT"
+        names = [name for name in metadata.column_names if name != staging]
+        statements = [
+            f"ALTER TABLE {table} ADD ({staging} DATE)",
+            f"UPDATE {table} SET {staging} = TO_DATE({column}, '{DATE_FORMAT}')",
+            f"ALTER TABLE {table} DROP COLUMN {column} CASCADE CONSTRAINTS",
+            f"ALTER TABLE {table} RENAME COLUMN {staging} TO {column}"
+        ]
+        if not metadata.column(column).nullable:
+            statements.append(f"ALTER TABLE {table} MODIFY ({column} NOT NULL)")
+        for later in names[names.index(column) + 1:]:
+            statements.append(f"ALTER TABLE {table} MODIFY ({later} INVISIBLE)")
+            statements.append(f"ALTER TABLE {table} MODIFY ({later} VISIBLE)")
+        for columns in metadata.unique_constraints:
+            if column in columns:
+                statements.append(f"ALTER TABLE {table} ADD UNIQUE ({', '.join(columns)})")
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE {column} IS NOT NULL "
+                f"AND VALIDATE_CONVERSION({column} AS DATE, '{DATE_FORMAT}') = 0"
+            )
+            invalid = cursor.fetchone()[0]
+            if invalid:
+                raise self.DatabaseError(f"{invalid} values in {table}.{column} are not {DATE_FORMAT} dates")
+            if metadata.column(staging):
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN {staging}")
+            for statement in statements:
+                cursor.execute(statement)
+            connection.commit()
+        finally:
+            cursor.close()
+
+    def read_columns(self, fetch, table_name=None):
+        """
+        Rows of (table, column, type, length, precision, scale, nullable)
+        """
+        query = """
+        SELECT table_name, column_name, data_type, data_length, data_precision, data_scale, nullable
+        FROM user_tab_columns
+        {where}
+        ORDER BY table_name, column_id
+        """.format(where="WHERE table_name = :table_name" if table_name else "")
+        params = {'table_name': table_name} if table_name else None
+        return [
+            (table, column, data_type, length, precision, scale, nullable == 'Y')
+            for table, column, data_type, length, precision, scale, nullable in fetch(query, params)
+        ]
+
+    def read_constraints(self, fetch, table_name=None):
+        """
+        Rows of (table, constraint, type P/R/U, column, referenced table, referenced column)
+        """
+        query = """
+        SELECT c.table_name, c.constraint_name, c.constraint_type, cc.column_name,
+               r.table_name, rc.column_name
+        FROM user_constraints c
+        JOIN user_cons_columns cc ON cc.constraint_name = c.constraint_name
+        LEFT JOIN user_constraints r ON r.constraint_name = c.r_constraint_name
+        LEFT JOIN user_cons_columns rc
+               ON rc.constraint_name = c.r_constraint_name AND rc.position = cc.position
+        WHERE c.constraint_type IN ('P', 'R', 'U') {filter}
+        ORDER BY c.table_name, c.constraint_name, cc.position
+        """.format(filter="AND c.table_name = :table_name" if table_name else "")
+        params = {'table_name': table_name} if table_name else None
+        return fetch(query, params)
+
+class SQLitePool:
+    """
+    Minimal pool of SQLite connections with the acquire/release/close
+    interface of cx_Oracle.SessionPool
+    """
+    def __init__(self, backend, config, max_size):
+        self.backend = backend
+        self.config = config
+        self.max_size = max_size
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.created < self.max_size:
+                self.created += 1
+                return self.backend.connect(self.config)
+        return self.idle.get()
+
+    def release(self, connection):
+        # Match SessionPool: uncommitted work does not survive a release
+        connection.rollback()
+        self.idle.put(connection)
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class SQLiteBackend:
+    """
+    Embedded SQLite engine in WAL mode, translating the Oracle dialect
+    used by the rest of the application
+    """
+    name = 'sqlite'
+    supports_pool = True
+
+    def __init__(self):
+        import sqlite3
+        self.driver = sqlite3
+        self.Error = sqlite3.Error
+        self.DatabaseError = sqlite3.DatabaseError
+
+    def database_path(self, config):
+        return config.get('path') or 'dental_clinic.db'
+
+    def connect(self, config):
+        path = self.database_path(config)
+        # Pooled connections are handed between worker threads, one at a time
+        connection = self.driver.connect(
+            path, check_same_thread=False, timeout=30,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        if path != ':memory:':
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    def create_pool(self, config, pool_config):
+        if self.database_path(config) == ':memory:':
+            # Every connection to :memory: would be a separate database
+            return None
+        return SQLitePool(self, config, pool_config['max'])
+
+    def interrupt(self, connection):
+        connection.interrupt()
+
+    def execute_batch(self, cursor, query, rows):
+        """
+        Insert rows with executemany; if any row fails, replay the batch
+        row by row so only the bad rows are rejected (SQLite has no batch errors)
+        """
+        cursor.execute("SAVEPOINT batch_insert")
+        try:
+            cursor.executemany(query, rows)
+            cursor.execute("RELEASE SAVEPOINT batch_insert")
+            return []
+        except self.DatabaseError:
+            cursor.execute("ROLLBACK TO SAVEPOINT batch_insert")
+
+        errors = []
+        for offset, row in enumerate(rows):
+            try:
+                cursor.execute(query, row)
+            except self.DatabaseError as e:
+                errors.append((offset, str(e)))
+        cursor.execute("RELEASE SAVEPOINT batch_insert")
+        return errors
+
+    def translate(self, query):
+        """
+        Rewrite Oracle positional binds (:1 -> ?1) and row limiting clauses
+        """
+        query = POSITIONAL_BIND.sub(
+            lambda match: match.group(1) or f"?{match.group(2)}",
+            query
+        )
+        return FETCH_FIRST.sub(r"LIMIT \1", query)
+
+    def translate_ddl(self, ddl):
+        """
+        Upper-case identifiers as Oracle does, so column names read back
+        identically on both engines. Oracle types are kept: SQLite's type
+        affinity rules map VARCHAR2 to TEXT and NUMBER to NUMERIC.
+        """
+        return LITERAL_OR_TEXT.sub(
+            lambda match: match.group(1) or match.group(2).upper(),
+            ddl
+        )
+
+    def drop_table_sql(self, table):
+        return f"DROP TABLE IF EXISTS {table}"
+
+    def index_names(self, fetch):
+        return [row[0] for row in fetch("SELECT name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_%'")]
+
+    def explain(self, connection, query):
+        """
+        EXPLAIN QUERY PLAN as an indented tree. Binds are given NULLs:
+        the plan does not depend on their values.
+        """
+        names, numbered = set(), 0
+        for match in BIND_OR_LITERAL.finditer(query):
+            if match.group(2):
+                names.add(match.group(2))
+            elif match.group(3) is not None:
+                numbered = max(numbered, int(match.group(3) or numbered + 1))
+        params = dict.fromkeys(names) if names else [None] * numbered
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+            depth = {0: -1}
+            lines = []
+            for node_id, parent, _, detail in cursor.fetchall():
+                depth[node_id] = depth.get(parent, -1) + 1
+                lines.append('  ' * depth[node_id] + detail)
+            return lines
+        finally:
+            cursor.close()
+
+    def migrate_date_column(self, connection, metadata, column):
+        """
+        Redeclare a column as DATE by rebuilding the table, the only way
+        SQLite can change a column type. ISO date strings are stored unchanged.
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND UPPER(name) = :name",
+                           {'name': metadata.name})
+            ddl = cursor.fetchone()[0]
+            staging = f"{metadata.name}_MIGRATE"
+            ddl = re.sub(rf"(\b{column}\s+)[A-Z0-9_]+(\s*\([^)]*\))?", r"\1DATE", ddl, count=1, flags=re.IGNORECASE)
+            ddl = re.sub(r"^\s*CREATE\s+TABLE\s+\S+", f"CREATE TABLE {staging}", ddl, count=1, flags=re.IGNORECASE)
+
+            # Foreign keys must be off while the referenced table is swapped
+            connection.commit()
+            cursor.execute("PRAGMA foreign_keys=OFF")
+            try:
+                cursor.execute("BEGIN")
+                cursor.execute(ddl)
+                cursor.execute(f"INSERT INTO {staging} SELECT * FROM {metadata.name}")
+                cursor.execute(f"DROP TABLE {metadata.name}")
+                cursor.execute(f"ALTER TABLE {staging} RENAME TO {metadata.name}")
+                violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+                if violations:
+                    raise self.DatabaseError(f"Migration of {metadata.name} breaks {len(violations)} foreign keys")
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                cursor.execute("PRAGMA foreign_keys=ON")
+        finally:
+            cursor.close()
+
+    def parse_counts(self, connection):
+        # SQLite compiles statements in-process; the client cache is the whole story
+        return None
+
+    def configure_fetch(self, cursor, arraysize, prefetchrows):
+        # In-process engine: there is no prefetch, arraysize only sizes fetchmany()
+        cursor.arraysize = arraysize
+
+    def round_trip_count(self, connection):
+        return None
+
+    def read_table_stats(self, fetch, table_name=None):
+        """
+        Row counts recorded by ANALYZE in sqlite_stat1 (the first number of each
+        stat is the table's row count); SQLite keeps no row lengths
+        """
+        if not fetch("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'"):
+            return []
+        rows = fetch("SELECT UPPER(tbl), MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 GROUP BY UPPER(tbl)")
+        return [
+            (table, row_count, None) for table, row_count in rows
+            if not table_name or table == table_name.upper()
+        ]
+
+    def table_names(self, fetch, table_name=None):
+        if table_name:
+            rows = fetch(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND UPPER(name) = :table_name",
+                {'table_name': table_name.upper()}
+            )
+        else:
+            rows = fetch("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        return [row[0] for row in rows]
+
+    def parse_type(self, declared):
+        """
+        Split a declared type such as NUMBER(10, 2) into (type, length, precision, scale)
+        """
+        match = TYPE_ARGS.match((declared or '').upper())
+        if not match:
+            return declared.upper(), None, None, None
+        data_type, first, second = match.group(1), match.group(2), match.group(3)
+        first = int(first) if first else None
+        second = int(second) if second else None
+        if 'CHAR' in data_type:
+            return data_type, first, None, None
+        return data_type, None, first, second
+
+    def read_columns(self, fetch, table_name=None):
+        rows = []
+        for table in self.table_names(fetch, table_name):
+            columns = fetch(
+                'SELECT name, type, "notnull" FROM pragma_table_info(:table_name) ORDER BY cid',
+                {'table_name': table}
+            )
+            for column, declared, not_null in columns:
+                data_type, length, precision, scale = self.parse_type(declared)
+                rows.append((table.upper(), column.upper(), data_type, length, precision, scale, not_null == 0))
+        return rows
+
+    def read_constraints(self, fetch, table_name=None):
+        rows = []
+        for table in self.table_names(fetch, table_name):
+            name = table.upper()
+            params = {'table_name': table}
+
+            primary_key = fetch(
+                "SELECT name FROM pragma_table_info(:table_name) WHERE pk > 0 ORDER BY pk",
+                params
+            )
+            for (column,) in primary_key:
+                rows.append((name, f"PK_{name}", 'P', column.upper(), None, None))
+
+            foreign_keys = fetch(
+                'SELECT id, "table", "from", "to" FROM pragma_foreign_key_list(:table_name) ORDER BY id, seq',
+                params
+            )
+            for key_id, ref_table, column, ref_column in foreign_keys:
+                rows.append((
+                    name, f"FK_{name}_{key_id}", 'R', column.upper(),
+                    ref_table.upper(), ref_column.upper() if ref_column else None
+                ))
+
+            unique_indexes = fetch(
+                "SELECT name FROM pragma_index_list(:table_name) WHERE origin = 'u' ORDER BY name",
+                params
+            )
+            for (index_name,) in unique_indexes:
+                columns = fetch(
+                    "SELECT name FROM pragma_index_info(:index_name) ORDER BY seqno",
+                    {'index_name': index_name}
+                )
+                for (column,) in columns:
+                    rows.append((name, index_name.upper(), 'U', column.upper(), None, None))
+        return rows
+
+BACKENDS = {
+    'oracle': OracleBackend,
+    'sqlite': SQLiteBackend
+}
+
+def get_backend(name=None):
+    """
+    Instantiate the storage backend configured by name (Oracle by default)
+    """
+    name = (name or 'oracle').lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend: {name}")
+    logging.info(f"Using {name} database backend")
+    return BACKENDS[name]()
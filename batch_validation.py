@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from collections import Counter
+from schema_catalog import NUMERIC_TYPES
+from utils import Validator
+from config import REFERENCE_KEY_LIMIT
+
+# CHECK constraints declared in config.TABLES, keyed by (table, column)
+CHECK_RULES = {
+    ('PATIENT', 'AGE'): (lambda value: 0 <= value <= 120, "must be between 0 and 120"),
+    ('PATIENT', 'GENDER'): (lambda value: value in ('Male', 'Female', 'Other', 'Unknown'),
+                            "must be Male, Female, Other or Unknown"),
+    ('TREATMENT_TYPE', 'BASEPRICE'): (lambda value: value >= 0, "must not be negative"),
+    ('TREATMENT', 'COST'): (lambda value: value >= 0, "must not be negative"),
+    ('BILLING', 'AMOUNT'): (lambda value: value >= 0, "must not be negative")
+}
+
+def to_number(text):
+    """
+    int or float for text, or None if it is not a number
+    """
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return None
+
+def to_numbers(texts):
+    """
+    Numbers for a column of stripped texts ('' gives None), and whether all converted
+    """
+    try:
+        # Usually a whole column of integers, converted in one pass
+        return list(map(int, texts)), True
+    except ValueError:
+        numbers = [to_number(text) if text else None for text in texts]
+        return numbers, all(number is not None for number, text in zip(numbers, texts) if text)
+
+class ReferenceKeys:
+    """
+    Primary keys of referenced tables, loaded once as sets of text so
+    foreign key values can be checked without a query per row. Tables with
+    more than REFERENCE_KEY_LIMIT rows are not cached; the database still
+    enforces their foreign keys.
+    """
+    def __init__(self, db_manager, limit=REFERENCE_KEY_LIMIT):
+        self.db_manager = db_manager
+        self.limit = limit
+        self.keys = {}
+        self.lock = threading.Lock()
+
+    def get(self, table, column):
+        """
+        Set of the keys in table.column as text, or None if the table is too large
+        """
+        name = (table.upper(), column.upper())
+        with self.lock:
+            if name in self.keys:
+                return self.keys[name]
+        started = time.perf_counter()
+        keys = set()
+        for row in self.db_manager.iterate(f"SELECT {column} FROM {table}", table=table):
+            keys.add(str(row[0]))
+            if len(keys) > self.limit:
+                logging.info(f"{table} has more than {self.limit} keys; its references are left to the database")
+                keys = None
+                break
+        with self.lock:
+            self.keys[name] = keys
+        if keys is not None:
+            logging.info(f"Loaded {len(keys)} {table} keys in {time.perf_counter() - started:.2f}s")
+        return keys
+
+    def record_saved(self, table, key):
+        with self.lock:
+            for (name, _), keys in self.keys.items():
+                if name == table.upper() and keys is not None:
+                    keys.add(str(key))
+
+    def record_deleted(self, table, key):
+        with self.lock:
+            for (name, _), keys in self.keys.items():
+                if name == table.upper() and keys is not None:
+                    keys.discard(str(key))
+
+    def invalidate(self, table=None):
+        with self.lock:
+            if table is None:
+                self.keys = {}
+            else:
+                self.keys = {name: keys for name, keys in self.keys.items() if name[0] != table.upper()}
+
+class ValidationResult:
+    """
+    A validated batch: the rows converted to their column types, and for
+    each row a bit mask of the rules it failed (0 for a valid row). Bit i
+    stands for messages[i].
+    """
+    def __init__(self, rows, masks, messages):
+        self.rows = rows
+        self.masks = masks
+        self.messages = messages
+
+    def valid_positions(self):
+        return [position for position, mask in enumerate(self.masks) if not mask]
+
+    def error(self, position):
+        """
+        Message of the first rule a row failed, or None
+        """
+        mask = self.masks[position]
+        if not mask:
+            return None
+        return self.messages[(mask & -mask).bit_length() - 1]
+
+    def errors(self, position):
+        mask = self.masks[position]
+        return [message for bit, message in enumerate(self.messages) if mask >> bit & 1]
+
+    def failure_counts(self):
+        """
+        {message: rows failing the rule}, most frequent first
+        """
+        counts = Counter()
+        for mask in self.masks:
+            while mask:
+                bit = mask & -mask
+                counts[self.messages[bit.bit_length() - 1]] += 1
+                mask ^= bit
+        return dict(counts.most_common())
+
+class BatchValidator:
+    """
+    Validates and converts incoming text rows for a table a column at a
+    time: field count, required values, numbers, lengths, CHECK rules,
+    email/phone/date formats and foreign keys (against ReferenceKeys).
+    Rules are numbered in column order (foreign keys last), and a row's
+    error is the first rule it failed.
+    """
+    def __init__(self, db_manager, metadata, columns, check_references=True):
+        self.metadata = metadata
+        self.columns = columns
+        self.messages = []
+        # Bit 0, so a row with the wrong field count reports that first
+        self.shape_bit = self.rule(f"Expected {len(columns)} fields")
+        self.rules = [self.column_rules(column) for column in columns]
+
+        # Single-column foreign keys among the incoming columns, with their key sets
+        self.references = {}
+        if check_references:
+            names = [column.name for column in columns]
+            for foreign_key in metadata.foreign_keys:
+                if len(foreign_key.columns) == 1 and foreign_key.columns[0] in names:
+                    keys = db_manager.reference_keys.get(foreign_key.ref_table, foreign_key.ref_columns[0])
+                    if keys is not None:
+                        index = names.index(foreign_key.columns[0])
+                        message = f"{foreign_key.columns[0]} does not exist in {foreign_key.ref_table}"
+                        self.references[index] = (keys, self.rule(message))
+
+    def rule(self, message):
+        self.messages.append(message)
+        return 1 << (len(self.messages) - 1)
+
+    def column_rules(self, column):
+        """
+        Bits of the rules that apply to one column, keyed by rule kind
+        """
+        rules = {}
+        if not column.nullable:
+            rules['required'] = self.rule(f"{column.name} is required")
+        if column.data_type in NUMERIC_TYPES:
+            rules['number'] = self.rule(f"{column.name} must be a number")
+        elif column.length:
+            rules['length'] = self.rule(f"{column.name} is longer than {column.length} characters")
+        check = CHECK_RULES.get((self.metadata.name, column.name))
+        if check:
+            rules['check'] = (check[0], self.rule(f"{column.name} {check[1]}"))
+        if column.name == 'EMAIL':
+            rules['format'] = (Validator.invalid_emails, self.rule(f"{column.name} is not a valid email address"))
+        elif column.name == 'CONTACT':
+            rules['format'] = (Validator.invalid_phones, self.rule(f"{column.name} is not a valid phone number"))
+        elif column.name.endswith('_DATE') or column.data_type == 'DATE':
+            rules['format'] = (Validator.invalid_dates, self.rule(f"{column.name} must be a YYYY-MM-DD date"))
+        return rules
+
+    def validate(self, raw_rows):
+        """
+        ValidationResult for a list of CSV rows (lists of text)
+        """
+        width = len(self.columns)
+        masks = [0] * len(raw_rows)
+        if set(map(len, raw_rows)) - {width}:
+            for position, raw in enumerate(raw_rows):
+                if len(raw) != width:
+                    masks[position] = self.shape_bit
+            # Misshapen rows are padded so the columns stay aligned; they are rejected anyway
+            raw_rows = [raw if len(raw) == width else (list(raw) + [''] * width)[:width] for raw in raw_rows]
+
+        # Each check first tests the whole column with a builtin (all, max, set
+        # difference) and only looks for the failing positions when there are some
+        columns = []
+        for index, (texts, column, rules) in enumerate(zip(zip(*raw_rows), self.columns, self.rules)):
+            texts = list(map(str.strip, texts))
+            values = [text or None for text in texts]
+            failed = []
+
+            if 'required' in rules and not all(texts):
+                failed.append(([i for i, text in enumerate(texts) if not text], rules['required']))
+            if 'number' in rules:
+                values, converted = to_numbers(texts)
+                if not converted:
+                    failed.append(([i for i, text in enumerate(texts) if text and values[i] is None], rules['number']))
+            elif 'length' in rules and texts and max(map(len, texts)) > column.length:
+                length = column.length
+                failed.append(([i for i, text in enumerate(texts) if len(text) > length], rules['length']))
+            if 'check' in rules:
+                check, bit = rules['check']
+                failed.append(([i for i, value in enumerate(values) if value is not None and not check(value)], bit))
+            if 'format' in rules:
+                invalid, bit = rules['format']
+                failed.append((invalid(values), bit))
+            if index in self.references:
+                keys, bit = self.references[index]
+                missing = set(map(str, values)) - keys
+                missing.discard('None')
+                if missing:
+                    failed.append(([i for i, value in enumerate(values) if value is not None and str(value) in missing], bit))
+
+            for positions, bit in failed:
+                for position in positions:
+                    masks[position] |= bit
+            columns.append(values)
+
+        rows = list(zip(*columns)) if columns else [() for _ in raw_rows]
+        return ValidationResult(rows, masks, self.messages)
@@ -0,0 +1,267 @@
+"""
+Benchmark suite for the database and table view hot paths.
+
+Runs against the embedded SQLite backend with generated data, at one or
+more scales (number of appointments), and writes machine-readable results:
+
+    python benchmark.py --sizes 1000,10000 --output results.json
+    python benchmark.py --sizes 1000,10000 --baseline results.json
+
+With --baseline, benchmarks whose median latency or peak memory grew by
+more than --tolerance are reported and the exit status is 1.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import config
+from database import DatabaseManager
+from table_view import PagedResult, KeyedResult
+from data_generator import DataGenerator
+from unit_of_work import UnitOfWork
+from utils import ReportGenerator
+
+DEFAULT_SIZES = [1000, 10000]
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+class BenchmarkRunner:
+    """
+    Times named operations and collects one result record per (benchmark, size)
+    """
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+
+    def measure(self, name, size, operation, iterations=None, rows=None):
+        """
+        Run operation `iterations` times for latencies, then once more under
+        tracemalloc for its peak memory. One-shot operations (iterations=1)
+        run only once, traced, so their timings include the tracing overhead.
+        """
+        iterations = iterations or self.repeat
+        latencies = []
+        if iterations > 1:
+            for _ in range(iterations):
+                started = time.perf_counter()
+                operation()
+                latencies.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if not latencies:
+            latencies.append(elapsed)
+
+        latencies.sort()
+        total = sum(latencies)
+        result = {
+            'benchmark': name,
+            'size': size,
+            'iterations': len(latencies),
+            'traced': iterations == 1,
+            'mean_ms': total / len(latencies) * 1000,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+            'stdev_ms': statistics.pstdev(latencies) * 1000,
+            'ops_per_sec': len(latencies) / total if total else 0.0,
+            'peak_kb': peak / 1024
+        }
+        if rows is not None:
+            # rows may be a callable, evaluated once the operation has run
+            rows = rows() if callable(rows) else rows
+            result['rows_per_sec'] = rows / result['mean_ms'] * 1000 if result['mean_ms'] else 0.0
+        self.results.append(result)
+        print(
+            f"{name:<24} {size:>9} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} "
+            f"{result['p99_ms']:>10.2f} {result['ops_per_sec']:>10.1f} {result['peak_kb']:>10.0f}"
+        )
+        return result
+
+def run_size(runner, size, workdir, seed):
+    """
+    Benchmark every data path against a fresh database of the given scale
+    """
+    path = os.path.join(workdir, f"benchmark_{size}.db")
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    config.DB_CONFIG.clear()
+    config.DB_CONFIG.update({'backend': 'sqlite', 'path': path})
+
+    db_manager = DatabaseManager()
+    try:
+        with db_manager.session():
+            runner.measure('create_tables', size, db_manager.create_tables, iterations=1)
+
+            generator = DataGenerator(size, seed)
+            inserted = {}
+            runner.measure('populate', size, lambda: inserted.update(generator.populate(db_manager)),
+                           iterations=1, rows=lambda: sum(inserted.values()))
+            db_manager.catalog.load_all()
+
+            def first_page():
+                result = PagedResult(db_manager, 'Appointment')
+                result.load_next_page()
+
+            def scroll_ten_pages():
+                result = PagedResult(db_manager, 'Appointment')
+                for _ in range(10):
+                    if not result.load_next_page() or not result.has_more:
+                        break
+
+            runner.measure('table_load_first_page', size, first_page)
+            runner.measure('table_load_10_pages', size, scroll_ten_pages, rows=10 * config.PAGE_SIZE)
+
+            # Quick search: the bind-variable LIKE fallback, then the trigram index
+            term = next(generator.rows('Patient'))[1].split()[0]
+            columns = db_manager.catalog.column_names('Patient')
+            like = " OR ".join([f"UPPER({col}) LIKE :term" for col in columns])
+
+            def search_sql():
+                result = PagedResult(db_manager, 'Patient', where=like, params={'term': f"%{term.upper()}%"})
+                result.load_next_page()
+
+            def search_indexed():
+                keys = db_manager.search.search('Patient', term)
+                result = KeyedResult(db_manager, 'Patient', 'PATIENTID', keys)
+                result.load_next_page()
+
+            runner.measure('search_sql', size, search_sql)
+            runner.measure('search_index_build', size, lambda: db_manager.search.build('Patient'), iterations=1)
+            runner.measure('search_indexed', size, search_indexed)
+
+            def advanced_search():
+                result = PagedResult(
+                    db_manager, 'Appointment',
+                    where="STAFFID LIKE :c1 AND APPOINTMENT_DATE LIKE :c2",
+                    params={'c1': '%S0000001%', 'c2': '%2020-02%'}
+                )
+                result.load_next_page()
+
+            runner.measure('advanced_search', size, advanced_search)
+
+            # One add, edit and delete committed through the GUI's UnitOfWork,
+            # so the batching, read-back and fan-out are timed with the writes
+            counter = iter(range(10 ** 9))
+            changes = UnitOfWork(db_manager)
+            patient = db_manager.catalog.require('Patient')
+
+            def crud_round_trip():
+                patient_id = f"Z{next(counter):08d}"
+                row = [patient_id, 'Benchmark Patient', 40, 'Other', f"bench-{patient_id}", f"{patient_id}@bench.test"]
+                changes.register_insert('Patient', patient.key_column, patient.column_names, row)
+                [(_, inserted_row)] = changes.flush()
+                old_values = dict(zip(patient.column_names, inserted_row))
+                changes.register_update(
+                    'Patient', patient.key_column, patient_id,
+                    patient.column_names, row[:2] + [41] + row[3:], old_values
+                )
+                [(_, updated_row)] = changes.flush()
+                changes.register_delete(
+                    'Patient', patient.key_column, patient_id, dict(zip(patient.column_names, updated_row))
+                )
+                changes.flush()
+
+            runner.measure('crud_round_trip', size, crud_round_trip)
+
+            def report_cold():
+                db_manager.summaries.invalidate()
+                ReportGenerator.generate_patient_report(db_manager)
+
+            runner.measure('report_rebuild', size, report_cold)
+            runner.measure('report_incremental', size, lambda: ReportGenerator.generate_patient_report(db_manager))
+
+            runner.measure('drop_tables', size, db_manager.drop_tables, iterations=1)
+    finally:
+        db_manager.close()
+
+def compare(results, baseline, tolerance):
+    """
+    Benchmarks slower (median) or bigger (peak memory) than the baseline by more than tolerance
+    """
+    previous = {(entry['benchmark'], entry['size']): entry for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry['benchmark'], entry['size']))
+        if not before:
+            continue
+        for metric in ('p50_ms', 'peak_kb'):
+            if before[metric] > 0 and entry[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{entry['benchmark']} @ {entry['size']}: {metric} "
+                    f"{before[metric]:.2f} -> {entry[metric]:.2f} (+{entry[metric] / before[metric] - 1:.0%})"
+                )
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Dental Clinic data paths on SQLite")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated numbers of appointments to generate")
+    parser.add_argument('--repeat', type=int, default=20, help="iterations per repeatable benchmark")
+    parser.add_argument('--seed', type=int, default=config.GENERATOR_SEED, help="data generator seed")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="compare against results saved by an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown before a benchmark counts as a regression (0.25 = 25%%)")
+    parser.add_argument('--workdir', help="directory for the benchmark databases (default: a temporary one)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s: %(message)s')
+
+    runner = BenchmarkRunner(args.repeat)
+    print(f"{'benchmark':<24} {'size':>9} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'peak KB':>10}")
+    with tempfile.TemporaryDirectory() as temporary:
+        for size in sizes:
+            run_size(runner, size, args.workdir or temporary, args.seed)
+
+    output = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'repeat': args.repeat,
+            'seed': args.seed
+        },
+        'results': runner.results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(output, output_file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(runner.results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
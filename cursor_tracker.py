@@ -0,0 +1,136 @@
+import logging
+import os
+import sys
+import threading
+import time
+from query_stats import InstrumentedCursor
+from config import CURSOR_ORIGINS, CURSOR_ORIGIN_DEPTH
+
+# Frames from these files are skipped when recording where a cursor was opened
+INTERNAL_FILES = {'database.py', 'cursor_tracker.py', 'contextlib.py'}
+
+def caller_origin(depth):
+    """
+    'file:line function' of the application frames that opened a cursor, innermost first
+    """
+    # Walks frames directly; traceback.extract_stack would also read the source lines
+    origin = []
+    frame = sys._getframe(1)
+    while frame is not None and len(origin) < depth:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename not in INTERNAL_FILES:
+            origin.append(f"{filename}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return origin
+
+class OpenCursor:
+    __slots__ = ('sql', 'opened', 'thread', 'origin')
+
+    def __init__(self, sql, origin):
+        self.sql = sql
+        self.opened = time.time()
+        self.thread = threading.current_thread().name
+        self.origin = origin
+
+    def describe(self):
+        where = ' <- '.join(self.origin) if self.origin else 'unknown origin'
+        return f"{' '.join(self.sql.split())[:120]} (opened {time.time() - self.opened:.0f}s ago on {self.thread}, at {where})"
+
+class CursorTracker:
+    """
+    Cursors handed out by DatabaseManager that have not been closed yet,
+    with the statement and call stack that opened each one. Cursors garbage
+    collected while still open are counted and logged as leaks.
+    """
+    def __init__(self, record_origins=CURSOR_ORIGINS, origin_depth=CURSOR_ORIGIN_DEPTH):
+        self.record_origins = record_origins
+        self.origin_depth = origin_depth
+        self.open = {}
+        self.opened = 0
+        self.closed = 0
+        self.leaked = 0
+        self.lock = threading.Lock()
+
+    def track(self, cursor_id, sql):
+        origin = caller_origin(self.origin_depth) if self.record_origins else None
+        with self.lock:
+            self.open[cursor_id] = OpenCursor(sql, origin)
+            self.opened += 1
+
+    def untrack(self, cursor_id, leaked=False):
+        with self.lock:
+            entry = self.open.pop(cursor_id, None)
+            if entry is None:
+                return
+            self.closed += 1
+            if leaked:
+                self.leaked += 1
+        if leaked:
+            logging.warning(f"Cursor was never closed: {entry.describe()}")
+
+    def stats(self):
+        with self.lock:
+            return {'open': len(self.open), 'opened': self.opened, 'closed': self.closed, 'leaked': self.leaked}
+
+    def open_cursors(self):
+        """
+        Descriptions of the cursors still open, oldest first
+        """
+        with self.lock:
+            entries = sorted(self.open.values(), key=lambda entry: entry.opened)
+        return [entry.describe() for entry in entries]
+
+    def report(self):
+        """
+        Log the cursor counters and every cursor still open
+        """
+        stats = self.stats()
+        logging.info(
+            f"Cursors: {stats['opened']} opened, {stats['closed']} closed, "
+            f"{stats['open']} open, {stats['leaked']} leaked"
+        )
+        for description in self.open_cursors():
+            logging.warning(f"Cursor still open: {description}")
+
+class ManagedCursor(InstrumentedCursor):
+    """
+    Instrumented cursor registered with a CursorTracker. Usable as a context
+    manager; close() is idempotent, and the row count of a statement stays
+    readable after the cursor is closed.
+    """
+    def __init__(self, cursor, stats, execution, tracker):
+        object.__setattr__(self, 'tracker', tracker)
+        object.__setattr__(self, 'closed', False)
+        object.__setattr__(self, 'final_rowcount', cursor.rowcount)
+        tracker.track(id(self), execution.sql)
+        super().__init__(cursor, stats, execution)
+
+    @property
+    def rowcount(self):
+        return self.final_rowcount if self.closed else self.cursor.rowcount
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+        return False
+
+    def close(self):
+        if self.closed:
+            return
+        object.__setattr__(self, 'final_rowcount', self.cursor.rowcount)
+        object.__setattr__(self, 'closed', True)
+        self.tracker.untrack(id(self))
+        super().close()
+
+    def __del__(self):
+        if self.closed:
+            return
+        try:
+            self.tracker.untrack(id(self), leaked=True)
+            self.stats.finish(self.execution)
+            self.cursor.close()
+        except Exception:
+            # The driver or connection may already be gone at interpreter exit
+            pass
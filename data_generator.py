@@ -0,0 +1,280 @@
+import logging
+import time
+from datetime import date, timedelta
+from query_executor import current_token, report_progress
+from config import SAMPLE_DATA, GENERATOR_SCALE, GENERATOR_SEED, IMPORT_BATCH_SIZE
+
+# Tables in foreign key dependency order
+POPULATION_ORDER = [
+    'Staff_Role', 'Dentist_Specialization', 'Appointment_Status',
+    'Treatment_Type', 'Billing_Status', 'Clinic', 'Staff',
+    'Dentist', 'Receptionist', 'Patient', 'Appointment',
+    'Treatment', 'Medical_Record', 'Billing'
+]
+
+FIRST_NAMES = ['Alice', 'Bob', 'Carla', 'David', 'Emily', 'Farid', 'Grace', 'Hiro', 'Isla', 'Jamal',
+               'Kira', 'Liam', 'Maya', 'Noah', 'Olivia', 'Priya', 'Quinn', 'Ravi', 'Sofia', 'Tomas']
+LAST_NAMES = ['Brown', 'Smith', 'Nguyen', 'Patel', 'Garcia', 'Kim', 'Wilson', 'Chen', 'Singh', 'Clark',
+              'Lopez', 'Martin', 'Ali', 'Walker', 'Young', 'King', 'Wright', 'Scott', 'Green', 'Baker']
+STREETS = ['Main St', 'River Rd', 'King St', 'Queen St', 'Bloor St', 'Yonge St', 'Dundas St', 'College St']
+SCHEDULES = ['Mon-Fri 9AM-5PM', 'Mon-Thu 8AM-4PM', 'Tue-Sat 10AM-6PM', 'Mon-Wed 9AM-1PM']
+GENDERS = ['Female', 'Male', 'Female', 'Male', 'Other', 'Unknown']
+HISTORIES = ['No significant medical history', 'Previous dental work', 'Diabetes', 'Hypertension', 'Allergic to penicillin']
+DIAGNOSES = ['Minor cavity detected', 'Tooth decay', 'Gum inflammation', 'Misaligned teeth', 'Cracked molar']
+PRESCRIPTIONS = ['Recommended oral hygiene', 'Prescribed antibiotics', 'Fluoride rinse', 'Pain relief as needed']
+
+# Hourly appointment slots from 9AM to 5PM
+SLOT_TIMES = ['09:00AM', '10:00AM', '11:00AM', '12:00PM', '01:00PM', '02:00PM', '03:00PM', '04:00PM']
+# Appointments per dentist, patients per appointment and so on
+APPOINTMENTS_PER_DENTIST = 5000
+APPOINTMENTS_PER_PATIENT = 4
+DENTISTS_PER_RECEPTIONIST = 4
+DENTISTS_PER_CLINIC = 10
+
+MASK = (1 << 64) - 1
+
+def mix(*values):
+    """
+    Deterministic 64-bit hash of integers (splitmix64 rounds). Every generated
+    value is a function of the seed and a row index, so related rows in other
+    tables can be recomputed instead of remembered.
+    """
+    h = 0x9E3779B97F4A7C15
+    for value in values:
+        h = ((h ^ value) * 0xBF58476D1CE4E5B9) & MASK
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & MASK
+        h ^= h >> 31
+    return h
+
+class DataGenerator:
+    """
+    Seeded synthetic data for all tables, sized by the number of appointments.
+    Rows are produced lazily in dependency order and are referentially
+    consistent; unique constraints hold because identifiers, contacts and
+    appointment slots are derived from row indexes.
+    """
+    def __init__(self, appointments=GENERATOR_SCALE, seed=GENERATOR_SEED):
+        self.appointments = max(1, appointments)
+        self.seed = seed
+        self.patients = max(3, self.appointments // APPOINTMENTS_PER_PATIENT)
+        self.dentists = max(2, self.appointments // APPOINTMENTS_PER_DENTIST)
+        self.receptionists = max(1, self.dentists // DENTISTS_PER_RECEPTIONIST)
+        self.clinics = max(1, self.dentists // DENTISTS_PER_CLINIC)
+        # Appointments are booked on business days from this Monday on
+        self.first_day = date(2020, 1, 6)
+
+        self.role_ids = {name: role_id for role_id, name in SAMPLE_DATA['Staff_Role']}
+        self.specializations = [row[0] for row in SAMPLE_DATA['Dentist_Specialization']]
+        self.appointment_statuses = {name: status_id for status_id, name in SAMPLE_DATA['Appointment_Status']}
+        self.billing_statuses = {name: status_id for status_id, name in SAMPLE_DATA['Billing_Status']}
+        self.treatment_types = SAMPLE_DATA['Treatment_Type']
+
+    def pick(self, choices, *values):
+        return choices[mix(self.seed, *values) % len(choices)]
+
+    def staff_id(self, index):
+        # Dentists come first, then receptionists
+        return f"S{index:07d}"
+
+    def patient_id(self, index):
+        return f"P{index:07d}"
+
+    def appointment_id(self, index):
+        return f"A{index:08d}"
+
+    def appointment_patient(self, index):
+        return mix(self.seed, 1, index) % self.patients
+
+    def appointment_dentist(self, index):
+        return index % self.dentists
+
+    def appointment_slot(self, index):
+        """
+        (date, time) of an appointment. Each dentist's appointments fill
+        consecutive slots, so no two share a dentist, date and time.
+        """
+        slot = index // self.dentists
+        day, time_index = divmod(slot, len(SLOT_TIMES))
+        weeks, weekday = divmod(day, 5)
+        booked = self.first_day + timedelta(days=weeks * 7 + weekday)
+        return booked.isoformat(), SLOT_TIMES[time_index]
+
+    def appointment_receptionist(self, index):
+        return self.dentists + mix(self.seed, 5, index) % self.receptionists
+
+    def treatments(self, index):
+        """
+        (number, treatment type row, cost) for each treatment of an appointment;
+        types are distinct within an appointment
+        """
+        count = (0, 1, 1, 1, 2)[mix(self.seed, 2, index) % 5]
+        types = len(self.treatment_types)
+        first = mix(self.seed, 3, index) % types
+        chosen = [first, (first + 1 + mix(self.seed, 4, index) % (types - 1)) % types][:count]
+        result = []
+        for number, type_index in enumerate(chosen):
+            treatment_type = self.treatment_types[type_index]
+            # Within 20% of the base price
+            factor = 80 + mix(self.seed, 6, index, number) % 41
+            result.append((number, treatment_type, round(treatment_type[2] * factor / 100, 2)))
+        return result
+
+    def rows(self, table):
+        """
+        Iterator over the rows of a table, in column order
+        """
+        generators = {
+            'Clinic': self.clinic_rows,
+            'Staff': self.staff_rows,
+            'Dentist': self.dentist_rows,
+            'Receptionist': self.receptionist_rows,
+            'Patient': self.patient_rows,
+            'Appointment': self.appointment_rows,
+            'Treatment': self.treatment_rows,
+            'Medical_Record': self.medical_record_rows,
+            'Billing': self.billing_rows
+        }
+        if table in generators:
+            return generators[table]()
+        return iter(SAMPLE_DATA.get(table, []))
+
+    def clinic_rows(self):
+        for index in range(self.clinics):
+            yield (
+                f"C{index:07d}",
+                f"{self.pick(LAST_NAMES, 10, index)} Dental Clinic {index + 1}",
+                f"416-{index:07d}",
+                f"{index + 1} {self.pick(STREETS, 11, index)}",
+                self.pick(['9am-5pm', '8am-6pm', '10am-7pm'], 12, index)
+            )
+
+    def staff_rows(self):
+        for index in range(self.dentists + self.receptionists):
+            is_dentist = index < self.dentists
+            name = f"{self.pick(FIRST_NAMES, 20, index)} {self.pick(LAST_NAMES, 21, index)}"
+            yield (
+                self.staff_id(index),
+                f"Dr. {name}" if is_dentist else name,
+                f"647-{index:07d}",
+                self.role_ids['Dentist' if is_dentist else 'Receptionist'],
+                f"C{index % self.clinics:07d}"
+            )
+
+    def dentist_rows(self):
+        for index in range(self.dentists):
+            yield (self.staff_id(index), self.pick(self.specializations, 30, index), self.pick(SCHEDULES, 31, index))
+
+    def receptionist_rows(self):
+        for index in range(self.dentists, self.dentists + self.receptionists):
+            yield (self.staff_id(index), self.pick(SCHEDULES, 40, index))
+
+    def patient_rows(self):
+        for index in range(self.patients):
+            yield (
+                self.patient_id(index),
+                f"{self.pick(FIRST_NAMES, 50, index)} {self.pick(LAST_NAMES, 51, index)}",
+                mix(self.seed, 52, index) % 91,
+                self.pick(GENDERS, 53, index),
+                f"905-{index:07d}",
+                f"patient{index}@example.com"
+            )
+
+    def appointment_rows(self):
+        statuses = [self.appointment_statuses[name] for name in
+                    ('Completed', 'Completed', 'Completed', 'Scheduled', 'Cancelled', 'Pending')]
+        for index in range(self.appointments):
+            appointment_date, appointment_time = self.appointment_slot(index)
+            yield (
+                self.appointment_id(index),
+                self.patient_id(self.appointment_patient(index)),
+                self.staff_id(self.appointment_dentist(index)),
+                appointment_date,
+                appointment_time,
+                self.pick(statuses, 60, index),
+                self.staff_id(self.appointment_receptionist(index))
+            )
+
+    def treatment_rows(self):
+        for index in range(self.appointments):
+            for number, treatment_type, cost in self.treatments(index):
+                yield (
+                    f"T{index:08d}{number}",
+                    self.appointment_id(index),
+                    self.patient_id(self.appointment_patient(index)),
+                    self.staff_id(self.appointment_dentist(index)),
+                    treatment_type[0],
+                    treatment_type[1],
+                    cost
+                )
+
+    def medical_record_rows(self):
+        # One record per treated appointment, for its first treatment
+        for index in range(self.appointments):
+            if not self.treatments(index):
+                continue
+            yield (
+                f"MR{index:08d}",
+                self.patient_id(self.appointment_patient(index)),
+                self.pick(HISTORIES, 70, index),
+                self.pick(DIAGNOSES, 71, index),
+                self.pick(PRESCRIPTIONS, 72, index),
+                f"T{index:08d}0",
+                self.appointment_id(index)
+            )
+
+    def billing_rows(self):
+        statuses = [self.billing_statuses[name] for name in
+                    ('Paid', 'Paid', 'Paid', 'Paid', 'Paid', 'Paid', 'Paid', 'Pending', 'Pending', 'Overdue')]
+        # One bill per treated appointment, for the sum of its treatments
+        for index in range(self.appointments):
+            treatments = self.treatments(index)
+            if not treatments:
+                continue
+            yield (
+                f"B{index:08d}",
+                self.appointment_id(index),
+                self.patient_id(self.appointment_patient(index)),
+                self.appointment_slot(index)[0],
+                round(sum(cost for _, _, cost in treatments), 2),
+                self.staff_id(self.appointment_receptionist(index)),
+                self.pick(statuses, 80, index)
+            )
+
+    def populate(self, db_manager, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Stream every table into the database in executemany batches, each
+        committed on its own; returns {table: rows inserted}
+        """
+        token = current_token()
+        started = time.perf_counter()
+        inserted = {}
+
+        for table in POPULATION_ORDER:
+            columns = db_manager.catalog.require(table).column_names
+            placeholders = ', '.join([f':{i+1}' for i in range(len(columns))])
+            query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+            count, rejected, batch = 0, 0, []
+            for row in self.rows(table):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    rejected += len(db_manager.execute_batch(query, batch))
+                    count += len(batch)
+                    batch = []
+                    report_progress(f"Populating {table}: {count} rows")
+                    if token:
+                        token.check()
+            if batch:
+                rejected += len(db_manager.execute_batch(query, batch))
+                count += len(batch)
+
+            inserted[table] = count - rejected
+            if rejected:
+                logging.warning(f"{rejected} generated rows rejected by {table}")
+            logging.info(f"Populated {table} with {count - rejected} records")
+
+        logging.info(
+            f"Generated {sum(inserted.values())} rows for {self.appointments} appointments "
+            f"(seed {self.seed}) in {time.perf_counter() - started:.1f}s"
+        )
+        return inserted
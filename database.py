@@ -1,135 +1,515 @@
-import cx_Oracle
-import logging
-from config import DB_CONFIG, TABLES, SAMPLE_DATA
-
-class DatabaseManager:
-    def __init__(self):
-        self.connection = None
-        self.setup_logging()
-        self.connect()
-
-    def setup_logging(self):
-        logging.basicConfig(
-            filename='dental_clinic.log', 
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s: %(message)s'
-        )
-
-    def connect(self):
-        try:
-            dsn = cx_Oracle.makedsn(
-                host=DB_CONFIG['host'],
-                port=DB_CONFIG['port'],
-                sid=DB_CONFIG['sid']
-            )
-            self.connection = cx_Oracle.connect(
-                user=DB_CONFIG['username'],
-                password=DB_CONFIG['password'],
-                dsn=dsn
-            )
-            logging.info("Database connection established")
-        except Exception as e:
-            logging.error(f"Database connection error: {e}")
-            raise
-
-    def execute_query(self, query, params=None):
-        try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor
-        except Exception as e:
-            logging.error(f"Query execution error: {e}")
-            return None
-
-    def create_tables(self):
-        try:
-            cursor = self.connection.cursor()
-            for query in TABLES:
-                try:
-                    cursor.execute(query)
-                    logging.info(f"Created table: {query.split()[2]}")
-                except cx_Oracle.DatabaseError as e:
-                    logging.error(f"Error creating table: {e}")
-            self.connection.commit()
-            return True
-        except Exception as e:
-            logging.error(f"Table creation failed: {e}")
-            return False
-
-    def drop_tables(self):
-        tables = [
-            "Billing", "Medical_Record", "Treatment", 
-            "Appointment", "Receptionist", "Dentist", 
-            "Patient", "Staff", "Clinic"
-        ]
-        
-        try:
-            cursor = self.connection.cursor()
-            for table in tables:
-                try:
-                    cursor.execute(f"DROP TABLE {table} CASCADE CONSTRAINTS")
-                    logging.info(f"Dropped table {table}")
-                except cx_Oracle.DatabaseError as e:
-                    logging.warning(f"Error dropping {table}: {e}")
-            
-            self.connection.commit()
-            return True
-        except Exception as e:
-            logging.error(f"Failed to drop tables: {e}")
-            return False
-
-    def populate_tables(self):
-        try:
-            cursor = self.connection.cursor()
-            
-            # Define the order of population to handle dependencies
-            population_order = [
-                'Staff_Role', 'Dentist_Specialization', 'Appointment_Status', 
-                'Treatment_Type', 'Billing_Status', 'Clinic', 'Staff', 
-                'Dentist', 'Receptionist', 'Patient', 'Appointment', 
-                'Treatment', 'Medical_Record', 'Billing'
-            ]
-            
-            for table in population_order:
-                try:
-                    # Dynamically get column names
-                    col_query = f"SELECT * FROM {table} WHERE 1=0"
-                    col_cursor = self.connection.cursor()
-                    col_cursor.execute(col_query)
-                    columns = [desc[0] for desc in col_cursor.description]
-                    col_cursor.close()
-                    
-                    # Prepare data for this table
-                    table_data = SAMPLE_DATA.get(table, [])
-                    
-                    if not table_data:
-                        logging.warning(f"No data found for table {table}")
-                        continue
-                    
-                    # Prepare insert query
-                    columns_str = ', '.join(columns)
-                    placeholders = ', '.join([f':{i+1}' for i in range(len(columns))])
-                    insert_query = f"INSERT INTO {table} ({columns_str}) VALUES ({placeholders})"
-                    
-                    # Execute batch insert
-                    cursor.executemany(insert_query, table_data)
-                    logging.info(f"Populated {table} with {len(table_data)} records")
-                    
-                except cx_Oracle.DatabaseError as e:
-                    logging.error(f"Error populating {table}: {e}")
-            
-            # Commit the transaction
-            self.connection.commit()
-            return True
-        
-        except Exception as e:
-            logging.error(f"Failed to populate tables: {e}")
-            return False
-
-    def close(self):
-        if self.connection:
-            self.connection.close()
-            logging.info("Database connection closed")
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from query_executor import current_token, current_action
+from query_stats import QueryStats, Execution
+from cursor_tracker import CursorTracker, ManagedCursor
+from fetch_tuning import FetchTuner
+from schema_catalog import SchemaCatalog
+from search_index import SearchEngine
+from patient_summary import PatientSummaryStore
+from revenue_analytics import RevenueAnalytics
+from schedule_index import ScheduleIndex
+from batch_validation import ReferenceKeys
+from physical_design import PhysicalDesign
+from statement_cache import StatementCache
+from backends import get_backend
+from log_pipeline import setup_logging
+from data_generator import DataGenerator
+from config import DB_CONFIG, DB_POOL, DB_CONNECT_TIMEOUT, TABLES, PAGE_SIZE, STATEMENT_CACHE_SIZE, GENERATOR_SCALE
+
+class DatabaseManager:
+    def __init__(self, connect=True):
+        self.connection = None
+        # False when the shared connection was handed in rather than taken from the pool
+        self.pooled_connection = True
+        # Set once connect() has finished, whether or not it succeeded
+        self.ready = threading.Event()
+        self.pool = None
+        self.backend = None
+        self.statements = None
+        # Timing, row counts and callers of every statement
+        self.query_stats = QueryStats()
+        # Cursors not closed yet, and where they were opened
+        self.cursors = CursorTracker()
+        # Session acquired by the current thread, see session()
+        self.local = threading.local()
+        # Table metadata, read from the data dictionary on first use
+        self.catalog = SchemaCatalog(self)
+        # Per-query fetch sizes, learning from the rows each statement returns
+        self.fetch_tuner = FetchTuner(self.catalog)
+        self.query_stats.listeners.append(self.fetch_tuner.observe)
+        # Quick-search indexes, built on first search of a table
+        self.search = SearchEngine(self)
+        # Per-patient report totals, maintained by record_saved/record_deleted
+        self.summaries = PatientSummaryStore(self)
+        # Billing and treatment arrays behind the Revenue tab, extended as rows are inserted
+        self.analytics = RevenueAnalytics(self)
+        # Dentist hours and booked appointment slots, for finding free slots
+        self.schedule = ScheduleIndex(self)
+        # Key sets of referenced tables, for checking foreign keys of imported rows
+        self.reference_keys = ReferenceKeys(self)
+        # Indexes, date column migrations and query plans
+        self.design = PhysicalDesign(self)
+        self.setup_logging()
+        # With connect=False the caller connects later, e.g. from a background job
+        if connect:
+            self.connect()
+
+    def setup_logging(self):
+        # Like basicConfig, only when nothing else (main, a script) has configured logging
+        if not logging.getLogger().handlers:
+            setup_logging()
+
+    def connect(self, connection=None):
+        """
+        Open the pool and the shared connection. A connection already opened
+        with DB_CONFIG (the login dialog's test connection) becomes the
+        shared connection instead of logging in again.
+        """
+        try:
+            # Oracle unless DB_CONFIG names another engine
+            self.backend = get_backend(DB_CONFIG.get('backend'))
+            self.statements = StatementCache(self.backend, STATEMENT_CACHE_SIZE)
+            if DB_POOL.get('enabled') and self.backend.supports_pool:
+                self.pool = self.backend.create_pool(DB_CONFIG, DB_POOL)
+
+            if self.pool:
+                # Shared session for work done outside session()
+                self.pooled_connection = connection is None
+                self.connection = connection or self.pool.acquire()
+                logging.info(f"Database session pool established ({DB_POOL['min']}-{DB_POOL['max']} sessions)")
+            else:
+                self.connection = connection or self.backend.connect(DB_CONFIG)
+                logging.info("Database connection established")
+        except Exception as e:
+            logging.error(f"Database connection error: {e}")
+            raise
+        finally:
+            self.ready.set()
+
+    def wait_until_connected(self):
+        """
+        Block until a connect() in progress on another thread has finished
+        """
+        if not self.ready.wait(DB_CONNECT_TIMEOUT):
+            raise RuntimeError("Timed out waiting for the database connection")
+        if self.connection is None:
+            raise RuntimeError("Not connected to the database")
+
+    def acquire(self):
+        """
+        Take a session from the pool (the shared connection when not pooled)
+        """
+        self.wait_until_connected()
+        if self.pool:
+            return self.pool.acquire()
+        return self.connection
+
+    def release(self, connection):
+        """
+        Return a session obtained from acquire()
+        """
+        if self.pool and connection is not self.connection:
+            self.pool.release(connection)
+
+    @contextmanager
+    def session(self):
+        """
+        Give the current thread its own session for the enclosed work.
+        Uncommitted changes are rolled back when the session is released.
+        """
+        if getattr(self.local, 'connection', None) is not None:
+            # Nested use keeps the outer session
+            yield self.local.connection
+            return
+
+        connection = self.acquire()
+        self.local.connection = connection
+        try:
+            yield connection
+        finally:
+            self.local.connection = None
+            self.release(connection)
+
+    def run_in_session(self, func, *args, **kwargs):
+        """
+        Call func inside session(); used to wrap background jobs
+        """
+        with self.session():
+            return func(*args, **kwargs)
+
+    def get_connection(self):
+        """
+        The session bound to this thread, or the shared connection
+        """
+        return getattr(self.local, 'connection', None) or self.connection
+
+    def commit(self):
+        self.get_connection().commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Commit the writes made in the enclosed block together on the current
+        session, or roll all of them back if it raises
+        """
+        connection = self.get_connection()
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            try:
+                connection.rollback()
+            except Exception as e:
+                logging.error(f"Rollback failed: {e}")
+            raise
+
+    def execute_write(self, query, params=None):
+        """
+        Execute a DML statement and commit it on the current session.
+        Returns the closed cursor (its rowcount stays readable), or None on failure.
+        """
+        cursor = self.execute_query(query, params)
+        if cursor:
+            cursor.close()
+            self.commit()
+        return cursor
+
+    def execute_query(self, query, params=None, expected_rows=None, table=None):
+        """
+        execute() that logs a failure and returns None instead of raising.
+        The caller must close the cursor.
+        """
+        try:
+            return self.execute(query, params, expected_rows, table)
+        except Exception as e:
+            logging.error(f"Query execution error: {e}")
+            return None
+
+    def fetch_one(self, query, params=None):
+        """
+        First row of a query, or None if it returned no rows
+        """
+        with self.execute(query, params, expected_rows=1) as cursor:
+            return cursor.fetchone()
+
+    def fetch_many(self, query, params=None, size=None):
+        """
+        All rows of a query, or only the first size rows
+        """
+        with self.execute(query, params, expected_rows=size) as cursor:
+            if size is None:
+                return cursor.fetchall()
+            return cursor.fetchmany(size)
+
+    def iterate(self, query, params=None, table=None):
+        """
+        Stream the rows of a query, fetched with the tuned arraysize. The
+        cursor is closed once the rows run out or the generator is closed.
+        """
+        with self.execute(query, params, table=table) as cursor:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    return
+                yield from rows
+
+    def execute(self, query, params=None, expected_rows=None, table=None):
+        """
+        Execute a statement on the current session and return a ManagedCursor.
+        Use it as a context manager, or close it, once its rows are read;
+        cursors left open are reported by self.cursors. Raises on failure.
+        expected_rows and table (whose metadata gives the row width) guide
+        the fetch sizes chosen by self.fetch_tuner.
+        """
+        connection = self.get_connection()
+        query = self.statements.prepare(query)
+        self.statements.record(connection, query)
+        # Let a superseding background job interrupt this call on the server,
+        # but only on a pooled session of its own: the shared connection may
+        # be running another job's statement when the interrupt lands
+        token = current_token() if connection is not self.connection else None
+        cancel = lambda: self.backend.interrupt(connection)
+        if token:
+            token.add_callback(cancel)
+        execution = Execution(query, params, current_action())
+        execution.arraysize, execution.prefetchrows = self.fetch_tuner.choose(query, expected_rows, table)
+        started = time.perf_counter()
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            self.backend.configure_fetch(cursor, execution.arraysize, execution.prefetchrows)
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            execution.elapsed = time.perf_counter() - started
+            # Fetches through the returned cursor are timed and counted too
+            return ManagedCursor(cursor, self.query_stats, execution, self.cursors)
+        except Exception:
+            execution.elapsed = time.perf_counter() - started
+            self.query_stats.finish(execution, error=True)
+            if cursor is not None:
+                cursor.close()
+            raise
+        finally:
+            if token:
+                token.remove_callback(cancel)
+
+    def execute_batch(self, query, rows):
+        """
+        Insert a batch of rows in one round trip and commit it.
+        Returns [(offset, message)] for the rows the database rejected.
+        """
+        connection = self.get_connection()
+        query = self.statements.prepare(query)
+        self.statements.record(connection, query)
+        cursor = connection.cursor()
+        execution = Execution(query, rows[0] if rows else None, current_action())
+        started = time.perf_counter()
+        errors = None
+        try:
+            errors = self.backend.execute_batch(cursor, query, rows)
+            connection.commit()
+            return errors
+        finally:
+            cursor.close()
+            execution.elapsed = time.perf_counter() - started
+            execution.rows = len(rows) - len(errors) if errors is not None else 0
+            self.query_stats.finish(execution, error=errors is None)
+
+    def execute_many(self, query, rows):
+        """
+        Execute a DML statement once per row of binds in one round trip,
+        without committing. Returns the number of rows affected (-1 if the
+        driver cannot tell). Raises on failure.
+        """
+        connection = self.get_connection()
+        query = self.statements.prepare(query)
+        self.statements.record(connection, query)
+        cursor = connection.cursor()
+        execution = Execution(query, rows[0] if rows else None, current_action())
+        started = time.perf_counter()
+        failed = True
+        try:
+            cursor.executemany(query, rows)
+            execution.rows = max(cursor.rowcount, 0)
+            failed = False
+            return cursor.rowcount
+        finally:
+            cursor.close()
+            execution.elapsed = time.perf_counter() - started
+            self.query_stats.finish(execution, error=failed)
+
+    def record_saved(self, table, values, old_values=None):
+        """
+        Bring the in-memory search indexes and summaries up to date after a
+        row was inserted or updated; values map column names to the stored values
+        """
+        values = {col.upper(): value for col, value in values.items()}
+        if old_values:
+            old_values = {col.upper(): value for col, value in old_values.items()}
+        self.search.record_saved(table, values, old_values)
+        self.summaries.record_saved(table, values, old_values)
+        self.analytics.record_saved(table, values, old_values)
+        self.schedule.record_saved(table, values, old_values)
+        metadata = self.catalog.get(table)
+        if metadata:
+            if old_values and old_values.get(metadata.key_column) != values.get(metadata.key_column):
+                self.reference_keys.record_deleted(table, old_values.get(metadata.key_column))
+            self.reference_keys.record_saved(table, values.get(metadata.key_column))
+
+    def record_deleted(self, table, values):
+        """
+        Counterpart of record_saved for a deleted row, given as it was loaded
+        """
+        values = {col.upper(): value for col, value in values.items()}
+        metadata = self.catalog.get(table)
+        if metadata:
+            self.search.record_deleted(table, values.get(metadata.key_column))
+            # Keys of rows removed by ON DELETE CASCADE stay cached; the insert still rejects them
+            self.reference_keys.record_deleted(table, values.get(metadata.key_column))
+        self.summaries.record_deleted(table, values)
+        self.analytics.record_deleted(table, values)
+        self.schedule.record_deleted(table, values)
+
+    def fetch_by_keys(self, table, key_column, keys):
+        """
+        Fetch the rows with the given primary keys, in the order of keys.
+        Returns (columns, rows) or None if the query failed.
+        """
+        if not keys:
+            return self.catalog.column_names(table), []
+
+        # Pad the IN list to a whole number of pages by repeating the last key,
+        # so chunks of any length share one statement text
+        padded = list(keys) + [keys[-1]] * (-len(keys) % PAGE_SIZE)
+        binds = {f"k{i+1}": key for i, key in enumerate(padded)}
+        placeholders = ', '.join(f":{name}" for name in binds)
+        cursor = self.execute_query(
+            f"SELECT * FROM {table} WHERE {key_column} IN ({placeholders})", binds,
+            expected_rows=len(keys), table=table
+        )
+        if not cursor:
+            return None
+        try:
+            columns = [desc[0] for desc in cursor.description]
+            key_index = columns.index(key_column)
+            # Compared as text: keys typed in the GUI arrive as strings
+            rows_by_key = {str(row[key_index]): row for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+        return columns, [rows_by_key[str(key)] for key in keys if str(key) in rows_by_key]
+
+    def build_select(self, table, key_column=None, where=None):
+        """
+        SELECT for a table or a filtered view of it, ordered by the key column
+        """
+        query = f"SELECT * FROM {table}"
+        if where:
+            query += f" WHERE {where}"
+        # Without a known key column, order by the first column (the primary key by convention)
+        return query + f" ORDER BY {key_column or 1}"
+
+    def fetch_page(self, table, key_column=None, after_key=None, where=None, params=None, page_size=PAGE_SIZE):
+        """
+        Fetch one page of rows ordered by the key column (keyset pagination).
+        Returns (columns, rows) or None if the query failed.
+        """
+        binds = dict(params or {})
+        if key_column and after_key is not None:
+            where = f"({where}) AND {key_column} > :after_key" if where else f"{key_column} > :after_key"
+            binds['after_key'] = after_key
+
+        query = self.build_select(table, key_column, where) + " FETCH FIRST :page_size ROWS ONLY"
+        binds['page_size'] = page_size
+
+        cursor = self.execute_query(query, binds, expected_rows=page_size, table=table)
+        if not cursor:
+            return None
+        try:
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        return columns, rows
+
+    def create_tables(self):
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            try:
+                for query in TABLES:
+                    try:
+                        cursor.execute(self.backend.translate_ddl(query))
+                        logging.info(f"Created table: {query.split()[2]}")
+                    except self.backend.DatabaseError as e:
+                        logging.error(f"Error creating table: {e}")
+            finally:
+                cursor.close()
+            connection.commit()
+            self.catalog.invalidate()
+            self.search.invalidate()
+            self.summaries.invalidate()
+            self.analytics.invalidate()
+            self.schedule.invalidate()
+            self.reference_keys.invalidate()
+            self.design.create_indexes()
+            return True
+        except Exception as e:
+            logging.error(f"Table creation failed: {e}")
+            return False
+
+    def drop_tables(self):
+        tables = [
+            "Billing", "Medical_Record", "Treatment", 
+            "Appointment", "Receptionist", "Dentist", 
+            "Patient", "Staff", "Clinic"
+        ]
+        
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            try:
+                for table in tables:
+                    try:
+                        cursor.execute(self.backend.drop_table_sql(table))
+                        logging.info(f"Dropped table {table}")
+                    except self.backend.DatabaseError as e:
+                        logging.warning(f"Error dropping {table}: {e}")
+            finally:
+                cursor.close()
+            
+            connection.commit()
+            self.catalog.invalidate()
+            self.search.invalidate()
+            self.summaries.invalidate()
+            self.analytics.invalidate()
+            self.schedule.invalidate()
+            self.reference_keys.invalidate()
+            return True
+        except Exception as e:
+            logging.error(f"Failed to drop tables: {e}")
+            return False
+
+    def populate_tables(self, appointments=GENERATOR_SCALE, seed=None):
+        """
+        Fill every table with generated data sized by the number of appointments
+        """
+        try:
+            generator = DataGenerator(appointments) if seed is None else DataGenerator(appointments, seed)
+            generator.populate(self)
+            self.search.invalidate()
+            self.summaries.invalidate()
+            self.analytics.invalidate()
+            self.schedule.invalidate()
+            self.reference_keys.invalidate()
+            return True
+        except Exception as e:
+            logging.error(f"Failed to populate tables: {e}")
+            return False
+
+    def parse_stats(self):
+        """
+        Client statement cache counters, plus the server's view of this
+        session's parses where the backend exposes them
+        """
+        stats = self.statements.stats()
+        server = self.backend.parse_counts(self.get_connection())
+        if server:
+            stats['server'] = server
+        return stats
+
+    def fetch_stats(self):
+        """
+        Round trips of the tuned fetch sizes against the driver defaults, plus
+        the server's count for this session where the backend exposes it
+        """
+        stats = self.fetch_tuner.stats()
+        server = self.backend.round_trip_count(self.get_connection())
+        if server is not None:
+            stats['server_round_trips'] = server
+        return stats
+
+    def close(self):
+        if self.statements:
+            self.statements.log_stats()
+        stats = self.fetch_tuner.stats()
+        logging.info(
+            f"Fetch tuning: {stats['queries']} queries in {stats['round_trips']} round trips "
+            f"({stats['default_round_trips']} with the default fetch sizes)"
+        )
+        self.cursors.report()
+        if self.pool:
+            if self.connection:
+                if self.pooled_connection:
+                    self.pool.release(self.connection)
+                else:
+                    self.connection.close()
+            self.pool.close()
+            logging.info("Database session pool closed")
+        elif self.connection:
+            self.connection.close()
+            logging.info("Database connection closed")
@@ -0,0 +1,109 @@
+import csv
+import gzip
+import json
+import logging
+import time
+from query_executor import current_token, report_progress
+from utils import ReportGenerator
+from patient_summary import PatientSummaryStore
+from config import EXPORT_ARRAYSIZE
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+class ResultExporter:
+    """
+    Streams query results to CSV or JSON lines with fetchmany, so memory use
+    stays at one batch of rows however large the result is.
+    A .gz suffix on the output path compresses the file.
+    """
+    def __init__(self, db_manager, arraysize=EXPORT_ARRAYSIZE):
+        self.db_manager = db_manager
+        self.arraysize = arraysize
+
+    def export_table(self, table, path):
+        metadata = self.db_manager.catalog.get(table)
+        key_column = metadata.key_column if metadata else None
+        return self.export_query(self.db_manager.build_select(table, key_column), None, path)
+
+    def export_result(self, result, path, rows=None):
+        """
+        Export every row of a paged table view or search, not just the loaded
+        pages. Given rows (the loaded rows in their displayed order), those are
+        written as they are without querying again.
+        """
+        if rows is not None:
+            return self.export_rows(result.columns, rows, path)
+        query = self.db_manager.build_select(result.table_name, result.key_column, result.where)
+        return self.export_query(query, result.params, path)
+
+    def export_patient_report(self, path):
+        rows = ReportGenerator.generate_patient_report(self.db_manager)
+        return self.export_rows(PatientSummaryStore.REPORT_COLUMNS, rows, path)
+
+    def export_rows(self, columns, rows, path):
+        """
+        Write rows already in memory to path, a batch at a time
+        """
+        batches = (rows[i:i + self.arraysize] for i in range(0, len(rows), self.arraysize))
+        return self.write_batches(columns, batches, path)
+
+    def export_query(self, query, params, path):
+        """
+        Write all rows of a query to path; returns the number of rows written
+        """
+        with self.db_manager.execute(query, params) as cursor:
+            cursor.arraysize = self.arraysize
+            columns = [desc[0] for desc in cursor.description]
+            batches = iter(lambda: cursor.fetchmany(self.arraysize), [])
+            return self.write_batches(columns, batches, path)
+
+    def write_batches(self, columns, batches, path):
+        """
+        Write batches of rows to path; returns the number of rows written
+        """
+        export_format = self.detect_format(path)
+        started = time.perf_counter()
+        token = current_token()
+
+        rows_written = 0
+        with self.open_output(path) as output:
+            write_rows = self.csv_writer(output, columns) if export_format == 'csv' \
+                else self.jsonl_writer(output, columns)
+            for rows in batches:
+                write_rows(rows)
+                rows_written += len(rows)
+                report_progress(f"Exporting: {rows_written} rows")
+                if token:
+                    token.check()
+
+        logging.info(f"Exported {rows_written} rows to {path} in {time.perf_counter() - started:.1f}s")
+        return rows_written
+
+    def detect_format(self, path):
+        name = path.lower()
+        if name.endswith('.gz'):
+            name = name[:-3]
+        for export_format in EXPORT_FORMATS:
+            if name.endswith(f'.{export_format}'):
+                return export_format
+        if name.endswith('.json'):
+            return 'jsonl'
+        raise ValueError(f"Unsupported export format: {path} (use .csv or .jsonl, optionally .gz)")
+
+    def open_output(self, path):
+        if path.lower().endswith('.gz'):
+            return gzip.open(path, 'wt', newline='', encoding='utf-8')
+        return open(path, 'w', newline='', encoding='utf-8')
+
+    def csv_writer(self, output, columns):
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        return writer.writerows
+
+    def jsonl_writer(self, output, columns):
+        def write_rows(rows):
+            output.write(''.join(
+                json.dumps(dict(zip(columns, row)), default=str) + '\n'
+                for row in rows
+            ))
+        return write_rows
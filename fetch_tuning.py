@@ -0,0 +1,96 @@
+import threading
+from query_stats import round_trips
+from config import FETCH_BUFFER_BYTES, FETCH_MAX_ARRAYSIZE
+
+# cx_Oracle's defaults, used while nothing is known about a query and as
+# the baseline the round trips saved are measured against
+DEFAULT_ARRAYSIZE = 100
+DEFAULT_PREFETCHROWS = 2
+# Bytes assumed per value when the catalog has no better figure
+DEFAULT_COLUMN_WIDTH = 22
+DEFAULT_ROW_WIDTH = 200
+TYPE_WIDTHS = {'NUMBER': 22, 'INTEGER': 22, 'FLOAT': 22, 'DATE': 7, 'TIMESTAMP': 11}
+# Distinct statements whose observed row counts are remembered
+HISTORY_SIZE = 2000
+
+def row_width(metadata):
+    """
+    Estimated bytes per fetched row of a table: the average row length from
+    optimizer statistics, or the sum of the declared column widths
+    """
+    if metadata is None:
+        return DEFAULT_ROW_WIDTH
+    if metadata.avg_row_len:
+        return metadata.avg_row_len
+    return sum(col.length or TYPE_WIDTHS.get(col.data_type, DEFAULT_COLUMN_WIDTH) for col in metadata.columns) or DEFAULT_ROW_WIDTH
+
+class FetchTuner:
+    """
+    Picks arraysize and prefetchrows for each query before it executes.
+
+    The expected row count is the caller's hint (a page size, a number of
+    keys), else the row count last observed for the same statement, else
+    the table's row count from optimizer statistics. A result expected to fit
+    in one fetch is prefetched whole, plus one row so the end of the result
+    arrives with the execute; larger results use the biggest arraysize whose
+    buffer (arraysize x row width) stays within FETCH_BUFFER_BYTES.
+    """
+    def __init__(self, catalog, buffer_bytes=FETCH_BUFFER_BYTES, max_arraysize=FETCH_MAX_ARRAYSIZE):
+        self.catalog = catalog
+        self.buffer_bytes = buffer_bytes
+        self.max_arraysize = max_arraysize
+        # Observed rows per SQL text, biased toward the larger recent results
+        self.history = {}
+        self.executions = 0
+        self.round_trips = 0
+        self.default_round_trips = 0
+        self.lock = threading.Lock()
+
+    def choose(self, sql, expected_rows=None, table=None):
+        """
+        (arraysize, prefetchrows) for sql
+        """
+        metadata = self.catalog.cached(table) if table else None
+        if expected_rows is None:
+            expected_rows = self.history.get(sql)
+        if expected_rows is None and metadata is not None:
+            expected_rows = metadata.row_count
+        if expected_rows is None:
+            return DEFAULT_ARRAYSIZE, DEFAULT_PREFETCHROWS
+
+        limit = max(1, min(self.max_arraysize, self.buffer_bytes // row_width(metadata)))
+        if expected_rows < limit:
+            arraysize = max(1, expected_rows)
+            return arraysize, arraysize + 1
+        return limit, limit
+
+    def observe(self, execution):
+        """
+        Record the rows a finished query returned, for the next choice of its fetch sizes
+        """
+        if not execution.arraysize:
+            return
+        with self.lock:
+            previous = self.history.get(execution.sql)
+            if previous is None and len(self.history) >= HISTORY_SIZE:
+                self.history.clear()
+            # Grow at once, shrink gradually: overfetching only costs buffer memory
+            self.history[execution.sql] = execution.rows if previous is None else max(execution.rows, (previous + execution.rows) // 2)
+            self.executions += 1
+            self.round_trips += execution.round_trips
+            self.default_round_trips += round_trips(execution.rows, DEFAULT_ARRAYSIZE, DEFAULT_PREFETCHROWS)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'queries': self.executions,
+                'round_trips': self.round_trips,
+                'default_round_trips': self.default_round_trips,
+                'round_trips_saved': self.default_round_trips - self.round_trips
+            }
+
+    def reset(self):
+        with self.lock:
+            self.executions = 0
+            self.round_trips = 0
+            self.default_round_trips = 0
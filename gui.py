@@ -1,500 +1,1311 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-import customtkinter as ctk
-import logging
-from datetime import datetime
-import cx_Oracle
-
-class DentalClinicGUI:
-    def __init__(self, root, db_manager):
-        self.root = root
-        self.root.title("Dental Clinic Management System")
-        self.root.geometry("1400x900")
-        self.db_manager = db_manager
-        # Tracking current table and columns
-        self.current_table = tk.StringVar()
-        self.table_columns = []
-        # Setup UI with both modern and traditional elements
-        self.setup_ui()
-
-    def add_search_functionality(self):
-        """
-        search functionality
-        """
-        # Create search frame
-        search_frame = ctk.CTkFrame(self.data_frame)
-        search_frame.pack(fill=tk.X, padx=10, pady=5)
-
-        # Search entry and button
-        self.search_entry = ctk.CTkEntry(search_frame, placeholder_text="Search...", width=300)
-        self.search_entry.pack(side=tk.LEFT, padx=5)
-
-        # Search button
-        search_btn = ctk.CTkButton(search_frame, text="Search", command=self.perform_search)
-        search_btn.pack(side=tk.LEFT, padx=5)
-
-        # Advanced search button
-        advanced_search_btn = ctk.CTkButton(search_frame, text="Advanced Search", command=self.advanced_search)
-        advanced_search_btn.pack(side=tk.LEFT, padx=5)
-
-    def perform_search(self):
-        """
-        Perform a basic search across all columns
-        """
-        selected_table = self.table_dropdown.get()
-        if not selected_table:
-            messagebox.showwarning("Warning", "Please select a table first")
-            return
-
-        search_term = self.search_entry.get().strip()
-        if not search_term:
-            # If search term is empty, reload full table
-            self.display_table_data(selected_table)
-            return
-
-        try:
-            # Clear existing treeview
-            for i in self.tree.get_children():
-                self.tree.delete(i)
-
-            # Fetch columns for the selected table
-            cursor = self.db_manager.execute_query(f"SELECT * FROM {selected_table} WHERE 1=0")
-            columns = [desc[0] for desc in cursor.description]
-
-            # Construct dynamic search query
-            search_conditions = " OR ".join([f"{col} LIKE '%{search_term}%'" for col in columns])
-            search_query = f"SELECT * FROM {selected_table} WHERE {search_conditions}"
-
-            # Execute search query
-            cursor = self.db_manager.execute_query(search_query)
-
-            if cursor:
-                # Configure treeview columns
-                self.tree['columns'] = columns
-                self.tree['show'] = 'headings'
-                
-                for col in columns:
-                    self.tree.heading(col, text=col)
-                    self.tree.column(col, width=100)
-                
-                # Insert matching rows
-                for row in cursor:
-                    self.tree.insert('', 'end', values=row)
-
-                if len(self.tree.get_children()) == 0:
-                    messagebox.showinfo("Search", "No matching records found")
-
-        except Exception as e:
-            messagebox.showerror("Search Error", f"Failed to search: {str(e)}")
-
-    def advanced_search(self):
-        """
-        Advanced search with multiple criteria
-        """
-        selected_table = self.table_dropdown.get()
-        if not selected_table:
-            messagebox.showwarning("Warning", "Please select a table first")
-            return
-
-        try:
-            # Fetch columns for the selected table
-            cursor = self.db_manager.execute_query(f"SELECT * FROM {selected_table} WHERE 1=0")
-            columns = [desc[0] for desc in cursor.description]
-
-            # Create advanced search dialog
-            search_dialog = ctk.CTkToplevel(self.root)
-            search_dialog.title(f"Advanced Search - {selected_table}")
-            search_dialog.geometry("500x600")
-
-            # Create entry fields for search criteria
-            entries = {}
-            for col in columns:
-                frame = ctk.CTkFrame(search_dialog)
-                frame.pack(fill=tk.X, padx=10, pady=5)
-                
-                ctk.CTkLabel(frame, text=col, width=150, anchor='w').pack(side=tk.LEFT)
-                entry = ctk.CTkEntry(frame, width=250)
-                entry.pack(side=tk.LEFT)
-                entries[col] = entry
-
-            def execute_advanced_search():
-                # Construct dynamic search query
-                search_conditions = []
-                search_values = []
-
-                for col, entry in entries.items():
-                    value = entry.get().strip()
-                    if value:
-                        search_conditions.append(f"{col} LIKE :%d" % (len(search_conditions) + 1))
-                        search_values.append(f"%{value}%")
-
-                if not search_conditions:
-                    messagebox.showwarning("Warning", "Please enter at least one search criterion")
-                    return
-
-                # Construct full search query
-                search_query = f"SELECT * FROM {selected_table} WHERE {' AND '.join(search_conditions)}"
-
-                # Clear existing treeview
-                for i in self.tree.get_children():
-                    self.tree.delete(i)
-
-                try:
-                    # Execute search query
-                    cursor = self.db_manager.execute_query(search_query, search_values)
-
-                    if cursor:
-                        # Configure treeview columns
-                        self.tree['columns'] = columns
-                        self.tree['show'] = 'headings'
-                        
-                        for col in columns:
-                            self.tree.heading(col, text=col)
-                            self.tree.column(col, width=100)
-                        
-                        # Insert matching rows
-                        for row in cursor:
-                            self.tree.insert('', 'end', values=row)
-
-                        if len(self.tree.get_children()) == 0:
-                            messagebox.showinfo("Search", "No matching records found")
-
-                        # Close the search dialog
-                        search_dialog.destroy()
-
-                except Exception as e:
-                    messagebox.showerror("Search Error", f"Failed to search: {str(e)}")
-
-            # Search and Cancel buttons
-            search_btn = ctk.CTkButton(search_dialog, text="Search", command=execute_advanced_search)
-            search_btn.pack(pady=10)
-            cancel_btn = ctk.CTkButton(search_dialog, text="Cancel", command=search_dialog.destroy)
-            cancel_btn.pack(pady=10)
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to prepare advanced search: {str(e)}")
-
-    def setup_ui(self):
-        # Main frame
-        main_frame = ctk.CTkFrame(self.root)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        # Table Selection Frame
-        table_frame = ctk.CTkFrame(main_frame)
-        table_frame.pack(fill=tk.X, padx=10, pady=5)
-
-        # Table Selection Label and Dropdown
-        ctk.CTkLabel(table_frame, text="Select Table:").pack(side=tk.LEFT)
-
-        tables = [
-            "Clinic", "Staff", "Dentist", "Receptionist", 
-            "Patient", "Appointment", "Treatment", 
-            "Medical_Record", "Billing"
-        ]
-
-        self.table_dropdown = ctk.CTkComboBox(
-            table_frame, 
-            values=tables,
-            command=self.on_table_select
-        )
-        self.table_dropdown.pack(side=tk.LEFT, padx=5)
-
-        # Database Operations Frame
-        db_frame = ctk.CTkFrame(main_frame)
-        db_frame.pack(fill=tk.X, padx=10, pady=5)
-
-        # Buttons for database operations
-        db_operations = [
-            ("Drop Tables", self.drop_tables),
-            ("Create Tables", self.create_tables),
-            ("Populate Tables", self.populate_tables),
-            ("Add Record", self.add_record),
-            ("Edit Record", self.edit_record),
-            ("Delete Record", self.delete_record)
-        ]
-
-        for text, command in db_operations:
-            ctk.CTkButton(db_frame, text=text, command=command).pack(side=tk.LEFT, padx=5)
-
-        # Data Display Area
-        self.data_frame = ctk.CTkFrame(main_frame)
-        self.data_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-        # Treeview for displaying data
-        self.tree = ttk.Treeview(self.data_frame)
-        self.tree.pack(fill=tk.BOTH, expand=True)
-
-        # Scrollbar for Treeview
-        scrollbar = ttk.Scrollbar(self.data_frame, orient="vertical", command=self.tree.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        self.add_search_functionality()
-
-    def on_table_select(self, event=None):
-        """
-        Handle table selection and fetch columns
-        """
-        selected_table = self.table_dropdown.get()
-        if selected_table:
-            try:
-                # Fetch columns for the selected table
-                cursor = self.db_manager.execute_query(f"SELECT * FROM {selected_table} WHERE 1=0")
-                self.table_columns = [desc[0] for desc in cursor.description]
-                
-                # Display table data
-                self.display_table_data(selected_table)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to fetch table columns: {str(e)}")
-
-    def display_table_data(self, table_name):
-        """
-        Display data for the selected table
-        """
-        # Clear existing treeview
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        try:
-            cursor = self.db_manager.execute_query(f"SELECT * FROM {table_name}")
-            
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                
-                self.tree['columns'] = columns
-                self.tree['show'] = 'headings'
-                
-                for col in columns:
-                    self.tree.heading(col, text=col)
-                    self.tree.column(col, width=100)
-                
-                for row in cursor:
-                    self.tree.insert('', 'end', values=row)
-            else:
-                messagebox.showwarning("Warning", "No data found or query failed")
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to retrieve data: {str(e)}")
-
-    def add_record(self):
-        """
-        Add a new record to the selected table
-        """
-        selected_table = self.table_dropdown.get()
-        if not selected_table:
-            messagebox.showwarning("Warning", "Please select a table first")
-            return
-
-        # Create input dialog
-        add_dialog = ctk.CTkToplevel(self.root)
-        add_dialog.title(f"Add Record to {selected_table}")
-        add_dialog.geometry("500x600")
-
-        # Create entry fields for each column
-        entries = {}
-        for col in self.table_columns:
-            frame = ctk.CTkFrame(add_dialog)
-            frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            ctk.CTkLabel(frame, text=col, width=150, anchor='w').pack(side=tk.LEFT)
-            entry = ctk.CTkEntry(frame, width=250)
-            entry.pack(side=tk.LEFT)
-            entries[col] = entry
-
-        def save_record():
-            try:
-                # Collect values from entries
-                values = [entries[col].get() for col in self.table_columns]
-                
-                # Prepare insert query
-                placeholders = ','.join([':%d' % (i+1) for i in range(len(self.table_columns))])
-                query = f"INSERT INTO {selected_table} ({','.join(self.table_columns)}) VALUES ({placeholders})"
-                
-                # Execute insert
-                cursor = self.db_manager.execute_query(query, values)
-                
-                if cursor:
-                    messagebox.showinfo("Success", "Record added successfully")
-                    add_dialog.destroy()
-                    # Refresh the table view
-                    self.display_table_data(selected_table)
-                else:
-                    messagebox.showerror("Error", "Failed to add record")
-            
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to add record: {str(e)}")
-
-        # Save and Cancel buttons
-        save_btn = ctk.CTkButton(add_dialog, text="Save", command=save_record)
-        save_btn.pack(pady=10)
-        cancel_btn = ctk.CTkButton(add_dialog, text="Cancel", command=add_dialog.destroy)
-        cancel_btn.pack(pady=10)
-
-    def edit_record(self):
-        """
-        Edit an existing record
-        """
-        selected_table = self.table_dropdown.get()
-        if not selected_table:
-            messagebox.showwarning("Warning", "Please select a table first")
-            return
-
-        # Get selected item
-        selected_item = self.tree.selection()
-        if not selected_item:
-            messagebox.showwarning("Warning", "Please select a record to edit")
-            return
-
-        # Create edit dialog
-        edit_dialog = ctk.CTkToplevel(self.root)
-        edit_dialog.title(f"Edit Record in {selected_table}")
-        edit_dialog.geometry("500x600")
-
-        # Get selected row values
-        selected_values = self.tree.item(selected_item[0])['values']
-
-        # Create entry fields for each column
-        entries = {}
-        for col, value in zip(self.table_columns, selected_values):
-            frame = ctk.CTkFrame(edit_dialog)
-            frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            ctk.CTkLabel(frame, text=col, width=150, anchor='w').pack(side=tk.LEFT)
-            entry = ctk.CTkEntry(frame, width=250)
-            entry.insert(0, str(value))
-            entry.pack(side=tk.LEFT)
-            entries[col] = entry
-
-        def save_edited_record():
-            try:
-                # Collect updated values
-                updated_values = [entries[col].get() for col in self.table_columns]
-                
-                # Prepare update query (using first column as primary key)
-                primary_key_col = self.table_columns[0]
-                update_columns = [f"{col} = :{i+1}" for i, col in enumerate(self.table_columns[1:])]
-                query = f"""
-                UPDATE {selected_table} 
-                SET {', '.join(update_columns)} 
-                WHERE {primary_key_col} = :{len(self.table_columns)}
-                """
-                
-                # Rearrange values to match query (move primary key to end)
-                query_values = updated_values[1:] + [updated_values[0]]
-                cursor = self.db_manager.execute_query(query, query_values)
-                
-                if cursor:
-                    messagebox.showinfo("Success", "Record updated successfully")
-                    edit_dialog.destroy()
-                    # Refresh the table view
-                    self.display_table_data(selected_table)
-                else:
-                    messagebox.showerror("Error", "Failed to update record")
-            
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to update record: {str(e)}")
-
-        # Save and Cancel buttons
-        save_btn = ctk.CTkButton(edit_dialog, text="Save", command=save_edited_record)
-        save_btn.pack(pady=10)
-        cancel_btn = ctk.CTkButton(edit_dialog, text="Cancel", command=edit_dialog.destroy)
-        cancel_btn.pack(pady=10)
-
-    def delete_record(self):
-        """
-        Delete a selected record
-        """
-        selected_table = self.table_dropdown.get()
-        if not selected_table:
-            messagebox.showwarning("Warning", "Please select a table first")
-            return
-
-        # Get selected item
-        selected_item = self.tree.selection()
-        if not selected_item:
-            messagebox.showwarning("Warning", "Please select a record to delete")
-            return
-
-        # Confirm deletion
-        if not messagebox.askyesno("Confirm", "Are you sure you want to delete this record?"):
-            return
-
-        try:
-            # Get selected row values
-            selected_values = self.tree.item(selected_item[0])['values']
-            
-            # Prepare delete query (using first column as primary key)
-            primary_key_col = self.table_columns[0]
-            query = f"DELETE FROM {selected_table} WHERE {primary_key_col} = :1"
-            
-            # Execute delete
-            cursor = self.db_manager.execute_query(query, [selected_values[0]])
-            
-            if cursor:
-                messagebox.showinfo("Success", "Record deleted successfully")
-                # Refresh the table view
-                self.display_table_data(selected_table)
-            else:
-                messagebox.showerror("Error", "Failed to delete record")
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to delete record: {str(e)}")
-
-    def drop_tables(self):
-        """
-        Drop all tables
-        """
-        try:
-            if self.db_manager.drop_tables():
-                messagebox.showinfo("Success", "All tables dropped successfully")
-                # Clear the treeview
-                for i in self.tree.get_children():
-                    self.tree.delete(i)
-            else:
-                messagebox.showerror("Error", "Failed to drop tables")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-
-    def create_tables(self):
-        """
-        Create database tables
-        """
-        try:
-            if self.db_manager.create_tables():
-                messagebox.showinfo("Success", "Tables created successfully")
-            else:
-                messagebox.showerror("Error", "Failed to create tables")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-
-    def populate_tables(self):
-        """
-        Populate tables with sample data
-        """
-        try:
-            if self.db_manager.populate_tables():
-                messagebox.showinfo("Success", "Tables populated successfully")
-            else:
-                messagebox.showerror("Error", "Failed to populate tables")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-
-    def view_data(self):
-        selected_table = self.table_dropdown.get()
-        if selected_table:
-            self.display_table_data(selected_table)
-        else:
-            messagebox.showwarning("Warning", "Please select a table first")
-    
-    
-
-def main():
-    import tkinter as tk
-    from database import DatabaseManager
-
-    root = tk.Tk()
-    db_manager = DatabaseManager()
-    app = DentalClinicGUI(root, db_manager)
-    root.mainloop()
-
-if __name__ == "__main__":
-    main()
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog, filedialog
+import customtkinter as ctk
+import logging
+import time
+from datetime import datetime
+from table_view import PagedResult, KeyedResult, VirtualTreeview
+from query_executor import QueryExecutor
+from query_stats import BUCKET_BOUNDS
+from importer import CSVImporter
+from exporter import ResultExporter
+from unit_of_work import UnitOfWork
+from log_pipeline import get_pipeline
+from revenue_analytics import VIEWS, MONEY_COLUMNS, available as analytics_available
+from utils import DataFormatter
+from config import GENERATOR_SCALE, STATS_REFRESH_INTERVAL, SEARCH_RESULT_LIMIT
+
+EXPORT_FILETYPES = [
+    ("CSV", "*.csv"),
+    ("CSV (gzip)", "*.csv.gz"),
+    ("JSON lines", "*.jsonl"),
+    ("JSON lines (gzip)", "*.jsonl.gz")
+]
+
+class DentalClinicGUI:
+    def __init__(self, root, db_manager, connection=None, startup_trace=None):
+        self.root = root
+        self.root.title("Dental Clinic Management System")
+        self.root.geometry("1400x900")
+        self.db_manager = db_manager
+        # Tracking current table and columns
+        self.current_table = tk.StringVar()
+        self.table_columns = []
+        # Primary key column of the selected table, resolved with its columns
+        self.key_column = None
+        self.loading_more = False
+        # Record edits waiting to be committed together
+        self.changes = UnitOfWork(db_manager)
+        self.hold_changes = tk.BooleanVar(value=False)
+        # Setup UI with both modern and traditional elements
+        self.setup_ui()
+        # Database work runs off the Tk thread so the window stays responsive
+        self.executor = QueryExecutor(self.root, on_busy_change=self.on_busy_change)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.startup_trace = startup_trace
+        self.root.after_idle(lambda: self.trace_startup("window shown"))
+        # Connect and read the schema in the background, so the window shows at once;
+        # queries issued meanwhile wait for the connection
+        self.executor.submit(
+            self.start_database,
+            connection,
+            on_success=lambda _: self.trace_startup("interactive"),
+            on_error=self.on_start_error,
+            description="Connecting to database"
+        )
+
+    def start_database(self, connection=None):
+        """
+        Connect (unless already connected) and read the schema once up front;
+        tables missing from it load lazily
+        """
+        if not self.db_manager.ready.is_set():
+            self.db_manager.connect(connection)
+            self.trace_startup("connected")
+        try:
+            self.db_manager.run_in_session(self.db_manager.catalog.load_all)
+            self.trace_startup("schema loaded")
+        except Exception as e:
+            logging.warning(f"Schema catalog not loaded: {e}")
+
+    def on_start_error(self, error):
+        messagebox.showerror("Database Connection Error", str(error))
+        self.on_close()
+
+    def trace_startup(self, event):
+        if self.startup_trace:
+            self.startup_trace.mark(event)
+
+    def add_search_functionality(self):
+        """
+        search functionality
+        """
+        # Create search frame
+        search_frame = ctk.CTkFrame(self.data_frame)
+        search_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        # Search entry and button
+        self.search_entry = ctk.CTkEntry(search_frame, placeholder_text="Search...", width=300)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+
+        # Search button
+        search_btn = ctk.CTkButton(search_frame, text="Search", command=self.perform_search)
+        search_btn.pack(side=tk.LEFT, padx=5)
+
+        # Advanced search button
+        advanced_search_btn = ctk.CTkButton(search_frame, text="Advanced Search", command=self.advanced_search)
+        advanced_search_btn.pack(side=tk.LEFT, padx=5)
+
+        # Export buttons
+        export_btn = ctk.CTkButton(search_frame, text="Export", command=self.export_view)
+        export_btn.pack(side=tk.LEFT, padx=5)
+
+        export_report_btn = ctk.CTkButton(search_frame, text="Export Patient Report", command=self.export_report)
+        export_report_btn.pack(side=tk.LEFT, padx=5)
+
+        # Query plan viewer
+        explain_btn = ctk.CTkButton(search_frame, text="Explain", command=self.show_explain_dialog)
+        explain_btn.pack(side=tk.LEFT, padx=5)
+
+        # Live query statistics
+        stats_btn = ctk.CTkButton(search_frame, text="Query Stats", command=self.show_query_stats)
+        stats_btn.pack(side=tk.LEFT, padx=5)
+
+        # Next free appointment slots by specialization
+        free_slots_btn = ctk.CTkButton(search_frame, text="Free Slots", command=self.find_free_slots)
+        free_slots_btn.pack(side=tk.LEFT, padx=5)
+
+    def perform_search(self):
+        """
+        Perform a basic search. Tables with a search index are matched on
+        their indexed columns (see SEARCH_COLUMNS), whether the index is ready
+        or not; other tables are matched on all columns.
+        """
+        selected_table = self.table_dropdown.get()
+        if not selected_table:
+            messagebox.showwarning("Warning", "Please select a table first")
+            return
+
+        search_term = self.search_entry.get().strip()
+        if not search_term:
+            # If search term is empty, reload full table
+            self.display_table_data(selected_table)
+            return
+
+        search = self.db_manager.search
+        if search.searchable(selected_table) and not search.is_warm(selected_table):
+            # Answer this search with SQL and have the index ready for the next one
+            self.build_search_index(selected_table)
+
+        def build_result():
+            # Ranked matches from the search index when it is ready
+            keys = search.search(selected_table, search_term)
+            if keys is not None:
+                key_column = self.db_manager.catalog.require(selected_table).key_column
+                return KeyedResult(self.db_manager, selected_table, key_column, keys)
+
+            if search.searchable(selected_table):
+                # The same columns the index covers, so results don't depend on its state
+                _, columns = search.index_columns(selected_table)
+            else:
+                # Columns for the selected table come from the schema catalog
+                columns = self.db_manager.catalog.column_names(selected_table)
+
+            # Construct dynamic search condition with a bind variable
+            search_conditions = " OR ".join([f"UPPER({col}) LIKE :term" for col in columns])
+            return PagedResult(
+                self.db_manager, selected_table,
+                where=search_conditions,
+                params={'term': f"%{search_term.upper()}%"}
+            )
+
+        def search_loaded(result):
+            if not result.rows:
+                messagebox.showinfo("Search", "No matching records found")
+            elif isinstance(result, KeyedResult) and len(result.keys) >= SEARCH_RESULT_LIMIT:
+                messagebox.showinfo(
+                    "Search",
+                    f"Showing the best {SEARCH_RESULT_LIMIT} matches. Refine the search to narrow them down."
+                )
+
+        # Show the first page of matches
+        self.load_result(
+            build_result,
+            f"Searching {selected_table}",
+            on_loaded=search_loaded,
+            error_title="Search Error",
+            error_message="Failed to search"
+        )
+
+    def build_search_index(self, table_name):
+        """
+        Build the quick-search index for a table in the background
+        """
+        self.executor.submit(
+            self.db_manager.run_in_session,
+            self.db_manager.search.build,
+            table_name,
+            on_error=lambda error: logging.warning(f"Search index for {table_name} not built: {error}"),
+            channel=f"search-index-{table_name}",
+            description=f"Indexing {table_name}"
+        )
+
+    def advanced_search(self):
+        """
+        Advanced search with multiple criteria
+        """
+        selected_table = self.table_dropdown.get()
+        if not selected_table:
+            messagebox.showwarning("Warning", "Please select a table first")
+            return
+
+        self.run_query(
+            lambda: self.db_manager.catalog.column_names(selected_table),
+            lambda columns: self.show_advanced_search_dialog(selected_table, columns),
+            error_message="Failed to prepare advanced search",
+            description=f"Preparing search on {selected_table}"
+        )
+
+    def show_advanced_search_dialog(self, selected_table, columns):
+        """
+        Collect advanced search criteria for the given columns
+        """
+        try:
+            # Create advanced search dialog
+            search_dialog = ctk.CTkToplevel(self.root)
+            search_dialog.title(f"Advanced Search - {selected_table}")
+            search_dialog.geometry("500x600")
+
+            # Create entry fields for search criteria
+            entries = {}
+            for col in columns:
+                frame = ctk.CTkFrame(search_dialog)
+                frame.pack(fill=tk.X, padx=10, pady=5)
+                
+                ctk.CTkLabel(frame, text=col, width=150, anchor='w').pack(side=tk.LEFT)
+                entry = ctk.CTkEntry(frame, width=250)
+                entry.pack(side=tk.LEFT)
+                entries[col] = entry
+
+            def execute_advanced_search():
+                # Construct dynamic search query
+                search_conditions = []
+                search_values = {}
+
+                for col, entry in entries.items():
+                    value = entry.get().strip()
+                    if value:
+                        bind_name = f"c{len(search_conditions) + 1}"
+                        search_conditions.append(f"{col} LIKE :{bind_name}")
+                        search_values[bind_name] = f"%{value}%"
+
+                if not search_conditions:
+                    messagebox.showwarning("Warning", "Please enter at least one search criterion")
+                    return
+
+                def search_loaded(result):
+                    if not result.rows:
+                        messagebox.showinfo("Search", "No matching records found")
+
+                    # Close the search dialog
+                    if search_dialog.winfo_exists():
+                        search_dialog.destroy()
+
+                # Show the first page of matches
+                self.load_result(
+                    lambda: PagedResult(
+                        self.db_manager, selected_table,
+                        where=' AND '.join(search_conditions),
+                        params=search_values
+                    ),
+                    f"Searching {selected_table}",
+                    on_loaded=search_loaded,
+                    error_title="Search Error",
+                    error_message="Failed to search"
+                )
+
+            # Search and Cancel buttons
+            search_btn = ctk.CTkButton(search_dialog, text="Search", command=execute_advanced_search)
+            search_btn.pack(pady=10)
+            cancel_btn = ctk.CTkButton(search_dialog, text="Cancel", command=search_dialog.destroy)
+            cancel_btn.pack(pady=10)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to prepare advanced search: {str(e)}")
+
+    def setup_ui(self):
+        # Main frame
+        main_frame = ctk.CTkFrame(self.root)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # Table Selection Frame
+        table_frame = ctk.CTkFrame(main_frame)
+        table_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        # Table Selection Label and Dropdown
+        ctk.CTkLabel(table_frame, text="Select Table:").pack(side=tk.LEFT)
+
+        tables = [
+            "Clinic", "Staff", "Dentist", "Receptionist", 
+            "Patient", "Appointment", "Treatment", 
+            "Medical_Record", "Billing"
+        ]
+
+        self.table_dropdown = ctk.CTkComboBox(
+            table_frame, 
+            values=tables,
+            command=self.on_table_select
+        )
+        self.table_dropdown.pack(side=tk.LEFT, padx=5)
+
+        # Database Operations Frame
+        db_frame = ctk.CTkFrame(main_frame)
+        db_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        # Buttons for database operations
+        db_operations = [
+            ("Drop Tables", self.drop_tables),
+            ("Create Tables", self.create_tables),
+            ("Populate Tables", self.populate_tables),
+            ("Upgrade Schema", self.upgrade_schema),
+            ("Add Record", self.add_record),
+            ("Edit Record", self.edit_record),
+            ("Delete Record", self.delete_record),
+            ("Refresh", self.refresh_view),
+            ("Clear Sort/Filter", self.clear_sort_filter),
+            ("Import CSV", self.import_csv),
+            ("Check CSV", self.check_csv)
+        ]
+
+        for text, command in db_operations:
+            ctk.CTkButton(db_frame, text=text, command=command).pack(side=tk.LEFT, padx=5)
+
+        # Batch editing: hold record changes and commit them together
+        changes_frame = ctk.CTkFrame(main_frame)
+        changes_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        ctk.CTkSwitch(
+            changes_frame, text="Hold Changes", variable=self.hold_changes,
+            command=self.on_hold_changes_toggle
+        ).pack(side=tk.LEFT, padx=5)
+        ctk.CTkButton(changes_frame, text="Commit Changes", command=self.commit_changes).pack(side=tk.LEFT, padx=5)
+        ctk.CTkButton(changes_frame, text="Discard Changes", command=self.discard_changes).pack(side=tk.LEFT, padx=5)
+        self.pending_label = ctk.CTkLabel(changes_frame, text="", anchor='w')
+        self.pending_label.pack(side=tk.LEFT, padx=5)
+
+        # The table data and the revenue analytics each get a tab
+        self.tabs = ctk.CTkTabview(main_frame, command=self.on_tab_change)
+        self.tabs.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.tabs.add("Tables")
+        self.tabs.add("Revenue")
+
+        # Data Display Area
+        self.data_frame = ctk.CTkFrame(self.tabs.tab("Tables"))
+        self.data_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Treeview for displaying data
+        self.tree = ttk.Treeview(self.data_frame)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        # Scrollbar for Treeview
+        scrollbar = ttk.Scrollbar(self.data_frame, orient="vertical", command=self.tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Only the visible rows are kept as Treeview items
+        self.grid = VirtualTreeview(
+            self.tree, scrollbar,
+            on_need_more=self.load_more_rows,
+            on_filter_request=self.filter_column
+        )
+        self.add_search_functionality()
+        self.setup_revenue_tab(self.tabs.tab("Revenue"))
+
+        # Status bar showing background database activity
+        status_frame = ctk.CTkFrame(main_frame)
+        status_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.status_label = ctk.CTkLabel(status_frame, text="Ready", anchor='w')
+        self.status_label.pack(side=tk.LEFT, padx=5)
+
+        self.progress_bar = ctk.CTkProgressBar(status_frame, mode='indeterminate', width=200)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        self.progress_bar.set(0)
+        self.busy = False
+
+    def setup_revenue_tab(self, frame):
+        """
+        Revenue analytics, one view at a time
+        """
+        self.revenue_report = None
+
+        controls = ctk.CTkFrame(frame)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+
+        ctk.CTkLabel(controls, text="View:").pack(side=tk.LEFT)
+        self.revenue_view = ctk.CTkComboBox(
+            controls, values=VIEWS, state='readonly', width=200,
+            command=lambda _: self.show_revenue_view()
+        )
+        self.revenue_view.set(VIEWS[0])
+        self.revenue_view.pack(side=tk.LEFT, padx=5)
+
+        ctk.CTkButton(controls, text="Refresh", command=self.refresh_revenue).pack(side=tk.LEFT, padx=5)
+        self.revenue_label = ctk.CTkLabel(controls, text="", anchor='w')
+        self.revenue_label.pack(side=tk.LEFT, padx=5)
+
+        tree_frame = ctk.CTkFrame(frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.revenue_tree = ttk.Treeview(tree_frame, show='headings')
+        self.revenue_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.revenue_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.revenue_tree.configure(yscrollcommand=scrollbar.set)
+
+    def on_tab_change(self):
+        # Cheap once loaded: only the rows inserted since the last visit are fetched
+        if self.tabs.get() == "Revenue":
+            self.refresh_revenue()
+
+    def refresh_revenue(self):
+        """
+        Compute the revenue analytics in the background and show the selected view
+        """
+        if not analytics_available():
+            self.revenue_label.configure(text="Revenue analytics needs NumPy: pip install numpy")
+            return
+
+        def computed(report):
+            self.revenue_report = report
+            self.revenue_label.configure(text=report.summary())
+            self.show_revenue_view()
+
+        self.run_query(
+            self.db_manager.analytics.report,
+            computed,
+            "Revenue Error",
+            "Failed to compute revenue analytics",
+            channel='revenue',
+            description="Computing revenue analytics"
+        )
+
+    def show_revenue_view(self):
+        if not self.revenue_report:
+            return
+        columns, rows = self.revenue_report.views[self.revenue_view.get()]
+        tree = self.revenue_tree
+        tree.delete(*tree.get_children())
+        tree['columns'] = columns
+        for index, column in enumerate(columns):
+            numeric = bool(rows) and isinstance(rows[0][index], (int, float))
+            tree.heading(column, text=column)
+            tree.column(column, width=120 if numeric else 200, anchor='e' if numeric else 'w')
+        for row in rows:
+            tree.insert('', tk.END, values=[self.format_cell(column, value) for column, value in zip(columns, row)])
+
+    def format_cell(self, column, value):
+        if value is None:
+            return ''
+        if column in MONEY_COLUMNS:
+            return DataFormatter.format_currency(value)
+        if column.endswith('%'):
+            return f"{value:.1f}"
+        if isinstance(value, int):
+            return f"{value:,}"
+        return value
+
+    def on_busy_change(self, descriptions):
+        """
+        Show which queries are running in the background
+        """
+        if descriptions:
+            text = descriptions[-1] or "Working"
+            if len(descriptions) > 1:
+                text += f" (+{len(descriptions) - 1} more)"
+            self.status_label.configure(text=f"{text}...")
+            if not self.busy:
+                self.progress_bar.start()
+                self.busy = True
+        else:
+            self.status_label.configure(text=self.ready_text())
+            if self.busy:
+                self.progress_bar.stop()
+                self.progress_bar.set(0)
+                self.busy = False
+
+    def ready_text(self):
+        """
+        Idle status text, with the size of the loaded result
+        """
+        result = self.grid.result
+        if not result or not result.rows:
+            return "Ready"
+        return f"Ready - {len(result.rows):,} rows loaded, {result.bytes_per_row():.0f} bytes/row"
+
+    def on_close(self):
+        """
+        Stop background queries before closing the window
+        """
+        if len(self.changes) and not messagebox.askyesno(
+                "Uncommitted Changes", f"Discard {len(self.changes)} uncommitted changes and exit?"):
+            return
+        self.executor.shutdown()
+        self.root.destroy()
+
+    def run_query(self, func, on_success=None, error_title="Error", error_message="Database operation failed",
+                  channel=None, description=None):
+        """
+        Run database work in the background and report failures in a dialog
+        """
+        def on_error(error):
+            messagebox.showerror(error_title, f"{error_message}: {str(error)}")
+
+        # Each job runs on its own pooled session
+        return self.executor.submit(
+            self.db_manager.run_in_session,
+            func,
+            on_success=on_success,
+            on_error=on_error,
+            channel=channel,
+            description=description
+        )
+
+    def on_table_select(self, event=None):
+        """
+        Handle table selection and fetch columns
+        """
+        selected_table = self.table_dropdown.get()
+        if selected_table:
+            def columns_fetched(metadata):
+                self.table_columns = metadata.column_names
+                self.key_column = metadata.key_column
+                # Display table data
+                self.display_table_data(selected_table)
+
+            # Switching tables again supersedes this load
+            self.grid.clear()
+            self.key_column = None
+            self.run_query(
+                # Columns and key for the selected table come from the schema catalog
+                lambda: self.db_manager.catalog.require(selected_table),
+                columns_fetched,
+                error_message="Failed to fetch table columns",
+                channel='grid',
+                description=f"Loading {selected_table}"
+            )
+
+    def display_table_data(self, table_name):
+        """
+        Display data for the selected table
+        """
+        # Only the first page is fetched; the rest loads as the user scrolls
+        self.load_result(
+            lambda: PagedResult(self.db_manager, table_name),
+            f"Loading {table_name}"
+        )
+
+    def load_result(self, build_result, description, on_loaded=None, error_title="Error",
+                    error_message="Failed to retrieve data"):
+        """
+        Build a paged result and fetch its first page in the background,
+        superseding whatever the table view was loading before
+        """
+        # Clear existing treeview
+        self.grid.clear()
+        self.executor.cancel('grid-more')
+        self.loading_more = False
+
+        def load():
+            result = build_result()
+            return result if result.load_next_page() else None
+
+        def loaded(result):
+            if result is None:
+                messagebox.showwarning("Warning", "No data found or query failed")
+                return
+            self.grid.set_result(result)
+            if on_loaded:
+                on_loaded(result)
+
+        self.run_query(
+            load,
+            loaded,
+            error_title=error_title,
+            error_message=error_message,
+            channel='grid',
+            description=description
+        )
+
+    def load_more_rows(self):
+        """
+        Append the next page when the view scrolls near the last loaded row
+        """
+        result = self.grid.result
+        if not result or not result.has_more or self.loading_more:
+            return
+
+        def page_loaded(page):
+            self.loading_more = False
+            if page is None:
+                result.has_more = False
+            elif self.grid.result is result:
+                result.append_page(*page)
+                self.grid.render()
+
+        def page_failed(error):
+            self.loading_more = False
+            logging.error(f"Failed to load more rows: {error}")
+
+        self.loading_more = True
+        self.executor.submit(
+            self.db_manager.run_in_session,
+            result.fetch_next_page,
+            on_success=page_loaded,
+            on_error=page_failed,
+            channel='grid-more',
+            description=f"Loading more {result.table_name} rows"
+        )
+
+    def add_record(self):
+        """
+        Add a new record to the selected table
+        """
+        selected_table = self.table_dropdown.get()
+        if not selected_table:
+            messagebox.showwarning("Warning", "Please select a table first")
+            return
+
+        # Create input dialog
+        add_dialog = ctk.CTkToplevel(self.root)
+        add_dialog.title(f"Add Record to {selected_table}")
+        add_dialog.geometry("500x600")
+
+        # Create entry fields for each column
+        entries = {}
+        for col in self.table_columns:
+            frame = ctk.CTkFrame(add_dialog)
+            frame.pack(fill=tk.X, padx=10, pady=5)
+            
+            ctk.CTkLabel(frame, text=col, width=150, anchor='w').pack(side=tk.LEFT)
+            entry = ctk.CTkEntry(frame, width=250)
+            entry.pack(side=tk.LEFT)
+            entries[col] = entry
+
+        def save_record():
+            # Collect values from entries
+            values = [entries[col].get() for col in self.table_columns]
+            
+            # Prepare insert query
+            if self.key_column is None:
+                messagebox.showwarning("Warning", f"{selected_table} is still loading")
+                return
+            try:
+                self.changes.register_insert(selected_table, self.key_column, self.table_columns, values)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Failed to add record: {str(e)}")
+                return
+            self.submit_changes(add_dialog, "Record added successfully", "Failed to add record")
+
+        # Save and Cancel buttons
+        save_btn = ctk.CTkButton(add_dialog, text="Save", command=save_record)
+        save_btn.pack(pady=10)
+        cancel_btn = ctk.CTkButton(add_dialog, text="Cancel", command=add_dialog.destroy)
+        cancel_btn.pack(pady=10)
+
+    def edit_record(self):
+        """
+        Edit an existing record
+        """
+        selected_table = self.table_dropdown.get()
+        if not selected_table:
+            messagebox.showwarning("Warning", "Please select a table first")
+            return
+
+        # Get selected item
+        selected_item = self.tree.selection()
+        if not selected_item:
+            messagebox.showwarning("Warning", "Please select a record to edit")
+            return
+
+        # Create edit dialog
+        edit_dialog = ctk.CTkToplevel(self.root)
+        edit_dialog.title(f"Edit Record in {selected_table}")
+        edit_dialog.geometry("500x600")
+
+        # Get selected row values from the loaded rows (Tk item values lose their types)
+        item_id = selected_item[0]
+        selected_values = self.grid.selected_row() or self.tree.item(item_id)['values']
+        # A row with held changes is edited from its pending values
+        pending_values = self.changes.pending_values(selected_table, item_id)
+        shown_values = [pending_values.get(col) for col in self.table_columns] if pending_values else selected_values
+
+        # Create entry fields for each column
+        entries = {}
+        for col, value in zip(self.table_columns, shown_values):
+            frame = ctk.CTkFrame(edit_dialog)
+            frame.pack(fill=tk.X, padx=10, pady=5)
+            
+            ctk.CTkLabel(frame, text=col, width=150, anchor='w').pack(side=tk.LEFT)
+            entry = ctk.CTkEntry(frame, width=250)
+            entry.insert(0, '' if value is None else str(value))
+            entry.pack(side=tk.LEFT)
+            entries[col] = entry
+
+        def save_edited_record():
+            # Collect updated values
+            updated_values = [entries[col].get() for col in self.table_columns]
+            
+            # The update is keyed on the catalog's primary key as the row was loaded
+            primary_key_col = self.key_column
+            if primary_key_col is None:
+                messagebox.showwarning("Warning", f"{selected_table} is still loading")
+                return
+            old_values = dict(zip(self.table_columns, selected_values))
+            try:
+                self.changes.register_update(
+                    selected_table, primary_key_col, old_values[primary_key_col],
+                    self.table_columns, updated_values, old_values
+                )
+            except ValueError as e:
+                messagebox.showerror("Error", f"Failed to update record: {str(e)}")
+                return
+            self.submit_changes(edit_dialog, "Record updated successfully", "Failed to update record")
+
+        # Save and Cancel buttons
+        save_btn = ctk.CTkButton(edit_dialog, text="Save", command=save_edited_record)
+        save_btn.pack(pady=10)
+        cancel_btn = ctk.CTkButton(edit_dialog, text="Cancel", command=edit_dialog.destroy)
+        cancel_btn.pack(pady=10)
+
+    def delete_record(self):
+        """
+        Delete a selected record
+        """
+        selected_table = self.table_dropdown.get()
+        if not selected_table:
+            messagebox.showwarning("Warning", "Please select a table first")
+            return
+
+        # Get selected item
+        selected_item = self.tree.selection()
+        if not selected_item:
+            messagebox.showwarning("Warning", "Please select a record to delete")
+            return
+
+        # Confirm deletion
+        if not messagebox.askyesno("Confirm", "Are you sure you want to delete this record?"):
+            return
+
+        # Get selected row values from the loaded rows (Tk item values lose their types)
+        item_id = selected_item[0]
+        selected_values = self.grid.selected_row() or self.tree.item(item_id)['values']
+        
+        # Prepare delete query keyed on the catalog's primary key
+        primary_key_col = self.key_column
+        if primary_key_col is None:
+            messagebox.showwarning("Warning", f"{selected_table} is still loading")
+            return
+        key_value = selected_values[self.table_columns.index(primary_key_col)]
+        try:
+            self.changes.register_delete(
+                selected_table, primary_key_col, key_value, dict(zip(self.table_columns, selected_values))
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", f"Failed to delete record: {str(e)}")
+            return
+        self.submit_changes(None, "Record deleted successfully", "Failed to delete record")
+
+    def submit_changes(self, dialog, success_message, error_message):
+        """
+        Commit a change just queued, unless changes are being held for a later commit
+        """
+        if self.hold_changes.get():
+            if dialog:
+                dialog.destroy()
+            self.update_pending_label()
+            return
+
+        def committed(outcome):
+            if dialog:
+                dialog.destroy()
+            messagebox.showinfo("Success", success_message)
+
+        def failed(error):
+            # Nothing was written; drop the change so the next edit does not repeat it
+            self.changes.discard()
+            self.update_pending_label()
+            messagebox.showerror("Error", f"{error_message}: {str(error)}")
+
+        self.flush_changes(committed, failed)
+
+    def commit_changes(self):
+        """
+        Commit every held change in one transaction
+        """
+        count = len(self.changes)
+        if not count:
+            messagebox.showinfo("Commit Changes", "There are no pending changes")
+            return
+
+        def failed(error):
+            # Keep holding, so the next edit does not commit the failed changes with it
+            self.hold_changes.set(True)
+            self.update_pending_label()
+            messagebox.showerror(
+                "Commit Failed",
+                f"No changes were saved, and the {count} pending changes are kept: {str(error)}"
+            )
+
+        self.flush_changes(
+            lambda outcome: messagebox.showinfo("Success", f"Committed {len(outcome)} changes"),
+            failed
+        )
+
+    def discard_changes(self):
+        """
+        Drop the held changes without writing them
+        """
+        count = len(self.changes)
+        if not count or not messagebox.askyesno("Discard Changes", f"Discard {count} pending changes?"):
+            return
+        try:
+            self.changes.discard()
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+        self.update_pending_label()
+
+    def on_hold_changes_toggle(self):
+        # Changes held so far are committed when holding is switched off
+        if not self.hold_changes.get() and len(self.changes):
+            self.commit_changes()
+        self.update_pending_label()
+
+    def flush_changes(self, on_committed, on_failed):
+        """
+        Write the queued changes in the background, then patch the loaded rows
+        with the rows as stored instead of reloading the table
+        """
+        def committed(outcome):
+            self.apply_committed(outcome)
+            self.update_pending_label()
+            on_committed(outcome)
+
+        def failed(error):
+            self.changes.end_flush()
+            on_failed(error)
+
+        # Claimed here on the Tk thread, so a second save or commit cannot
+        # start another flush, or queue a change, before this one is done
+        try:
+            self.changes.start_flush()
+        except ValueError as e:
+            messagebox.showwarning("Saving Changes", str(e))
+            return
+
+        self.executor.submit(
+            self.db_manager.run_in_session,
+            self.changes.flush,
+            True,
+            on_success=committed,
+            on_error=failed,
+            description=f"Saving {len(self.changes)} changes"
+        )
+
+    def apply_committed(self, outcome):
+        """
+        Apply committed changes to the loaded rows in place
+        """
+        result = self.grid.result
+        if result is None:
+            return
+        for change, row in outcome:
+            if change.table != result.table_name:
+                continue
+            if change.kind == 'delete':
+                result.remove_row(str(change.key))
+            elif row is None:
+                continue
+            elif change.kind == 'insert':
+                result.insert_row(row)
+            else:
+                result.update_row(str(change.key), row)
+        self.grid.render()
+
+    def update_pending_label(self):
+        count = len(self.changes)
+        self.pending_label.configure(text=f"{count} pending change{'s' if count != 1 else ''}" if count else "")
+
+    def refresh_view(self):
+        """
+        Reload the selected table from the database
+        """
+        selected_table = self.table_dropdown.get()
+        if not selected_table:
+            messagebox.showwarning("Warning", "Please select a table first")
+            return
+        self.display_table_data(selected_table)
+
+    def filter_column(self, column):
+        """
+        Ask for a filter on one column of the loaded rows
+        """
+        current = self.grid.view.filters.get(column, '') if self.grid.view else ''
+        text = simpledialog.askstring(
+            "Filter Column",
+            f"Show loaded rows whose {column} contains the text,\n"
+            "or compares with a value (>=, <=, !=, >, <, =).\nLeave empty to remove the filter:",
+            initialvalue=current,
+            parent=self.root
+        )
+        if text is not None:
+            self.grid.filter_by(column, text)
+
+    def clear_sort_filter(self):
+        """
+        Back to the loaded rows in key order
+        """
+        self.grid.clear_view()
+
+    def import_csv(self, check_only=False):
+        """
+        Bulk import a CSV file into the selected table
+        """
+        selected_table = self.table_dropdown.get()
+        if not selected_table:
+            messagebox.showwarning("Warning", "Please select a table first")
+            return
+
+        csv_path = filedialog.askopenfilename(
+            title=f"{'Check' if check_only else 'Import'} CSV for {selected_table}",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not csv_path:
+            return
+
+        def imported(report):
+            title = "Check Finished" if check_only else "Import Finished"
+            if report.rows_rejected:
+                messagebox.showwarning(title, report.summary())
+            else:
+                messagebox.showinfo(title, report.summary())
+            # Refresh the table view
+            if not check_only and self.table_dropdown.get() == selected_table:
+                self.display_table_data(selected_table)
+
+        self.run_query(
+            lambda: CSVImporter(self.db_manager, selected_table).run(csv_path, check_only=check_only),
+            imported,
+            error_title="Import Error",
+            error_message="Failed to check CSV" if check_only else "Failed to import CSV",
+            description=f"{'Checking' if check_only else 'Importing'} {selected_table} CSV"
+        )
+
+    def check_csv(self):
+        """
+        Validate a CSV file against the selected table without importing it
+        """
+        self.import_csv(check_only=True)
+
+    def export_view(self):
+        """
+        Export every row of the current table or search result
+        """
+        result = self.grid.result
+        if not result:
+            messagebox.showwarning("Warning", "Please load a table or search first")
+            return
+
+        path = filedialog.asksaveasfilename(
+            title=f"Export {result.table_name}",
+            initialfile=f"{result.table_name}.csv",
+            filetypes=EXPORT_FILETYPES
+        )
+        if path:
+            rows = None
+            if self.grid.view.active or not result.has_more:
+                # Everything shown is loaded: export it in display order, copied here
+                # so edits made while the export runs cannot shift the rows under it
+                rows = self.grid.rows()[:]
+            self.run_export(lambda exporter: exporter.export_result(result, path, rows), path, result.table_name)
+
+    def export_report(self):
+        """
+        Export the patient report
+        """
+        path = filedialog.asksaveasfilename(
+            title="Export Patient Report",
+            initialfile="patient_report.csv",
+            filetypes=EXPORT_FILETYPES
+        )
+        if path:
+            self.run_export(lambda exporter: exporter.export_patient_report(path), path, "patient report")
+
+    def run_export(self, export, path, name):
+        """
+        Stream an export to disk on a worker thread
+        """
+        def exported(rows_written):
+            messagebox.showinfo("Export Finished", f"Exported {rows_written} rows to {path}")
+
+        self.run_query(
+            lambda: export(ResultExporter(self.db_manager)),
+            exported,
+            error_title="Export Error",
+            error_message="Failed to export",
+            description=f"Exporting {name}"
+        )
+
+    def drop_tables(self):
+        """
+        Drop all tables
+        """
+        def tables_dropped(success):
+            if success:
+                messagebox.showinfo("Success", "All tables dropped successfully")
+                # Clear the treeview
+                self.grid.clear()
+            else:
+                messagebox.showerror("Error", "Failed to drop tables")
+
+        # Nothing loading from the old tables is worth finishing
+        self.executor.cancel('grid')
+        self.executor.cancel('grid-more')
+        self.run_query(
+            self.db_manager.drop_tables,
+            tables_dropped,
+            error_message="An error occurred",
+            description="Dropping tables"
+        )
+
+    def create_tables(self):
+        """
+        Create database tables
+        """
+        def tables_created(success):
+            if success:
+                messagebox.showinfo("Success", "Tables created successfully")
+            else:
+                messagebox.showerror("Error", "Failed to create tables")
+
+        self.run_query(
+            self.db_manager.create_tables,
+            tables_created,
+            error_message="An error occurred",
+            description="Creating tables"
+        )
+
+    def upgrade_schema(self):
+        """
+        Convert old VARCHAR2 date columns to DATE and create missing indexes
+        """
+        if not messagebox.askyesno(
+                "Confirm", "Upgrade the schema? Tables with old date columns are rebuilt."):
+            return
+
+        def schema_upgraded(outcome):
+            migrated, created = outcome
+            if not migrated and not created:
+                messagebox.showinfo("Upgrade Schema", "The schema is already up to date")
+                return
+            lines = [f"Converted {table}.{column} to DATE" for table, column in migrated]
+            lines.append(f"Created {len(created)} indexes")
+            messagebox.showinfo("Upgrade Schema", "\n".join(lines))
+
+        # The rebuilt tables invalidate whatever is loading from them
+        self.executor.cancel('grid')
+        self.executor.cancel('grid-more')
+        self.run_query(
+            self.db_manager.design.upgrade,
+            schema_upgraded,
+            error_message="Failed to upgrade schema",
+            description="Upgrading schema"
+        )
+
+    def show_explain_dialog(self):
+        """
+        Show the execution plan of a recently issued query, or of any SQL typed in
+        """
+        explain_dialog = ctk.CTkToplevel(self.root)
+        explain_dialog.title("Explain Plan")
+        explain_dialog.geometry("900x650")
+
+        # Recent statements, newest first
+        ctk.CTkLabel(explain_dialog, text="Recent queries", anchor='w').pack(fill=tk.X, padx=10, pady=(10, 0))
+        statements = self.db_manager.statements.recent_statements()
+        recent_list = tk.Listbox(explain_dialog, height=8)
+        recent_list.pack(fill=tk.X, padx=10, pady=5)
+        for statement in statements:
+            recent_list.insert(tk.END, ' '.join(statement.split()))
+
+        sql_box = ctk.CTkTextbox(explain_dialog, height=120)
+        sql_box.pack(fill=tk.X, padx=10, pady=5)
+
+        plan_box = ctk.CTkTextbox(explain_dialog, font=("Courier", 12), wrap='none')
+        plan_box.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        def statement_selected(event=None):
+            selection = recent_list.curselection()
+            if selection:
+                sql_box.delete('1.0', tk.END)
+                sql_box.insert('1.0', statements[selection[0]])
+
+        def plan_ready(lines):
+            plan_box.delete('1.0', tk.END)
+            plan_box.insert('1.0', "\n".join(lines) or "No plan returned")
+
+        def run_explain():
+            query = sql_box.get('1.0', tk.END).strip()
+            if not query:
+                messagebox.showwarning("Warning", "Select or enter a query to explain", parent=explain_dialog)
+                return
+            self.run_query(
+                lambda: self.db_manager.design.explain(query),
+                plan_ready,
+                error_title="Explain Error",
+                error_message="Failed to explain query",
+                channel='explain',
+                description="Explaining query"
+            )
+
+        recent_list.bind('<<ListboxSelect>>', statement_selected)
+        explain_btn = ctk.CTkButton(explain_dialog, text="Explain", command=run_explain)
+        explain_btn.pack(pady=10)
+
+    def show_query_stats(self):
+        """
+        Show live per-statement and per-action query statistics
+        """
+        stats_dialog = ctk.CTkToplevel(self.root)
+        stats_dialog.title("Query Statistics")
+        stats_dialog.geometry("1100x650")
+
+        summary_label = ctk.CTkLabel(stats_dialog, text="", anchor='w')
+        summary_label.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        # Statements with the most total time first
+        statement_columns = ('Executions', 'Errors', 'Total ms', 'Mean ms', 'p95 ms', 'Max ms', 'Rows', 'Round trips', 'Top action')
+        statement_tree = ttk.Treeview(stats_dialog, columns=('Statement',) + statement_columns, show='headings', height=14)
+        statement_tree.heading('Statement', text='Statement')
+        statement_tree.column('Statement', width=420, anchor='w')
+        for column in statement_columns:
+            statement_tree.heading(column, text=column)
+            statement_tree.column(column, width=150 if column == 'Top action' else 80, anchor='e')
+        statement_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        # Totals per GUI action
+        action_columns = ('Action', 'Executions', 'Total ms', 'Rows')
+        action_tree = ttk.Treeview(stats_dialog, columns=action_columns, show='headings', height=8)
+        for column in action_columns:
+            action_tree.heading(column, text=column)
+            action_tree.column(column, width=420 if column == 'Action' else 100, anchor='w' if column == 'Action' else 'e')
+        action_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        def refresh():
+            if not stats_dialog.winfo_exists():
+                return
+            stats = self.db_manager.query_stats
+            statements = stats.top_statements(limit=None)
+            statement_tree.delete(*statement_tree.get_children())
+            for statement in statements[:50]:
+                p95 = statement.histogram.percentile(0.95)
+                top_action = statement.actions.most_common(1)[0][0] if statement.actions else ''
+                statement_tree.insert('', tk.END, values=(
+                    statement.fingerprint, statement.executions, statement.errors,
+                    f"{statement.total_ms:.1f}", f"{statement.mean_ms:.1f}",
+                    f"<= {p95}" if p95 is not None else f"> {BUCKET_BOUNDS[-1]}",
+                    f"{statement.max_ms:.1f}", statement.rows, statement.round_trips, top_action
+                ))
+            action_tree.delete(*action_tree.get_children())
+            for action, executions, total_ms, rows in stats.by_action():
+                action_tree.insert('', tk.END, values=(action, executions, f"{total_ms:.1f}", rows))
+
+            executions = sum(statement.executions for statement in statements)
+            cursors = self.db_manager.cursors.stats()
+            fetches = self.db_manager.fetch_tuner.stats()
+            logs = get_pipeline().stats()
+            summary_label.configure(
+                text=f"{executions} executions of {len(statements)} statements, "
+                     f"slow query threshold {stats.slow_query_ms} ms; "
+                     f"{cursors['open']} cursors open, {cursors['leaked']} leaked; "
+                     f"{fetches['round_trips']} fetch round trips "
+                     f"({fetches['default_round_trips']} with default fetch sizes); "
+                     f"log queue {logs['pending']}/{logs['capacity']}, {logs['dropped']} records dropped"
+            )
+            stats_dialog.after(STATS_REFRESH_INTERVAL, refresh)
+
+        def reset():
+            self.db_manager.query_stats.reset()
+            self.db_manager.fetch_tuner.reset()
+
+        reset_btn = ctk.CTkButton(stats_dialog, text="Reset", command=reset)
+        reset_btn.pack(pady=10)
+        refresh()
+
+    def find_free_slots(self):
+        """
+        Find the next free appointment slots with dentists of a specialization
+        """
+        self.run_query(
+            self.db_manager.schedule.specialization_names,
+            self.show_free_slots_dialog,
+            error_message="Failed to read dentist schedules",
+            description="Reading dentist schedules"
+        )
+
+    def show_free_slots_dialog(self, specializations):
+        slots_dialog = ctk.CTkToplevel(self.root)
+        slots_dialog.title("Find Free Slots")
+        slots_dialog.geometry("700x500")
+
+        form = ctk.CTkFrame(slots_dialog)
+        form.pack(fill=tk.X, padx=10, pady=10)
+
+        ctk.CTkLabel(form, text="Specialization:").pack(side=tk.LEFT)
+        specialization = ctk.CTkComboBox(form, values=specializations, state='readonly', width=180)
+        if specializations:
+            specialization.set(specializations[0])
+        specialization.pack(side=tk.LEFT, padx=5)
+
+        ctk.CTkLabel(form, text="From:").pack(side=tk.LEFT)
+        from_entry = ctk.CTkEntry(form, width=110)
+        from_entry.insert(0, datetime.now().strftime('%Y-%m-%d'))
+        from_entry.pack(side=tk.LEFT, padx=5)
+
+        ctk.CTkLabel(form, text="Slots:").pack(side=tk.LEFT)
+        count_entry = ctk.CTkEntry(form, width=60)
+        count_entry.insert(0, "10")
+        count_entry.pack(side=tk.LEFT, padx=5)
+
+        result_label = ctk.CTkLabel(slots_dialog, text="", anchor='w')
+        result_label.pack(fill=tk.X, padx=10)
+
+        slot_columns = ('Date', 'Time', 'Dentist ID', 'Dentist')
+        slot_tree = ttk.Treeview(slots_dialog, columns=slot_columns, show='headings')
+        for column in slot_columns:
+            slot_tree.heading(column, text=column)
+            slot_tree.column(column, width=250 if column == 'Dentist' else 120, anchor='w')
+        slot_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        def find():
+            try:
+                count = int(count_entry.get())
+                start = datetime.strptime(from_entry.get().strip(), '%Y-%m-%d')
+            except ValueError:
+                messagebox.showerror("Error", "Enter a YYYY-MM-DD date and a number of slots", parent=slots_dialog)
+                return
+            if start.date() == datetime.now().date():
+                # Today's slots that have already started are skipped
+                start = datetime.now()
+
+            def search():
+                started = time.perf_counter()
+                slots = self.db_manager.schedule.next_free_slots(specialization.get(), count, start)
+                return slots, time.perf_counter() - started
+
+            def found(outcome):
+                if not slots_dialog.winfo_exists():
+                    return
+                slots, elapsed = outcome
+                slot_tree.delete(*slot_tree.get_children())
+                for slot in slots:
+                    slot_tree.insert('', tk.END, values=slot)
+                result_label.configure(text=f"{len(slots)} free slots found in {elapsed * 1000000:.0f} µs")
+
+            self.run_query(
+                search,
+                found,
+                error_message="Failed to find free slots",
+                channel='free-slots',
+                description="Finding free slots"
+            )
+
+        find_btn = ctk.CTkButton(form, text="Find", command=find)
+        find_btn.pack(side=tk.LEFT, padx=5)
+
+    def populate_tables(self):
+        """
+        Populate tables with generated data at a chosen scale
+        """
+        appointments = simpledialog.askinteger(
+            "Populate Tables",
+            "Number of appointments to generate\n(patients, staff, treatments and bills scale with it):",
+            initialvalue=GENERATOR_SCALE,
+            minvalue=1,
+            maxvalue=10000000,
+            parent=self.root
+        )
+        if appointments is None:
+            return
+
+        def tables_populated(success):
+            if success:
+                messagebox.showinfo("Success", "Tables populated successfully")
+            else:
+                messagebox.showerror("Error", "Failed to populate tables")
+
+        self.run_query(
+            lambda: self.db_manager.populate_tables(appointments),
+            tables_populated,
+            error_message="An error occurred",
+            description=f"Populating tables ({appointments} appointments)"
+        )
+
+    def view_data(self):
+        selected_table = self.table_dropdown.get()
+        if selected_table:
+            self.display_table_data(selected_table)
+        else:
+            messagebox.showwarning("Warning", "Please select a table first")
+    
+    
+
+def main():
+    import tkinter as tk
+    from database import DatabaseManager
+
+    root = tk.Tk()
+    db_manager = DatabaseManager()
+    app = DentalClinicGUI(root, db_manager)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
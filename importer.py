@@ -0,0 +1,146 @@
+import csv
+import logging
+import time
+from collections import Counter
+from itertools import islice
+from batch_validation import BatchValidator
+from query_executor import current_token, report_progress
+from config import IMPORT_BATCH_SIZE
+
+class ImportReport:
+    def __init__(self, table_name, rejects_path):
+        self.table_name = table_name
+        self.rejects_path = rejects_path
+        self.rows_read = 0
+        self.rows_inserted = 0
+        self.rows_rejected = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        # Rows rejected before reaching the database, by failed rule
+        self.failures = Counter()
+        self.checked_only = False
+
+    @property
+    def rows_per_minute(self):
+        return self.rows_inserted * 60 / self.elapsed if self.elapsed else 0
+
+    def summary(self):
+        if self.checked_only:
+            text = (
+                f"Checked {self.rows_read} rows for {self.table_name} in {self.elapsed:.1f}s: "
+                f"{self.rows_read - self.rows_rejected} valid, {self.rows_rejected} rejected"
+            )
+        else:
+            text = (
+                f"Imported {self.rows_inserted} of {self.rows_read} rows into {self.table_name} "
+                f"in {self.elapsed:.1f}s ({self.rows_per_minute:,.0f} rows/min)"
+            )
+        if self.rows_rejected:
+            text += f"\n{self.rows_rejected} rejected rows written to {self.rejects_path}"
+        for message, count in self.failures.most_common(5):
+            text += f"\n  {message}: {count}"
+        return text
+
+class CSVImporter:
+    """
+    Streams a CSV file into a table in constant memory: each batch of rows
+    is validated a column at a time by a BatchValidator, the valid rows are
+    inserted with executemany, and the batch is committed. Rejected rows
+    are copied to a separate CSV with the reason.
+    """
+    def __init__(self, db_manager, table_name, batch_size=IMPORT_BATCH_SIZE, rejects_path=None):
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.rejects_path = rejects_path
+        self.metadata = db_manager.catalog.require(table_name)
+
+    def run(self, csv_path, check_only=False):
+        """
+        Import csv_path; with check_only, validate every row and write the
+        rejects without inserting anything
+        """
+        rejects_path = self.rejects_path or f"{csv_path}.rejects.csv"
+        report = ImportReport(self.table_name, rejects_path)
+        report.checked_only = check_only
+        started = time.perf_counter()
+        token = current_token()
+
+        with open(csv_path, newline='', encoding='utf-8-sig') as source, \
+                open(rejects_path, 'w', newline='', encoding='utf-8') as rejects_file:
+            reader = csv.reader(source)
+            rejects = csv.writer(rejects_file)
+
+            header = next(reader, None)
+            if not header:
+                raise ValueError(f"{csv_path} is empty")
+            columns = self.map_header(header)
+            rejects.writerow(header + ['ERROR'])
+            validator = BatchValidator(self.db_manager, self.metadata, columns)
+            names = [column.name for column in columns]
+            key_index = names.index(self.metadata.key_column) if self.metadata.key_column in names else None
+
+            placeholders = ', '.join([f':{i+1}' for i in range(len(columns))])
+            query = f"INSERT INTO {self.table_name} ({', '.join(col.name for col in columns)}) VALUES ({placeholders})"
+
+            while True:
+                raw_batch = list(islice(reader, self.batch_size))
+                if not raw_batch:
+                    break
+                report.rows_read += len(raw_batch)
+                result = validator.validate(raw_batch)
+                report.failures.update(result.failure_counts())
+
+                batch, valid_raw = [], []
+                for position, mask in enumerate(result.masks):
+                    if mask:
+                        rejects.writerow(raw_batch[position] + [result.error(position)])
+                        report.rows_rejected += 1
+                    else:
+                        batch.append(result.rows[position])
+                        valid_raw.append(raw_batch[position])
+
+                if check_only:
+                    report_progress(f"Checking {self.table_name}: {report.rows_read} rows")
+                elif batch:
+                    self.flush(query, batch, valid_raw, rejects, report, key_index)
+                if token:
+                    token.check()
+
+        report.elapsed = time.perf_counter() - started
+        if not check_only:
+            # Bulk loads are cheaper to re-index from scratch than row by row
+            self.db_manager.search.invalidate(self.table_name)
+            self.db_manager.summaries.invalidate()
+            self.db_manager.schedule.invalidate()
+            if key_index is None:
+                self.db_manager.analytics.invalidate()
+            self.db_manager.reference_keys.invalidate(self.table_name)
+        logging.info(report.summary())
+        return report
+
+    def map_header(self, header):
+        """
+        Match CSV header names to the table's columns
+        """
+        columns = []
+        for name in header:
+            column = self.metadata.column(name.strip())
+            if column is None:
+                raise ValueError(f"Column {name} does not exist in {self.table_name}")
+            columns.append(column)
+        return columns
+
+    def flush(self, query, batch, raw_batch, rejects, report, key_index=None):
+        errors = self.db_manager.execute_batch(query, batch)
+        for offset, message in errors:
+            rejects.writerow(raw_batch[offset] + [message])
+        if key_index is not None:
+            # New bills and treatments are appended to the revenue analytics arrays
+            failed = {offset for offset, _ in errors}
+            keys = [row[key_index] for offset, row in enumerate(batch) if offset not in failed]
+            self.db_manager.analytics.record_inserted(self.table_name, keys)
+        report.batches += 1
+        report.rows_rejected += len(errors)
+        report.rows_inserted += len(batch) - len(errors)
+        report_progress(f"Importing {self.table_name}: {report.rows_inserted} rows")
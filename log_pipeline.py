@@ -0,0 +1,248 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from query_executor import current_action
+from config import (
+    LOG_FILE, LOG_FORMAT, LOG_MAX_BYTES, LOG_ROTATE_WHEN, LOG_BACKUP_COUNT,
+    LOG_QUEUE_SIZE, LOG_QUEUE_RESERVE
+)
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s: %(message)s'
+# Attributes passed with extra= that are written as fields of JSON records
+STRUCTURED_FIELDS = ('action', 'latency_ms', 'rows', 'round_trips', 'binds', 'sql')
+# Seconds between the notices logged about dropped records
+DROP_NOTICE_INTERVAL = 1.0
+# Formats tracebacks on the calling thread, while exc_info is still live
+TRACEBACK_FORMATTER = logging.Formatter()
+
+_pipeline = None
+_lock = threading.Lock()
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, thread and message, plus
+    the structured fields a record carries
+    """
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+    def formatTime(self, record, datefmt=None):
+        return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f".{int(record.msecs):03d}"
+
+class RotatingLogFile(logging.handlers.TimedRotatingFileHandler):
+    """
+    Log file rolled over at a time interval and also whenever it reaches
+    max_bytes; size rollovers within one interval get numbered names
+    """
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, when=LOG_ROTATE_WHEN, backup_count=LOG_BACKUP_COUNT):
+        super().__init__(filename, when=when, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes and self.stream is not None:
+            self.stream.seek(0, os.SEEK_END)
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def rotation_filename(self, default_name):
+        name, number = default_name, 0
+        while os.path.exists(name):
+            number += 1
+            name = f"{default_name}.{number}"
+        return name
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the background writer without ever blocking the
+    caller. Once the queue is down to its last LOG_QUEUE_RESERVE slots only
+    warnings and errors get in; records that do not fit are counted as
+    dropped, and a notice of how many is queued at most every DROP_NOTICE_INTERVAL.
+    """
+    def __init__(self, log_queue, reserve=LOG_QUEUE_RESERVE):
+        super().__init__(log_queue)
+        self.reserve = reserve
+        self.queued = 0
+        self.dropped = Counter()
+        self.unreported = 0
+        self.high_water = 0
+        self.last_notice = 0.0
+        # Not self.lock, which Handler.handle() holds around emit()
+        self.counter_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Captured on the calling thread, where the GUI action is known
+        if getattr(record, 'action', None) is None:
+            record.action = current_action()
+        # Unlike QueueHandler.prepare, the traceback stays in exc_text rather
+        # than being folded into the message, so JSON records keep it apart
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = TRACEBACK_FORMATTER.formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record):
+        log_queue = self.queue
+        depth = log_queue.qsize()
+        if record.levelno < logging.WARNING and depth >= log_queue.maxsize - self.reserve:
+            self.drop(record)
+            return
+        try:
+            log_queue.put_nowait(record)
+        except queue.Full:
+            self.drop(record)
+            return
+        with self.counter_lock:
+            self.queued += 1
+            self.high_water = max(self.high_water, depth + 1)
+            unreported = 0
+            if self.unreported and record.created - self.last_notice >= DROP_NOTICE_INTERVAL:
+                unreported, self.unreported = self.unreported, 0
+                self.last_notice = record.created
+        if unreported:
+            notice = logging.LogRecord(
+                'log_pipeline', logging.WARNING, __file__, 0,
+                f"{unreported} log records dropped while the log queue was full", None, None
+            )
+            try:
+                log_queue.put_nowait(notice)
+            except queue.Full:
+                with self.counter_lock:
+                    self.unreported += unreported
+
+    def drop(self, record):
+        with self.counter_lock:
+            self.dropped[record.levelname] += 1
+            self.unreported += 1
+
+class LogPipeline:
+    """
+    Logging off the calling threads: loggers put records on a bounded queue
+    and a single QueueListener thread formats them and writes the files.
+    """
+    def __init__(self, queue_size=LOG_QUEUE_SIZE):
+        self.queue = queue.Queue(queue_size)
+        self.handler = BoundedQueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(self.queue, respect_handler_level=True)
+        self.handlers = []
+        # Loggers whose records only go to their own handlers
+        self.routed = set()
+        self.started = False
+
+    def add_handler(self, handler, logger_name=None):
+        """
+        Have the writer thread pass records to handler: only those of
+        logger_name, or, without one, those of every logger not given its own handler
+        """
+        if logger_name is not None:
+            self.routed.add(logger_name)
+            handler.addFilter(lambda record: record.name == logger_name)
+        else:
+            handler.addFilter(lambda record: record.name not in self.routed)
+        self.handlers.append((logger_name, handler))
+        # The listener reads its handler tuple per record, so it can change while running
+        self.listener.handlers = tuple(handler for _, handler in self.handlers)
+
+    def attach(self, logger):
+        if self.handler not in logger.handlers:
+            logger.addHandler(self.handler)
+
+    def start(self):
+        if not self.started:
+            self.listener.start()
+            self.started = True
+
+    def stop(self):
+        """
+        Write out everything queued and stop the writer thread
+        """
+        if self.started:
+            self.started = False
+            self.listener.stop()
+            for _, handler in self.handlers:
+                handler.flush()
+
+    def stats(self):
+        handler = self.handler
+        with handler.counter_lock:
+            return {
+                'queued': handler.queued,
+                'pending': self.queue.qsize(),
+                'high_water': handler.high_water,
+                'capacity': self.queue.maxsize,
+                'dropped': sum(handler.dropped.values()),
+                'dropped_by_level': dict(handler.dropped)
+            }
+
+def file_handler(path, log_format=LOG_FORMAT, text_format=TEXT_FORMAT):
+    handler = RotatingLogFile(path)
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(text_format))
+    return handler
+
+def configured_files(pipeline):
+    return {getattr(handler, 'baseFilename', None) for _, handler in pipeline.handlers}
+
+def get_pipeline():
+    """
+    The process-wide pipeline, started on first use and drained at exit
+    """
+    global _pipeline
+    with _lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline()
+            _pipeline.start()
+            atexit.register(_pipeline.stop)
+        return _pipeline
+
+def setup_logging(log_file=LOG_FILE, console=False, level=logging.INFO):
+    """
+    Send the root logger's records through the pipeline to a rotated log
+    file, and to the console if asked. Calling it again only adds what is missing.
+    """
+    pipeline = get_pipeline()
+    root = logging.getLogger()
+    root.setLevel(level)
+    if log_file and os.path.abspath(log_file) not in configured_files(pipeline):
+        pipeline.add_handler(file_handler(log_file))
+    if console and not any(type(handler) is logging.StreamHandler for _, handler in pipeline.handlers):
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+        pipeline.add_handler(stream)
+    pipeline.attach(root)
+    return pipeline
+
+def route_to_file(logger, path, text_format=TEXT_FORMAT):
+    """
+    Give a logger its own file, written by the pipeline, instead of the main log
+    """
+    pipeline = get_pipeline()
+    logger.propagate = False
+    if os.path.abspath(path) not in configured_files(pipeline):
+        pipeline.add_handler(file_handler(path, text_format=text_format), logger.name)
+    pipeline.attach(logger)
+    return pipeline
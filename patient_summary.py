@@ -0,0 +1,225 @@
+import logging
+import threading
+import time
+
+PAID_STATUS = 'Paid'
+
+# Tables whose changes reach the summaries only through cascades or lookups;
+# a write to any of them marks the whole store stale
+CASCADING_TABLES = {
+    'BILLING_STATUS', 'APPOINTMENT_STATUS', 'TREATMENT_TYPE',
+    'STAFF', 'DENTIST', 'RECEPTIONIST', 'CLINIC', 'STAFF_ROLE'
+}
+
+def amount(value):
+    try:
+        return float(value) if value is not None and value != '' else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+class PatientSummary:
+    __slots__ = ('patient_id', 'name', 'appointments', 'treatment_total', 'billed', 'paid')
+
+    def __init__(self, patient_id, name):
+        self.patient_id = patient_id
+        self.name = name
+        self.appointments = 0
+        self.treatment_total = 0.0
+        self.billed = 0.0
+        self.paid = 0.0
+
+    @property
+    def outstanding(self):
+        return self.billed - self.paid
+
+    def as_row(self):
+        return (
+            self.patient_id, self.name, self.appointments, self.treatment_total,
+            self.billed, self.paid, self.outstanding
+        )
+
+class PatientSummaryStore:
+    """
+    Pre-aggregated per-patient totals: appointment count, treatment cost and
+    billed/paid/outstanding amounts. Built from one GROUP BY per table (so
+    treatments never multiply appointment counts), then kept current by the
+    application's write paths; anything it cannot patch marks it stale and
+    the next report rebuilds it.
+    """
+    REPORT_COLUMNS = [
+        'PATIENTID', 'NAME', 'TOTAL_APPOINTMENTS', 'TOTAL_TREATMENT_COST',
+        'TOTAL_BILLED', 'TOTAL_PAID', 'OUTSTANDING'
+    ]
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.summaries = {}
+        self.paid_status_ids = set()
+        self.loaded = False
+        self.loading = False
+        self.changed_while_loading = False
+        self.lock = threading.Lock()
+
+    def rebuild(self):
+        """
+        Recompute every summary from the database
+        """
+        started = time.perf_counter()
+        with self.lock:
+            self.loading = True
+            self.changed_while_loading = False
+        try:
+            summaries = {
+                patient_id: PatientSummary(patient_id, name)
+                for patient_id, name in self.fetch("SELECT PatientID, Name FROM Patient")
+            }
+            paid_status_ids = self.read_paid_status_ids()
+            self.apply_totals(summaries, paid_status_ids)
+        except Exception:
+            with self.lock:
+                self.loading = False
+            raise
+
+        with self.lock:
+            self.loading = False
+            self.summaries = summaries
+            self.paid_status_ids = paid_status_ids
+            # A write during the queries may or may not be in them; rebuild again next time
+            self.loaded = not self.changed_while_loading
+        logging.info(f"Patient summaries rebuilt for {len(summaries)} patients in {time.perf_counter() - started:.2f}s")
+
+    def refresh_patient(self, patient_id):
+        """
+        Recompute one patient's summary, after changes that cascade beyond a single row
+        """
+        rows = self.fetch("SELECT PatientID, Name FROM Patient WHERE PatientID = :patient_id",
+                          {'patient_id': patient_id})
+        summaries = {row[0]: PatientSummary(row[0], row[1]) for row in rows}
+        self.apply_totals(summaries, self.paid_status_ids, patient_id)
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+            self.summaries.pop(patient_id, None)
+            self.summaries.update(summaries)
+
+    def apply_totals(self, summaries, paid_status_ids, patient_id=None):
+        where = "WHERE PatientID = :patient_id" if patient_id is not None else ""
+        params = {'patient_id': patient_id} if patient_id is not None else None
+
+        for row_patient, count in self.fetch(
+                f"SELECT PatientID, COUNT(*) FROM Appointment {where} GROUP BY PatientID", params):
+            if row_patient in summaries:
+                summaries[row_patient].appointments = count
+
+        for row_patient, total in self.fetch(
+                f"SELECT PatientID, SUM(Cost) FROM Treatment {where} GROUP BY PatientID", params):
+            if row_patient in summaries:
+                summaries[row_patient].treatment_total = amount(total)
+
+        for row_patient, status_id, total in self.fetch(
+                f"SELECT PatientID, StatusID, SUM(Amount) FROM Billing {where} GROUP BY PatientID, StatusID",
+                params):
+            summary = summaries.get(row_patient)
+            if summary:
+                summary.billed += amount(total)
+                if status_id in paid_status_ids:
+                    summary.paid += amount(total)
+
+    def read_paid_status_ids(self):
+        rows = self.fetch("SELECT StatusID FROM Billing_Status WHERE StatusName = :status_name",
+                          {'status_name': PAID_STATUS})
+        return {row[0] for row in rows}
+
+    def fetch(self, query, params=None):
+        return self.db_manager.fetch_many(query, params)
+
+    def report(self):
+        """
+        Report rows, most appointments first; rebuilds the store if it is stale
+        """
+        if not self.loaded:
+            self.rebuild()
+        with self.lock:
+            summaries = list(self.summaries.values())
+        summaries.sort(key=lambda summary: summary.appointments, reverse=True)
+        return [summary.as_row() for summary in summaries]
+
+    def record_saved(self, table_name, values, old_values=None):
+        """
+        Apply an inserted row (or an update, given the old row) to the summaries.
+        values and old_values map upper-case column names to values.
+        """
+        table = table_name.upper()
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+                return
+            if not self.loaded:
+                return
+            if table in CASCADING_TABLES:
+                self.invalidate_locked()
+                return
+            if table == 'PATIENT' and old_values and old_values.get('PATIENTID') != values.get('PATIENTID'):
+                # A renumbered patient takes its history along; recount it
+                self.invalidate_locked()
+                return
+            if old_values and table != 'PATIENT':
+                self.apply_row(table, old_values, -1)
+            self.apply_row(table, values, 1)
+
+    def record_deleted(self, table_name, values):
+        """
+        Remove a deleted row's contribution; values is the row as it was loaded
+        """
+        table = table_name.upper()
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+                return
+            if not self.loaded:
+                return
+            if table in CASCADING_TABLES:
+                self.invalidate_locked()
+                return
+            if table != 'APPOINTMENT':
+                self.apply_row(table, values, -1)
+                return
+        # Its treatments and bills were deleted with it
+        self.refresh_patient(values.get('PATIENTID'))
+
+    def apply_row(self, table, values, sign):
+        patient_id = values.get('PATIENTID')
+        if table == 'PATIENT':
+            if sign > 0:
+                summary = self.summaries.get(patient_id)
+                if summary:
+                    summary.name = values.get('NAME')
+                else:
+                    self.summaries[patient_id] = PatientSummary(patient_id, values.get('NAME'))
+            else:
+                # The patient's appointments, treatments and bills cascade away with it
+                self.summaries.pop(patient_id, None)
+            return
+
+        summary = self.summaries.get(patient_id)
+        if summary is None:
+            return
+        if table == 'APPOINTMENT':
+            summary.appointments += sign
+        elif table == 'TREATMENT':
+            summary.treatment_total += sign * amount(values.get('COST'))
+        elif table == 'BILLING':
+            bill = sign * amount(values.get('AMOUNT'))
+            summary.billed += bill
+            if values.get('STATUSID') in self.paid_status_ids:
+                summary.paid += bill
+
+    def invalidate(self):
+        with self.lock:
+            self.invalidate_locked()
+
+    def invalidate_locked(self):
+        if self.loading:
+            self.changed_while_loading = True
+        self.loaded = False
+        self.summaries = {}
@@ -0,0 +1,90 @@
+import logging
+from config import INDEXES, DATE_COLUMNS
+
+class PhysicalDesign:
+    """
+    Brings a database up to the physical design in config: creates the
+    indexes in INDEXES and converts the VARCHAR2 date columns of older
+    schemas to DATE. Every step checks the data dictionary first, so
+    upgrading an up-to-date database does nothing.
+    """
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def missing_indexes(self):
+        existing = {name.upper() for name in self.db_manager.backend.index_names(self.fetch)}
+        return [
+            (name, table, columns) for name, table, columns in INDEXES
+            if name.upper() not in existing and self.db_manager.catalog.get(table)
+        ]
+
+    def create_indexes(self):
+        """
+        Create the configured indexes that do not exist yet; returns their names
+        """
+        created = []
+        connection = self.db_manager.get_connection()
+        cursor = connection.cursor()
+        try:
+            for name, table, columns in self.missing_indexes():
+                try:
+                    cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+                    created.append(name)
+                    logging.info(f"Created index {name} on {table}")
+                except self.db_manager.backend.DatabaseError as e:
+                    logging.error(f"Error creating index {name}: {e}")
+            connection.commit()
+        finally:
+            cursor.close()
+        return created
+
+    def pending_date_migrations(self):
+        """
+        (table, column) pairs still declared with a non-DATE type
+        """
+        pending = []
+        for table, columns in DATE_COLUMNS.items():
+            metadata = self.db_manager.catalog.get(table)
+            if not metadata:
+                continue
+            for name in columns:
+                column = metadata.column(name)
+                if column and column.data_type != 'DATE':
+                    pending.append((table, column.name))
+        return pending
+
+    def migrate_dates(self):
+        """
+        Convert pending date columns to DATE; returns the migrated (table, column) pairs
+        """
+        migrated = []
+        for table, column in self.pending_date_migrations():
+            # Earlier migrations may have changed this table's metadata
+            self.db_manager.catalog.invalidate()
+            metadata = self.db_manager.catalog.require(table)
+            self.db_manager.backend.migrate_date_column(self.db_manager.get_connection(), metadata, column)
+            migrated.append((table, column))
+            logging.info(f"Migrated {table}.{column} to DATE")
+        if migrated:
+            self.db_manager.catalog.invalidate()
+        return migrated
+
+    def upgrade(self):
+        """
+        Migrate date columns, then create missing indexes (a table rebuild
+        drops the indexes on it). Returns (migrated columns, created indexes).
+        """
+        migrated = self.migrate_dates()
+        return migrated, self.create_indexes()
+
+    def explain(self, query):
+        """
+        Execution plan of a query as text lines
+        """
+        return self.db_manager.backend.explain(
+            self.db_manager.get_connection(),
+            self.db_manager.statements.prepare(query)
+        )
+
+    def fetch(self, query, params=None):
+        return self.db_manager.fetch_many(query, params)
@@ -0,0 +1,198 @@
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import QUERY_WORKERS, RESULT_POLL_INTERVAL
+
+_local = threading.local()
+
+def current_token():
+    """
+    Return the cancel token of the job running on this thread, if any
+    """
+    return getattr(_local, 'token', None)
+
+def current_action():
+    """
+    Description of the job running on this thread (the GUI action behind
+    its queries), or the thread name outside background jobs
+    """
+    return getattr(_local, 'description', None) or threading.current_thread().name
+
+def report_progress(text):
+    """
+    Update the status text of the job running on this thread
+    """
+    executor = getattr(_local, 'executor', None)
+    if executor:
+        executor.results.put(('progress', _local.job_id, text))
+
+class QueryCancelled(Exception):
+    """
+    Raised inside a job once a newer job has superseded it
+    """
+
+class CancelToken:
+    def __init__(self):
+        self.cancelled = False
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        """
+        Mark the job as cancelled and interrupt any registered work
+        """
+        with self.lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks = list(self.callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.warning(f"Cancel callback failed: {e}")
+
+    def add_callback(self, callback):
+        with self.lock:
+            if not self.cancelled:
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    def check(self):
+        if self.cancelled:
+            raise QueryCancelled()
+
+class QueryExecutor:
+    """
+    Runs database work on worker threads and hands results back to the Tk
+    main loop, which polls for them with root.after.
+    """
+    def __init__(self, root, max_workers=QUERY_WORKERS, on_busy_change=None):
+        self.root = root
+        self.on_busy_change = on_busy_change
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db-worker')
+        self.results = queue.Queue()
+        self.job_ids = itertools.count(1)
+        # job id -> (future, token, description)
+        self.jobs = {}
+        # channel -> job id of the latest job submitted on it
+        self.channels = {}
+        self.polling = False
+        self.last_busy = []
+
+    def submit(self, func, *args, on_success=None, on_error=None, channel=None, description=None, **kwargs):
+        """
+        Run func(*args, **kwargs) on a worker thread.
+        Callbacks run on the Tk thread; a new job on the same channel
+        cancels the previous one and its result is discarded.
+        """
+        if channel:
+            self.cancel(channel)
+
+        job_id = next(self.job_ids)
+        token = CancelToken()
+        future = self.pool.submit(self.run_job, job_id, token, description, func, args, kwargs, on_success, on_error)
+        self.jobs[job_id] = (future, token, description)
+        if channel:
+            self.channels[channel] = job_id
+
+        self.notify_busy()
+        if not self.polling:
+            self.polling = True
+            self.root.after(RESULT_POLL_INTERVAL, self.poll_results)
+        return token
+
+    def run_job(self, job_id, token, description, func, args, kwargs, on_success, on_error):
+        _local.token = token
+        _local.executor = self
+        _local.job_id = job_id
+        _local.description = description
+        try:
+            token.check()
+            value = func(*args, **kwargs)
+            self.results.put((job_id, token, on_success, value, None))
+        except Exception as e:
+            self.results.put((job_id, token, on_error, None, e))
+        finally:
+            _local.token = None
+            _local.executor = None
+            _local.description = None
+
+    def poll_results(self):
+        """
+        Deliver finished jobs to their callbacks on the Tk thread
+        """
+        while True:
+            try:
+                message = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if message[0] == 'progress':
+                _, job_id, text = message
+                if job_id in self.jobs:
+                    future, token, _ = self.jobs[job_id]
+                    self.jobs[job_id] = (future, token, text)
+                continue
+
+            job_id, token, callback, value, error = message
+            self.jobs.pop(job_id, None)
+            if token.cancelled:
+                continue
+            try:
+                if error is not None:
+                    if callback:
+                        callback(error)
+                    else:
+                        logging.error(f"Background query failed: {error}")
+                elif callback:
+                    callback(value)
+            except Exception as e:
+                logging.error(f"Query callback failed: {e}")
+
+        self.notify_busy()
+        if self.jobs:
+            self.root.after(RESULT_POLL_INTERVAL, self.poll_results)
+        else:
+            self.polling = False
+
+    def cancel(self, channel):
+        """
+        Cancel the latest job submitted on a channel
+        """
+        job_id = self.channels.pop(channel, None)
+        job = self.jobs.get(job_id)
+        if not job:
+            return
+        future, token, description = job
+        token.cancel()
+        if future.cancel():
+            # Never started, so it will not report back
+            self.jobs.pop(job_id, None)
+            self.notify_busy()
+        logging.info(f"Cancelled superseded query: {description or channel}")
+
+    def notify_busy(self):
+        descriptions = [description for _, token, description in self.jobs.values()
+                        if not token.cancelled]
+        if self.on_busy_change and descriptions != self.last_busy:
+            self.last_busy = descriptions
+            self.on_busy_change(descriptions)
+
+    def shutdown(self):
+        """
+        Cancel outstanding jobs and stop the worker threads
+        """
+        for future, token, _ in list(self.jobs.values()):
+            token.cancel()
+            future.cancel()
+        self.jobs.clear()
+        self.pool.shutdown(wait=False)
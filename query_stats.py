@@ -0,0 +1,255 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from log_pipeline import route_to_file
+from config import SLOW_QUERY_MS, SLOW_QUERY_LOG
+
+# String and numeric literals, replaced by ? in fingerprints
+LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![:?\w])\d+(?:\.\d+)?\b")
+# IN lists of binds, which vary in length with the number of keys
+BIND_LISTS = re.compile(r"\(\s*[:?]\w+(?:\s*,\s*[:?]\w+)+\s*\)")
+WHITESPACE = re.compile(r"\s+")
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+BUCKET_BOUNDS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+def fingerprint(sql):
+    """
+    Normalized form of a statement, so executions of the same query shape
+    aggregate together whatever their literals or IN list length
+    """
+    text = WHITESPACE.sub(' ', sql).strip()
+    text = LITERALS.sub('?', text)
+    return BIND_LISTS.sub('(...)', text)
+
+def round_trips(rows, arraysize, prefetchrows):
+    """
+    Client-server round trips to execute a query and fetch rows: the execute
+    brings back up to prefetchrows rows, then each fetch brings arraysize
+    more until one comes back short and the end of the result is known
+    """
+    if rows < prefetchrows:
+        return 1
+    # The execute, the full fetches, and the short (possibly empty) last one
+    return 2 + (rows - prefetchrows) // arraysize
+
+def count_binds(params):
+    if not params:
+        return 0
+    return len(params)
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, value_ms):
+        for index, bound in enumerate(BUCKET_BOUNDS):
+            if value_ms <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, fraction):
+        """
+        Upper bound of the bucket holding the given percentile (None above the last bound)
+        """
+        total = sum(self.counts)
+        if not total:
+            return 0
+        threshold = fraction * total
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= threshold:
+                return BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else None
+        return None
+
+class StatementStats:
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.executions = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.round_trips = 0
+        self.histogram = Histogram()
+        self.actions = Counter()
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.executions if self.executions else 0.0
+
+class Execution:
+    """
+    One statement execution; its time includes the fetches made through the cursor
+    """
+    def __init__(self, sql, params, action):
+        self.sql = sql
+        self.binds = count_binds(params)
+        self.action = action
+        self.elapsed = 0.0
+        self.rows = 0
+        # Fetch sizes the statement ran with; None for statements without a result set
+        self.arraysize = None
+        self.prefetchrows = None
+        self.round_trips = 1
+        self.finished = False
+
+class QueryStats:
+    """
+    In-process statistics for every statement executed by DatabaseManager:
+    per-fingerprint counts, elapsed time histograms, rows fetched and the
+    GUI actions issuing them. Executions slower than SLOW_QUERY_MS are also
+    written to a separate slow-query log.
+    """
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, slow_query_log=SLOW_QUERY_LOG):
+        self.slow_query_ms = slow_query_ms
+        self.statements = {}
+        self.actions = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+        # Called with each finished Execution, outside the lock
+        self.listeners = []
+
+        self.slow_logger = logging.getLogger('slow_queries')
+        self.slow_logger.propagate = False
+        if slow_query_log:
+            route_to_file(self.slow_logger, slow_query_log, '%(asctime)s - %(message)s')
+            self.slow_logger.setLevel(logging.INFO)
+
+    def finish(self, execution, error=False):
+        """
+        Fold a finished execution into the statistics
+        """
+        if execution.finished:
+            return
+        execution.finished = True
+        elapsed_ms = execution.elapsed * 1000
+        key = fingerprint(execution.sql)
+        if execution.arraysize:
+            execution.round_trips = round_trips(execution.rows, execution.arraysize, execution.prefetchrows)
+
+        with self.lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = StatementStats(key)
+            stats.executions += 1
+            stats.errors += 1 if error else 0
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += execution.rows
+            stats.round_trips += execution.round_trips
+            stats.histogram.add(elapsed_ms)
+            stats.actions[execution.action] += 1
+
+            action = self.actions.setdefault(execution.action, [0, 0.0, 0])
+            action[0] += 1
+            action[1] += elapsed_ms
+            action[2] += execution.rows
+
+        for listener in self.listeners:
+            listener(execution)
+
+        if elapsed_ms >= self.slow_query_ms:
+            sql = WHITESPACE.sub(' ', execution.sql).strip()
+            self.slow_logger.info(
+                f"{elapsed_ms:.1f} ms | {execution.rows} rows | {execution.round_trips} round trips | "
+                f"{execution.binds} binds | {execution.action} | {sql}",
+                extra={
+                    'action': execution.action, 'latency_ms': round(elapsed_ms, 1), 'rows': execution.rows,
+                    'round_trips': execution.round_trips, 'binds': execution.binds, 'sql': sql
+                }
+            )
+
+    def top_statements(self, limit=20):
+        """
+        Statement statistics with the most total time first
+        """
+        with self.lock:
+            statements = sorted(self.statements.values(), key=lambda stats: stats.total_ms, reverse=True)
+        return statements[:limit]
+
+    def by_action(self):
+        """
+        [(action, executions, total ms, rows)] with the busiest action first
+        """
+        with self.lock:
+            actions = [(name, *totals) for name, totals in self.actions.items()]
+        return sorted(actions, key=lambda action: action[2], reverse=True)
+
+    def reset(self):
+        with self.lock:
+            self.statements = {}
+            self.actions = {}
+            self.started = time.time()
+
+class InstrumentedCursor:
+    """
+    Wraps a driver cursor to time its fetches and count the rows they return.
+    The execution is recorded once the result is exhausted or the cursor closed.
+    """
+    def __init__(self, cursor, stats, execution):
+        object.__setattr__(self, 'cursor', cursor)
+        object.__setattr__(self, 'stats', stats)
+        object.__setattr__(self, 'execution', execution)
+        if cursor.description is None:
+            # No result set (DML or DDL): nothing left to fetch
+            execution.rows = max(cursor.rowcount, 0)
+            execution.arraysize = None
+            stats.finish(execution)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __setattr__(self, name, value):
+        if name == 'arraysize':
+            # Keep the round trip accounting in step with callers resizing fetches
+            self.execution.arraysize = value
+        setattr(self.cursor, name, value)
+
+    def timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            self.execution.elapsed += time.perf_counter() - started
+
+    def fetchone(self):
+        row = self.timed_fetch(self.cursor.fetchone)
+        if row is None:
+            self.stats.finish(self.execution)
+        else:
+            self.execution.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self.timed_fetch(self.cursor.fetchmany, size or self.cursor.arraysize)
+        self.execution.rows += len(rows)
+        if not rows:
+            self.stats.finish(self.execution)
+        return rows
+
+    def fetchall(self):
+        rows = self.timed_fetch(self.cursor.fetchall)
+        self.execution.rows += len(rows)
+        self.stats.finish(self.execution)
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self.stats.finish(self.execution)
+        self.cursor.close()
+
+    def __del__(self):
+        # Cursors dropped without being exhausted or closed still count
+        self.stats.finish(self.execution)
@@ -0,0 +1,312 @@
+import sys
+from array import array
+
+# Stand-ins for NULL in integer and float arrays
+NULL_INT = -2 ** 63
+NAN = float('nan')
+# Integers a float array holds exactly
+FLOAT_EXACT = 2 ** 53
+# A text column stays dictionary-encoded while its distinct values are at
+# most this fraction of its rows (checked once it has DICTIONARY_MIN_ROWS)
+DICTIONARY_MAX_RATIO = 0.5
+DICTIONARY_MIN_ROWS = 1000
+
+class NumberColumn:
+    """
+    Numbers in a typed array: 8-byte integers until the first float
+    arrives, then 8-byte floats (integral values still read back as ints,
+    as the driver returns them). A value the array cannot hold exactly
+    turns the column into a plain list.
+    """
+    def __init__(self):
+        self.values = array('q')
+        self.plain = None
+
+    def encode(self, value):
+        """
+        Array item for value, or None when the array cannot hold it
+        """
+        if value is None:
+            return NULL_INT if self.values.typecode == 'q' else NAN
+        if self.values.typecode == 'q' and type(value) is int and NULL_INT < value < 2 ** 63:
+            return value
+        if type(value) is float or (type(value) is int and -FLOAT_EXACT <= value <= FLOAT_EXACT):
+            if self.values.typecode == 'q':
+                if any(item != NULL_INT and not -FLOAT_EXACT <= item <= FLOAT_EXACT for item in self.values):
+                    return None
+                self.values = array('d', [NAN if item == NULL_INT else float(item) for item in self.values])
+            return float(value)
+        return None
+
+    def decode(self, item):
+        if self.values.typecode == 'q':
+            return None if item == NULL_INT else item
+        if item != item:
+            return None
+        return int(item) if item.is_integer() else item
+
+    def to_plain(self):
+        self.plain = self.values_list()
+        self.values = None
+
+    def get(self, position):
+        if self.plain is not None:
+            return self.plain[position]
+        return self.decode(self.values[position])
+
+    def append(self, value):
+        if self.plain is None:
+            item = self.encode(value)
+            if item is not None:
+                self.values.append(item)
+                return
+            self.to_plain()
+        self.plain.append(value)
+
+    def extend(self, values):
+        if self.plain is None:
+            before = len(self.values)
+            if self.values.typecode == 'q':
+                try:
+                    # A page of plain ints goes in as one array operation
+                    self.values.extend(values)
+                    return
+                except (TypeError, OverflowError):
+                    del self.values[before:]
+            for value in values:
+                self.append(value)
+            return
+        self.plain.extend(values)
+
+    def values_at(self, positions):
+        if self.plain is not None:
+            plain = self.plain
+            return [plain[position] for position in positions]
+        values, decode = self.values, self.decode
+        return [decode(values[position]) for position in positions]
+
+    def set(self, position, value):
+        if self.plain is None:
+            item = self.encode(value)
+            if item is not None:
+                self.values[position] = item
+                return
+            self.to_plain()
+        self.plain[position] = value
+
+    def insert(self, position, value):
+        if self.plain is None:
+            item = self.encode(value)
+            if item is not None:
+                self.values.insert(position, item)
+                return
+            self.to_plain()
+        self.plain.insert(position, value)
+
+    def delete(self, position):
+        if self.plain is not None:
+            del self.plain[position]
+        else:
+            del self.values[position]
+
+    def values_list(self):
+        if self.plain is not None:
+            return list(self.plain)
+        decode = self.decode
+        return [decode(item) for item in self.values]
+
+    def memory(self):
+        if self.plain is not None:
+            return sys.getsizeof(self.plain) + sum(sys.getsizeof(value) for value in self.plain)
+        return sys.getsizeof(self.values)
+
+class TextColumn:
+    """
+    Strings dictionary-encoded as array indexes into a list of distinct
+    values, so repetitive IDs such as StatusID or StaffID cost two or four
+    bytes a row. Columns that turn out mostly unique fall back to a plain list.
+    """
+    def __init__(self):
+        self.codes = array('H')
+        self.distinct = []
+        self.lookup = {}
+        self.plain = None
+
+    def code(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.distinct)
+            self.distinct.append(value)
+            if code == 0x10000 and self.codes.typecode == 'H':
+                self.codes = array('I', self.codes)
+        return code
+
+    def check_cardinality(self):
+        rows = len(self.codes)
+        if rows >= DICTIONARY_MIN_ROWS and len(self.distinct) > rows * DICTIONARY_MAX_RATIO:
+            self.plain = self.values_list()
+            self.codes, self.distinct, self.lookup = None, None, None
+
+    def get(self, position):
+        if self.plain is not None:
+            return self.plain[position]
+        return self.distinct[self.codes[position]]
+
+    def append(self, value):
+        if self.plain is not None:
+            self.plain.append(value)
+            return
+        self.codes.append(self.code(value))
+        if len(self.codes) == DICTIONARY_MIN_ROWS or len(self.codes) % 8192 == 0:
+            self.check_cardinality()
+
+    def extend(self, values):
+        if self.plain is not None:
+            self.plain.extend(values)
+            return
+        lookup, code = self.lookup, self.code
+        codes = [lookup[value] if value in lookup else code(value) for value in values]
+        self.codes.extend(codes)
+        self.check_cardinality()
+
+    def values_at(self, positions):
+        if self.plain is not None:
+            plain = self.plain
+            return [plain[position] for position in positions]
+        codes, distinct = self.codes, self.distinct
+        return [distinct[codes[position]] for position in positions]
+
+    def set(self, position, value):
+        if self.plain is not None:
+            self.plain[position] = value
+        else:
+            self.codes[position] = self.code(value)
+
+    def insert(self, position, value):
+        if self.plain is not None:
+            self.plain.insert(position, value)
+        else:
+            self.codes.insert(position, self.code(value))
+
+    def delete(self, position):
+        if self.plain is not None:
+            del self.plain[position]
+        else:
+            del self.codes[position]
+
+    def values_list(self):
+        if self.plain is not None:
+            return list(self.plain)
+        distinct = self.distinct
+        return [distinct[code] for code in self.codes]
+
+    def memory(self):
+        if self.plain is not None:
+            return sys.getsizeof(self.plain) + sum(sys.getsizeof(value) for value in self.plain)
+        return (sys.getsizeof(self.codes) + sys.getsizeof(self.distinct) + sys.getsizeof(self.lookup)
+                + sum(sys.getsizeof(value) for value in self.distinct))
+
+class ResultStore:
+    """
+    Column-oriented store for the rows of a result, with the list interface
+    the table view uses (len, indexing and slicing give row tuples, plus
+    insert, assignment and deletion). Numeric columns are typed arrays and
+    text columns are dictionary-encoded where their values repeat.
+    """
+    def __init__(self, column_types):
+        self.column_types = column_types
+        self.columns = [NumberColumn() if kind == 'number' else TextColumn() for kind in column_types]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield self.row(position)
+
+    def row(self, position):
+        return tuple([column.get(position) for column in self.columns])
+
+    def value(self, position, index):
+        return self.columns[index].get(position)
+
+    def rows_at(self, positions):
+        """
+        Row tuples at the given positions, gathered a column at a time
+        """
+        return list(zip(*[column.values_at(positions) for column in self.columns]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.rows_at(range(*index.indices(self.count)))
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("result row out of range")
+        return self.row(index)
+
+    def __setitem__(self, position, row):
+        for column, value in zip(self.columns, row):
+            column.set(position, value)
+
+    def __delitem__(self, position):
+        for column in self.columns:
+            column.delete(position)
+        self.count -= 1
+
+    def append(self, row):
+        for column, value in zip(self.columns, row):
+            column.append(value)
+        self.count += 1
+
+    def extend(self, rows):
+        """
+        Append rows column by column
+        """
+        if not rows:
+            return
+        for index, column in enumerate(self.columns):
+            column.extend([row[index] for row in rows])
+        self.count += len(rows)
+
+    def insert(self, position, row):
+        for column, value in zip(self.columns, row):
+            column.insert(position, value)
+        self.count += 1
+
+    def column_values(self, index):
+        """
+        Decoded values of one column, in row order
+        """
+        return self.columns[index].values_list()
+
+    def memory(self):
+        """
+        Approximate bytes held by the store
+        """
+        return sys.getsizeof(self) + sum(column.memory() for column in self.columns)
+
+    def bytes_per_row(self):
+        return self.memory() / self.count if self.count else 0.0
+
+class OrderedRows:
+    """
+    Read-only sequence of a store's rows in a given order of positions,
+    building each row tuple only when it is read
+    """
+    def __init__(self, store, positions):
+        self.store = store
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        for position in self.positions:
+            yield self.store.row(position)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.store.rows_at(self.positions[index])
+        return self.store.row(self.positions[index])
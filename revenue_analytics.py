@@ -0,0 +1,435 @@
+import logging
+import threading
+import time
+from datetime import date
+from patient_summary import PAID_STATUS
+from config import PAGE_SIZE, ANALYTICS_CHUNK_ROWS, ANALYTICS_DAILY_DAYS, OVERDUE_AGING_DAYS
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional: without NumPy the Revenue tab says how to enable it
+    np = None
+
+OVERDUE_STATUS = 'Overdue'
+
+VIEWS = [
+    'Monthly revenue', 'Daily revenue', 'Revenue by dentist',
+    'Revenue by clinic', 'Overdue aging', 'Treatment mix'
+]
+# View columns holding amounts of money
+MONEY_COLUMNS = {'Billed', 'Paid', 'Outstanding', 'Amount', 'Base Price', 'Total Cost', 'Average Cost'}
+
+# Each bill with the dentist of its appointment and that dentist's clinic
+BILLING_QUERY = (
+    "SELECT b.BillingID, b.Billing_Date, b.Amount, b.StatusID, a.StaffID, s.ClinicID "
+    "FROM Billing b "
+    "LEFT JOIN Appointment a ON a.AppointmentID = b.AppointmentID "
+    "LEFT JOIN Staff s ON s.StaffID = a.StaffID"
+)
+TREATMENT_QUERY = "SELECT t.TreatmentID, t.TreatmentTypeID, t.Cost FROM Treatment t"
+
+# Tables whose inserted rows are appended to the arrays, with their key columns
+APPENDED_TABLES = {'BILLING': ('b.BillingID', 'BILLINGID'), 'TREATMENT': ('t.TreatmentID', 'TREATMENTID')}
+# Tables whose updates change amounts, statuses or the dentist and clinic of a bill
+UPDATED_TABLES = {'BILLING', 'TREATMENT', 'APPOINTMENT', 'STAFF'}
+# The only table whose deletes cannot cascade into bills or treatments
+UNAFFECTED_TABLES = {'MEDICAL_RECORD'}
+
+def available():
+    return np is not None
+
+def day_numbers(dates):
+    """
+    Days since 1970-01-01 for DATE_FORMAT texts (or dates)
+    """
+    try:
+        days = np.array(dates, dtype='datetime64[D]')
+    except (TypeError, ValueError):
+        # Texts NumPy does not parse whole; the first ten characters are the date
+        days = np.array([str(value)[:10] for value in dates], dtype='datetime64[D]')
+    return days.astype(np.int32)
+
+def amounts(values):
+    # None becomes NaN in a float array, and then 0
+    return np.nan_to_num(np.array(values, dtype=np.float64), copy=False)
+
+class Categories:
+    """
+    Dictionary encoding of an ID column: each distinct value gets the next integer code
+    """
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, values):
+        codes = self.codes
+        for value in set(values).difference(codes):
+            codes[value] = len(self.values)
+            self.values.append(value)
+        return np.array(list(map(codes.__getitem__, values)), dtype=np.int32)
+
+    def mask(self, codes, values):
+        """
+        Boolean array of which codes stand for one of values, by table lookup
+        """
+        table = np.array([value in values for value in self.values], dtype=bool)
+        return table[codes] if len(table) else np.zeros(len(codes), dtype=bool)
+
+class ColumnArrays:
+    """
+    Named NumPy columns that grow a chunk at a time; consolidate() joins the
+    chunks into one array per column
+    """
+    def __init__(self, dtypes):
+        self.dtypes = dtypes
+        self.chunks = {name: [] for name in dtypes}
+        self.count = 0
+
+    def append(self, columns):
+        for name, dtype in self.dtypes.items():
+            self.chunks[name].append(np.asarray(columns[name], dtype=dtype))
+        self.count += len(columns[name])
+
+    def consolidate(self):
+        for name, chunks in self.chunks.items():
+            if len(chunks) != 1:
+                chunks[:] = [np.concatenate(chunks) if chunks else np.empty(0, dtype=self.dtypes[name])]
+
+    def __getitem__(self, name):
+        return self.chunks[name][0]
+
+class RevenueReport:
+    """
+    The analytics views as {name: (columns, rows)}, with what they were computed from
+    """
+    def __init__(self, views, bills, treatments, load_seconds, compute_seconds):
+        self.views = views
+        self.bills = bills
+        self.treatments = treatments
+        self.load_seconds = load_seconds
+        self.compute_seconds = compute_seconds
+
+    def summary(self):
+        text = f"{self.bills:,} bills and {self.treatments:,} treatments, computed in {self.compute_seconds * 1000:.0f} ms"
+        if self.load_seconds:
+            text += f" (loaded in {self.load_seconds:.2f}s)"
+        return text
+
+class RevenueAnalytics:
+    """
+    Billing and treatment facts held as NumPy columns (dates as day numbers,
+    amounts as floats, IDs dictionary-encoded), loaded in bulk once and then
+    extended with the rows inserted since. Every view is a few bincount
+    group-bys over those columns. Updates and cascading deletes mark the
+    arrays stale, and the next report reloads them.
+    """
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.bills = None
+        self.treatments = None
+        self.loaded = False
+        self.loading = False
+        self.changed_while_loading = False
+        self.pending = {table: [] for table in APPENDED_TABLES}
+        # Guards the flags and pending keys, which the write paths touch
+        self.lock = threading.Lock()
+        # One report at a time reads and extends the arrays
+        self.report_lock = threading.Lock()
+
+    def new_arrays(self):
+        self.statuses, self.dentists, self.clinics, self.types = Categories(), Categories(), Categories(), Categories()
+        bills = ColumnArrays({
+            'day': np.int32, 'amount': np.float64, 'status': np.int32, 'dentist': np.int32, 'clinic': np.int32
+        })
+        treatments = ColumnArrays({'type': np.int32, 'cost': np.float64})
+        return bills, treatments
+
+    def billing_columns(self, rows):
+        _, dates, values, statuses, dentists, clinics = zip(*rows)
+        return {
+            'day': day_numbers(dates),
+            'amount': amounts(values),
+            'status': self.statuses.encode(statuses),
+            'dentist': self.dentists.encode(dentists),
+            'clinic': self.clinics.encode(clinics)
+        }
+
+    def treatment_columns(self, rows):
+        _, types, costs = zip(*rows)
+        return {'type': self.types.encode(types), 'cost': amounts(costs)}
+
+    def load(self, query, params, table, convert, arrays):
+        """
+        Stream a query into arrays, converting ANALYTICS_CHUNK_ROWS rows at a time
+        """
+        rows = []
+        with self.db_manager.execute(query, params, table=table) as cursor:
+            while True:
+                fetched = cursor.fetchmany()
+                rows.extend(fetched)
+                if rows and (not fetched or len(rows) >= ANALYTICS_CHUNK_ROWS):
+                    arrays.append(convert(rows))
+                    rows = []
+                if not fetched:
+                    break
+
+    def rebuild(self):
+        """
+        Load every bill and treatment into new arrays
+        """
+        started = time.perf_counter()
+        with self.lock:
+            self.loading = True
+            self.changed_while_loading = False
+            self.pending = {table: [] for table in APPENDED_TABLES}
+        try:
+            bills, treatments = self.new_arrays()
+            self.load(BILLING_QUERY, None, 'Billing', self.billing_columns, bills)
+            self.load(TREATMENT_QUERY, None, 'Treatment', self.treatment_columns, treatments)
+            bills.consolidate()
+            treatments.consolidate()
+        except Exception:
+            with self.lock:
+                self.loading = False
+            raise
+        with self.lock:
+            self.loading = False
+            self.bills, self.treatments = bills, treatments
+            # A write during the load may or may not be in it; load again next time
+            self.loaded = not self.changed_while_loading
+        elapsed = time.perf_counter() - started
+        logging.info(f"Revenue analytics loaded {bills.count} bills and {treatments.count} treatments in {elapsed:.2f}s")
+        return elapsed
+
+    def append_pending(self):
+        """
+        Fetch the rows inserted since the last report and append them
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {table: [] for table in APPENDED_TABLES}
+        for table, keys in pending.items():
+            if not keys:
+                continue
+            query, convert, arrays = (
+                (BILLING_QUERY, self.billing_columns, self.bills) if table == 'BILLING'
+                else (TREATMENT_QUERY, self.treatment_columns, self.treatments)
+            )
+            key_column = APPENDED_TABLES[table][0]
+            for start in range(0, len(keys), PAGE_SIZE):
+                chunk = keys[start:start + PAGE_SIZE]
+                # Padded like fetch_by_keys, so every chunk shares one statement text
+                padded = chunk + [chunk[-1]] * (-len(chunk) % PAGE_SIZE)
+                binds = {f"k{i+1}": key for i, key in enumerate(padded)}
+                placeholders = ', '.join(f":{name}" for name in binds)
+                self.load(f"{query} WHERE {key_column} IN ({placeholders})", binds, table, convert, arrays)
+            arrays.consolidate()
+
+    def report(self, today=None):
+        """
+        RevenueReport of every view, loading or extending the arrays first
+        """
+        if not available():
+            raise RuntimeError("Revenue analytics needs NumPy (pip install numpy)")
+        with self.report_lock:
+            load_seconds = 0.0
+            if not self.loaded:
+                load_seconds = self.rebuild()
+            else:
+                self.append_pending()
+            started = time.perf_counter()
+            names = self.read_names()
+            views = self.compute(names, today or date.today())
+            return RevenueReport(
+                views, self.bills.count, self.treatments.count, load_seconds, time.perf_counter() - started
+            )
+
+    def read_names(self):
+        """
+        Names and lookups from the small tables, read fresh for every report
+        """
+        fetch = self.db_manager.fetch_many
+        return {
+            'staff': {row[0]: (row[1], row[2]) for row in fetch("SELECT StaffID, Name, ClinicID FROM Staff")},
+            'clinics': dict(fetch("SELECT ClinicID, Name FROM Clinic")),
+            'statuses': dict(fetch("SELECT StatusID, StatusName FROM Billing_Status")),
+            'types': {row[0]: (row[1], row[2]) for row in fetch(
+                "SELECT TreatmentTypeID, TreatmentName, BasePrice FROM Treatment_Type")}
+        }
+
+    def compute(self, names, today):
+        bills, treatments = self.bills, self.treatments
+        days, amount = bills['day'], bills['amount']
+        statuses = names['statuses']
+        paid = amount * self.statuses.mask(
+            bills['status'], {status for status, name in statuses.items() if name == PAID_STATUS})
+        overdue = self.statuses.mask(
+            bills['status'], {status for status, name in statuses.items() if name == OVERDUE_STATUS})
+
+        views = {}
+        # Both date views are built from per-day totals, so the full columns are grouped once
+        by_day = day_totals(days, amount, paid)
+        views['Monthly revenue'] = monthly_revenue(*by_day)
+        views['Daily revenue'] = daily_revenue(*by_day)
+
+        staff, clinics = names['staff'], names['clinics']
+        def dentist_labels(staff_id):
+            name, clinic_id = staff.get(staff_id, ('', None))
+            return (staff_id or '', name, clinics.get(clinic_id, clinic_id or ''))
+        views['Revenue by dentist'] = (
+            ['Dentist ID', 'Dentist', 'Clinic', 'Bills', 'Billed', 'Paid', 'Outstanding'],
+            grouped_revenue(bills['dentist'], self.dentists.values, amount, paid, dentist_labels)
+        )
+        views['Revenue by clinic'] = (
+            ['Clinic ID', 'Clinic', 'Bills', 'Billed', 'Paid', 'Outstanding'],
+            grouped_revenue(bills['clinic'], self.clinics.values, amount, paid,
+                            lambda clinic_id: (clinic_id or '', clinics.get(clinic_id, '')))
+        )
+        views['Overdue aging'] = overdue_aging(days[overdue], amount[overdue], today)
+        views['Treatment mix'] = treatment_mix(treatments['type'], treatments['cost'], self.types.values, names['types'])
+        return views
+
+    def record_saved(self, table_name, values, old_values=None):
+        """
+        Queue an inserted bill or treatment for appending; updates that move
+        amounts between groups mark the arrays stale
+        """
+        table = table_name.upper()
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+            elif not self.loaded:
+                return
+            elif table in APPENDED_TABLES and not old_values:
+                self.pending[table].append(values.get(APPENDED_TABLES[table][1]))
+            elif table in UPDATED_TABLES and old_values:
+                self.loaded = False
+
+    def record_inserted(self, table_name, keys):
+        """
+        Queue rows inserted in bulk (by an import) for appending
+        """
+        table = table_name.upper()
+        if table not in APPENDED_TABLES:
+            return
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+            elif self.loaded:
+                self.pending[table].extend(keys)
+
+    def record_deleted(self, table_name, values):
+        if table_name.upper() in UNAFFECTED_TABLES:
+            return
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+            self.loaded = False
+
+    def invalidate(self):
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+            self.loaded = False
+
+def revenue_rows(labels, counts, billed, paid):
+    return [
+        label + (int(count), round(float(total), 2), round(float(received), 2), round(float(total - received), 2))
+        for label, count, total, received in zip(labels, counts, billed, paid)
+    ]
+
+def day_totals(days, amount, paid):
+    """
+    (first day, bills, billed, paid) with one entry per day from the first bill to the last
+    """
+    if not len(days):
+        return 0, np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    first = int(days.min())
+    offsets = days - first
+    return first, np.bincount(offsets), np.bincount(offsets, weights=amount), np.bincount(offsets, weights=paid)
+
+def monthly_revenue(first, counts, billed, paid):
+    columns = ['Month', 'Bills', 'Billed', 'Paid', 'Outstanding']
+    if not len(counts):
+        return columns, []
+    # Regrouping the per-day totals only touches one entry per day
+    months = (np.arange(first, first + len(counts)).astype('datetime64[D]')
+              .astype('datetime64[M]').astype(np.int64))
+    first_month = int(months[0])
+    offsets = months - first_month
+    month_counts = np.bincount(offsets, weights=counts).astype(np.int64)
+    used = np.flatnonzero(month_counts)
+    labels = [(str(np.datetime64(first_month + int(offset), 'M')),) for offset in used]
+    return columns, revenue_rows(
+        labels, month_counts[used],
+        np.bincount(offsets, weights=billed)[used], np.bincount(offsets, weights=paid)[used]
+    )
+
+def daily_revenue(first, counts, billed, paid, span=ANALYTICS_DAILY_DAYS):
+    """
+    Every day of the last span days up to the latest bill, empty days included
+    """
+    columns = ['Date', 'Bills', 'Billed', 'Paid', 'Outstanding']
+    if not len(counts):
+        return columns, []
+    start = max(len(counts) - span, 0)
+    labels = [(str(np.datetime64(first + offset, 'D')),) for offset in range(start, len(counts))]
+    return columns, revenue_rows(labels, counts[start:], billed[start:], paid[start:])
+
+def grouped_revenue(codes, values, amount, paid, label):
+    """
+    Revenue rows per code, highest billed first; label(value) gives the leading columns
+    """
+    size = len(values)
+    counts = np.bincount(codes, minlength=size)
+    billed = np.bincount(codes, weights=amount, minlength=size)
+    received = np.bincount(codes, weights=paid, minlength=size)
+    used = np.flatnonzero(counts)
+    used = used[np.argsort(-billed[used], kind='stable')]
+    return revenue_rows([label(values[code]) for code in used], counts[used], billed[used], received[used])
+
+def aging_labels(limits):
+    labels, lower = [], 0
+    for limit in limits:
+        labels.append(f"{lower}-{limit} days")
+        lower = limit + 1
+    return labels + [f"Over {limits[-1]} days"]
+
+def overdue_aging(days, amount, today, limits=OVERDUE_AGING_DAYS):
+    """
+    Overdue bills by days since billing, in buckets ending at each limit
+    """
+    columns = ['Age', 'Bills', 'Amount', 'Share %']
+    age = int(np.datetime64(today, 'D').astype(np.int64)) - days.astype(np.int64)
+    buckets = np.searchsorted(np.array(limits), age, side='left')
+    size = len(limits) + 1
+    counts = np.bincount(buckets, minlength=size)
+    totals = np.bincount(buckets, weights=amount, minlength=size)
+    overall = totals.sum()
+    rows = [
+        (label, int(count), round(float(total), 2), round(float(total / overall * 100), 1) if overall else 0.0)
+        for label, count, total in zip(aging_labels(limits), counts, totals)
+    ]
+    rows.append(('Total', int(counts.sum()), round(float(overall), 2), 100.0 if overall else 0.0))
+    return columns, rows
+
+def treatment_mix(types, cost, values, names):
+    """
+    Count and cost of each treatment type, highest total cost first
+    """
+    columns = ['Type ID', 'Treatment', 'Base Price', 'Treatments', 'Total Cost', 'Average Cost', 'Share %']
+    size = len(values)
+    counts = np.bincount(types, minlength=size)
+    totals = np.bincount(types, weights=cost, minlength=size)
+    overall = totals.sum()
+    used = np.flatnonzero(counts)
+    used = used[np.argsort(-totals[used], kind='stable')]
+    rows = []
+    for code in used:
+        name, base_price = names.get(values[code], ('', None))
+        count, total = int(counts[code]), float(totals[code])
+        rows.append((
+            values[code], name, base_price, count, round(total, 2), round(total / count, 2),
+            round(total / float(overall) * 100, 1) if overall else 0.0
+        ))
+    return columns, rows
@@ -0,0 +1,354 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime
+from config import SLOT_MINUTES, SCHEDULE_HORIZON_DAYS
+
+CANCELLED_STATUS = 'Cancelled'
+DAY_NAMES = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+# Appointment_Time as the application stores it, e.g. 09:00AM
+TIME_FORMAT = '%I:%M%p'
+
+# One "days hours" part of a schedule, e.g. "Mon-Fri 9AM-5PM" or "Sat 10:30AM-2PM"
+SCHEDULE_PART = re.compile(
+    r"^\s*(?P<days>[A-Za-z][A-Za-z,\s-]*?)\s+"
+    r"(?P<start>\d{1,2}(?::\d{2})?\s*(?:AM|PM)?)\s*-\s*(?P<end>\d{1,2}(?::\d{2})?\s*(?:AM|PM)?)\s*$",
+    re.IGNORECASE
+)
+CLOCK_TIME = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*(AM|PM)?$", re.IGNORECASE)
+
+# Tables whose deletes cascade to appointments or dentists
+CASCADING_TABLES = {
+    'PATIENT', 'STAFF', 'RECEPTIONIST', 'CLINIC', 'STAFF_ROLE',
+    'APPOINTMENT_STATUS', 'DENTIST_SPECIALIZATION'
+}
+
+def minutes_of(text):
+    """
+    Minutes after midnight for 9AM, 9:30AM, 12PM or 17:00; None if unreadable
+    """
+    match = CLOCK_TIME.match(text.strip())
+    if not match:
+        return None
+    hour, minute, half = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or '').upper()
+    if half:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if half == 'PM' else 0)
+    if hour > 24 or minute > 59 or hour * 60 + minute > 24 * 60:
+        return None
+    return hour * 60 + minute
+
+def weekdays_of(text):
+    """
+    Weekday numbers (Monday 0) for "Mon-Fri", "Mon, Wed, Fri" or "Fri-Mon"; None if unreadable
+    """
+    days = set()
+    for item in text.split(','):
+        ends = [name.strip()[:3].upper() for name in item.split('-')]
+        if not 1 <= len(ends) <= 2 or any(end not in DAY_NAMES for end in ends):
+            return None
+        first, last = DAY_NAMES.index(ends[0]), DAY_NAMES.index(ends[-1])
+        days.update(day % 7 for day in range(first, first + (last - first) % 7 + 1))
+    return days
+
+def parse_schedule(text, slot_minutes=SLOT_MINUTES):
+    """
+    Seven slot masks, Monday first, for a Dentist.Schedule text such as
+    "Mon-Fri 9AM-5PM" (parts may be joined with ';'). Bit i of a mask is
+    the slot starting i * slot_minutes after midnight, set when the slot
+    lies inside working hours. Unreadable parts are logged and left out.
+    """
+    masks = [0] * 7
+    for part in (text or '').split(';'):
+        if not part.strip():
+            continue
+        match = SCHEDULE_PART.match(part)
+        days = weekdays_of(match.group('days')) if match else None
+        start = minutes_of(match.group('start')) if match else None
+        end = minutes_of(match.group('end')) if match else None
+        if days is None or start is None or end is None or end <= start:
+            logging.warning(f"Schedule '{text}' not understood at '{part.strip()}'")
+            continue
+        # Slots that start and end within the working hours
+        first = -(-start // slot_minutes)
+        mask = 0
+        for slot in range(first, end // slot_minutes):
+            mask |= 1 << slot
+        for day in days:
+            masks[day] |= mask
+    return masks
+
+class DentistSchedule:
+    __slots__ = ('staff_id', 'name', 'specialization_id', 'schedule', 'hours')
+
+    def __init__(self, staff_id, name, specialization_id, schedule, slot_minutes=SLOT_MINUTES):
+        self.staff_id = staff_id
+        self.name = name
+        self.specialization_id = specialization_id
+        self.schedule = schedule
+        self.hours = parse_schedule(schedule, slot_minutes)
+
+class ScheduleIndex:
+    """
+    Working hours of every dentist as per-weekday slot masks, and the slots
+    their appointments take as per-day masks, so free slots are found with
+    bit operations instead of scanning the Appointment table. Built from
+    the database on first use, then kept current by the application's
+    write paths; deletes that cascade mark it stale and it is rebuilt.
+    """
+    def __init__(self, db_manager, slot_minutes=SLOT_MINUTES):
+        self.db_manager = db_manager
+        self.slot_minutes = slot_minutes
+        self.dentists = {}
+        # {specialization ID: dentists ordered by StaffID}
+        self.by_specialization = {}
+        self.specializations = {}
+        self.cancelled_status_ids = set()
+        # {StaffID: {date ordinal: mask of booked slots}}
+        self.booked = {}
+        # Bookings beyond the first of a slot, by (StaffID, date ordinal, slot)
+        self.double_booked = Counter()
+        self.slot_cache = {}
+        # Appointment_Time text of each slot of the day
+        self.slot_times = [
+            datetime(2000, 1, 1, slot * slot_minutes // 60, slot * slot_minutes % 60).strftime(TIME_FORMAT)
+            for slot in range(24 * 60 // slot_minutes)
+        ]
+        self.loaded = False
+        self.loading = False
+        self.changed_while_loading = False
+        self.lock = threading.Lock()
+
+    def rebuild(self):
+        """
+        Read every dentist and appointment and rebuild the masks
+        """
+        started = time.perf_counter()
+        with self.lock:
+            self.loading = True
+            self.changed_while_loading = False
+        try:
+            fetch = self.db_manager.fetch_many
+            specializations = dict(fetch("SELECT SpecializationID, SpecializationName FROM Dentist_Specialization"))
+            cancelled_status_ids = {
+                row[0] for row in fetch(
+                    "SELECT StatusID FROM Appointment_Status WHERE StatusName = :status_name",
+                    {'status_name': CANCELLED_STATUS}
+                )
+            }
+            dentists = {
+                row[0]: DentistSchedule(row[0], row[1], row[2], row[3], self.slot_minutes)
+                for row in fetch(
+                    "SELECT d.StaffID, s.Name, d.SpecializationID, d.Schedule "
+                    "FROM Dentist d JOIN Staff s ON s.StaffID = d.StaffID"
+                )
+            }
+            booked = {}
+            double_booked = Counter()
+            appointments = 0
+            for staff_id, appointment_date, appointment_time, status_id in self.db_manager.iterate(
+                    "SELECT StaffID, Appointment_Date, Appointment_Time, StatusID FROM Appointment",
+                    table='Appointment'):
+                if status_id not in cancelled_status_ids:
+                    self.mark_in(booked, double_booked, staff_id, appointment_date, appointment_time, 1)
+                    appointments += 1
+        except Exception:
+            with self.lock:
+                self.loading = False
+            raise
+
+        with self.lock:
+            self.loading = False
+            self.specializations = specializations
+            self.cancelled_status_ids = cancelled_status_ids
+            self.dentists = dentists
+            self.group_dentists()
+            self.booked = booked
+            self.double_booked = double_booked
+            # A write during the scan may or may not be in it; rebuild again next time
+            self.loaded = not self.changed_while_loading
+        logging.info(
+            f"Schedule index built for {len(dentists)} dentists and {appointments} appointments "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    def group_dentists(self):
+        groups = {}
+        for dentist in sorted(self.dentists.values(), key=lambda dentist: dentist.staff_id):
+            groups.setdefault(dentist.specialization_id, []).append(dentist)
+        self.by_specialization = groups
+
+    def slot_of(self, appointment_date, appointment_time):
+        """
+        (date ordinal, slot) of an appointment, or None if its date or time is unreadable
+        """
+        key = str(appointment_time).strip()
+        slot = self.slot_cache.get(key)
+        if slot is None:
+            minutes = minutes_of(key)
+            if minutes is None:
+                return None
+            slot = self.slot_cache[key] = minutes // self.slot_minutes
+        try:
+            ordinal = date.fromisoformat(str(appointment_date)[:10]).toordinal()
+        except ValueError:
+            return None
+        return ordinal, slot
+
+    def mark(self, staff_id, appointment_date, appointment_time, sign):
+        """
+        Book (sign 1) or release (sign -1) an appointment's slot; the lock is held
+        """
+        self.mark_in(self.booked, self.double_booked, staff_id, appointment_date, appointment_time, sign)
+
+    def mark_in(self, booked, double_booked, staff_id, appointment_date, appointment_time, sign):
+        position = self.slot_of(appointment_date, appointment_time)
+        if position is None:
+            return
+        ordinal, slot = position
+        days = booked.setdefault(staff_id, {})
+        bit = 1 << slot
+        key = (staff_id, ordinal, slot)
+        if sign > 0:
+            if days.get(ordinal, 0) & bit:
+                double_booked[key] += 1
+            else:
+                days[ordinal] = days.get(ordinal, 0) | bit
+        elif double_booked[key]:
+            double_booked[key] -= 1
+        else:
+            double_booked.pop(key, None)
+            remaining = days.get(ordinal, 0) & ~bit
+            if remaining:
+                days[ordinal] = remaining
+            else:
+                days.pop(ordinal, None)
+
+    def specialization_names(self):
+        if not self.loaded:
+            self.rebuild()
+        with self.lock:
+            return sorted(self.specializations.values())
+
+    def resolve(self, specialization):
+        """
+        SpecializationID for an ID or a name, ignoring case; None if unknown
+        """
+        wanted = str(specialization).strip().upper()
+        for specialization_id, name in self.specializations.items():
+            if wanted in (str(specialization_id).upper(), str(name).upper()):
+                return specialization_id
+        return None
+
+    def next_free_slots(self, specialization, count=5, after=None, horizon_days=SCHEDULE_HORIZON_DAYS):
+        """
+        The first count free slots starting at or after after (default now)
+        with any dentist of a specialization (ID or name), as (date, time,
+        StaffID, dentist name) in time order, ties by StaffID
+        """
+        if not self.loaded:
+            self.rebuild()
+        after = after or datetime.now()
+        with self.lock:
+            specialization_id = self.resolve(specialization)
+            if specialization_id is None:
+                raise ValueError(f"Unknown specialization {specialization}")
+            dentists = self.by_specialization.get(specialization_id, [])
+            if not dentists or not any(any(dentist.hours) for dentist in dentists):
+                return []
+
+            first_day = after.toordinal()
+            minutes = after.hour * 60 + after.minute + (1 if after.second or after.microsecond else 0)
+            # Slots already started on the first day are not offered
+            started_mask = (1 << -(-minutes // self.slot_minutes)) - 1
+            found = []
+            for ordinal in range(first_day, first_day + horizon_days):
+                weekday = (ordinal - 1) % 7
+                wanted = count - len(found)
+                day_slots = []
+                for dentist in dentists:
+                    free = dentist.hours[weekday]
+                    if not free:
+                        continue
+                    free &= ~self.booked.get(dentist.staff_id, {}).get(ordinal, 0)
+                    if ordinal == first_day:
+                        free &= ~started_mask
+                    taken = 0
+                    while free and taken < wanted:
+                        bit = free & -free
+                        day_slots.append((bit.bit_length() - 1, dentist))
+                        free ^= bit
+                        taken += 1
+                if day_slots:
+                    day_slots.sort(key=lambda item: (item[0], item[1].staff_id))
+                    found.extend((ordinal, slot, dentist) for slot, dentist in day_slots[:wanted])
+                    if len(found) >= count:
+                        break
+            return [self.describe(ordinal, slot, dentist) for ordinal, slot, dentist in found]
+
+    def describe(self, ordinal, slot, dentist):
+        return date.fromordinal(ordinal).isoformat(), self.slot_times[slot], dentist.staff_id, dentist.name
+
+    def record_saved(self, table_name, values, old_values=None):
+        """
+        Apply an inserted or updated appointment, dentist or staff name
+        """
+        table = table_name.upper()
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+                return
+            if not self.loaded:
+                return
+            if table == 'APPOINTMENT':
+                if old_values and old_values.get('STATUSID') not in self.cancelled_status_ids:
+                    self.mark(old_values.get('STAFFID'), old_values.get('APPOINTMENT_DATE'),
+                              old_values.get('APPOINTMENT_TIME'), -1)
+                if values.get('STATUSID') not in self.cancelled_status_ids:
+                    self.mark(values.get('STAFFID'), values.get('APPOINTMENT_DATE'), values.get('APPOINTMENT_TIME'), 1)
+            elif table == 'DENTIST':
+                staff_id = values.get('STAFFID')
+                previous = self.dentists.pop(old_values.get('STAFFID'), None) if old_values else None
+                # The name is on the Staff row, so it carries over only while the StaffID does
+                name = previous.name if previous is not None and previous.staff_id == staff_id else None
+                self.dentists[staff_id] = DentistSchedule(
+                    staff_id, name, values.get('SPECIALIZATIONID'), values.get('SCHEDULE'), self.slot_minutes
+                )
+                self.group_dentists()
+                if name is None:
+                    # A new dentist's name is on its Staff row
+                    self.loaded = False
+            elif table == 'STAFF' and values.get('STAFFID') in self.dentists:
+                self.dentists[values.get('STAFFID')].name = values.get('NAME')
+            elif table in ('APPOINTMENT_STATUS', 'DENTIST_SPECIALIZATION'):
+                self.loaded = False
+
+    def record_deleted(self, table_name, values):
+        """
+        Release a deleted appointment's slot; other deletes that reach
+        appointments or dentists mark the index stale
+        """
+        table = table_name.upper()
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+                return
+            if not self.loaded:
+                return
+            if table == 'APPOINTMENT':
+                if values.get('STATUSID') not in self.cancelled_status_ids:
+                    self.mark(values.get('STAFFID'), values.get('APPOINTMENT_DATE'), values.get('APPOINTMENT_TIME'), -1)
+            elif table == 'DENTIST':
+                self.dentists.pop(values.get('STAFFID'), None)
+                self.group_dentists()
+            elif table in CASCADING_TABLES:
+                self.loaded = False
+
+    def invalidate(self):
+        with self.lock:
+            if self.loading:
+                self.changed_while_loading = True
+            self.loaded = False
@@ -0,0 +1,151 @@
+import logging
+import threading
+from collections import namedtuple
+
+Column = namedtuple('Column', ['name', 'data_type', 'length', 'precision', 'scale', 'nullable'])
+ForeignKey = namedtuple('ForeignKey', ['name', 'columns', 'ref_table', 'ref_columns'])
+
+NUMERIC_TYPES = ('NUMBER', 'NUMERIC', 'INTEGER', 'FLOAT', 'REAL', 'DECIMAL')
+
+class TableMetadata:
+    """
+    Columns and key constraints of one table, as recorded in the data dictionary
+    """
+    def __init__(self, name, columns):
+        self.name = name
+        self.columns = columns
+        self.primary_key = []
+        self.foreign_keys = []
+        self.unique_constraints = []
+        # Optimizer statistics, None when the table was never analyzed
+        self.row_count = None
+        self.avg_row_len = None
+
+    @property
+    def column_names(self):
+        return [col.name for col in self.columns]
+
+    def column(self, name):
+        for col in self.columns:
+            if col.name == name.upper():
+                return col
+        return None
+
+    @property
+    def key_column(self):
+        """
+        Single-column primary key, falling back to the first column
+        """
+        if len(self.primary_key) == 1:
+            return self.primary_key[0]
+        return self.columns[0].name
+
+class SchemaCatalog:
+    """
+    Cache of table metadata read from the data dictionary, so the GUI and
+    the statement builders never have to probe a table to learn its shape.
+    """
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.tables = {}
+        self.fully_loaded = False
+        self.lock = threading.Lock()
+
+    def load_all(self):
+        """
+        Load metadata for every table in the schema with two queries
+        """
+        tables = self.read_tables()
+        with self.lock:
+            self.tables = tables
+            self.fully_loaded = True
+        logging.info(f"Schema catalog loaded ({len(tables)} tables)")
+        return tables
+
+    def get(self, table_name):
+        """
+        Metadata for a table (loaded on first use), or None if it does not exist
+        """
+        name = table_name.upper()
+        with self.lock:
+            if name in self.tables or self.fully_loaded:
+                return self.tables.get(name)
+
+        metadata = self.read_tables(name).get(name)
+        if metadata:
+            with self.lock:
+                self.tables[name] = metadata
+        return metadata
+
+    def cached(self, table_name):
+        """
+        Metadata for a table if it is already loaded; never reads the data dictionary
+        """
+        with self.lock:
+            return self.tables.get(table_name.upper())
+
+    def require(self, table_name):
+        metadata = self.get(table_name)
+        if metadata is None:
+            raise ValueError(f"Table {table_name} does not exist")
+        return metadata
+
+    def column_names(self, table_name):
+        return self.require(table_name).column_names
+
+    def primary_key(self, table_name):
+        return self.require(table_name).primary_key
+
+    def invalidate(self, table_name=None):
+        """
+        Forget cached metadata after DDL (all tables when no name is given)
+        """
+        with self.lock:
+            if table_name:
+                self.tables.pop(table_name.upper(), None)
+            else:
+                self.tables = {}
+            self.fully_loaded = False
+
+    def read_tables(self, table_name=None):
+        """
+        Read column and constraint metadata, for one table or all of them
+        """
+        # The dictionary queries differ per engine; the backend normalizes their rows
+        backend = self.db_manager.backend
+
+        tables = {}
+        for name, column_name, data_type, length, precision, scale, nullable in backend.read_columns(self.fetch, table_name):
+            if name not in tables:
+                tables[name] = TableMetadata(name, [])
+            tables[name].columns.append(
+                Column(column_name, data_type, length, precision, scale, nullable)
+            )
+
+        constraints = {}
+        for name, constraint_name, constraint_type, column_name, ref_table, ref_column in backend.read_constraints(self.fetch, table_name):
+            if name not in tables:
+                continue
+            entry = constraints.setdefault((name, constraint_name), [constraint_type, [], ref_table, []])
+            entry[1].append(column_name)
+            if ref_column:
+                entry[3].append(ref_column)
+
+        for (name, constraint_name), (constraint_type, columns, ref_table, ref_columns) in constraints.items():
+            metadata = tables[name]
+            if constraint_type == 'P':
+                metadata.primary_key = columns
+            elif constraint_type == 'R':
+                metadata.foreign_keys.append(ForeignKey(constraint_name, columns, ref_table, ref_columns))
+            else:
+                metadata.unique_constraints.append(columns)
+
+        for name, row_count, avg_row_len in backend.read_table_stats(self.fetch, table_name):
+            if name in tables:
+                tables[name].row_count = row_count
+                tables[name].avg_row_len = avg_row_len
+
+        return tables
+
+    def fetch(self, query, params=None):
+        return self.db_manager.fetch_many(query, params)
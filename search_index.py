@@ -0,0 +1,258 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from query_executor import current_token
+from schema_catalog import NUMERIC_TYPES
+from config import SEARCH_COLUMNS, SEARCH_RESULT_LIMIT
+
+def normalize(value):
+    return str(value).casefold() if value is not None else ''
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class TrigramIndex:
+    """
+    In-memory trigram index over the searchable text columns of one table.
+    Maps each three-character sequence to the keys of the rows containing it.
+    """
+    def __init__(self, table_name, key_column, columns, numeric_key=False):
+        self.table_name = table_name
+        self.key_column = key_column
+        self.columns = columns
+        self.numeric_key = numeric_key
+        self.postings = defaultdict(set)
+        # key -> casefolded field values, used to verify and rank candidates
+        self.documents = {}
+        self.lock = threading.Lock()
+
+    def key_of(self, value):
+        """
+        Keys typed in the GUI arrive as text; match them to the stored numbers
+        """
+        if self.numeric_key and isinstance(value, str):
+            try:
+                return int(value)
+            except ValueError:
+                return float(value)
+        return value
+
+    def add(self, key, values):
+        key = self.key_of(key)
+        fields = [normalize(value) for value in values]
+        with self.lock:
+            self.remove_locked(key)
+            self.documents[key] = fields
+            for field in fields:
+                for gram in trigrams(field):
+                    self.postings[gram].add(key)
+
+    def load(self, rows):
+        """
+        Bulk-add rows of (key, value, ...) while the index is being built
+        """
+        postings = self.postings
+        documents = self.documents
+        with self.lock:
+            for row in rows:
+                fields = [normalize(value) for value in row]
+                documents[row[0]] = fields
+                for field in fields:
+                    for gram in trigrams(field):
+                        postings[gram].add(row[0])
+
+    def remove(self, key):
+        key = self.key_of(key)
+        with self.lock:
+            self.remove_locked(key)
+
+    def remove_locked(self, key):
+        fields = self.documents.pop(key, None)
+        if fields is None:
+            return
+        for field in fields:
+            for gram in trigrams(field):
+                keys = self.postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.postings[gram]
+
+    def search(self, term, limit=SEARCH_RESULT_LIMIT):
+        """
+        Keys of rows containing term in any indexed column, best matches first:
+        whole-field matches, then word-prefix matches, then other substrings
+        """
+        term = normalize(term).strip()
+        if not term:
+            return []
+
+        with self.lock:
+            grams = trigrams(term)
+            if grams:
+                # Intersect the rarest posting lists first
+                posting_lists = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+                candidates = set(posting_lists[0])
+                for keys in posting_lists[1:]:
+                    candidates &= keys
+                    if not candidates:
+                        break
+            else:
+                # Terms shorter than a trigram are checked against every row
+                candidates = self.documents.keys()
+
+            ranked = []
+            for key in candidates:
+                rank = self.rank(self.documents[key], term)
+                if rank is not None:
+                    ranked.append((rank, key))
+
+        ranked.sort()
+        return [key for _, key in ranked[:limit]]
+
+    def rank(self, fields, term):
+        best = None
+        for column_position, field in enumerate(fields):
+            position = field.find(term)
+            if position < 0:
+                continue
+            if field == term:
+                kind = 0
+            elif position == 0 or not field[position - 1].isalnum():
+                kind = 1
+            else:
+                kind = 2
+            rank = (kind, position, column_position)
+            if best is None or rank < best:
+                best = rank
+        return best
+
+class SearchEngine:
+    """
+    Quick-search over the tables listed in SEARCH_COLUMNS. Indexes are built
+    once per table in the background and kept in sync by the GUI write paths.
+    """
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.indexes = {}
+        self.building = set()
+        # Tables written to or invalidated while their index was being built
+        self.changed_while_building = set()
+        self.lock = threading.Lock()
+
+    def searchable(self, table_name):
+        return table_name.upper() in {name.upper() for name in SEARCH_COLUMNS}
+
+    def index_columns(self, table_name):
+        metadata = self.db_manager.catalog.require(table_name)
+        configured = next(cols for name, cols in SEARCH_COLUMNS.items() if name.upper() == table_name.upper())
+        # The key column is indexed too so IDs can be searched
+        columns = [metadata.key_column] + [col.upper() for col in configured if col.upper() != metadata.key_column]
+        return metadata.key_column, columns
+
+    def get_index(self, table_name):
+        return self.indexes.get(table_name.upper())
+
+    def is_warm(self, table_name):
+        return self.get_index(table_name) is not None
+
+    def build(self, table_name):
+        """
+        Stream the indexed columns of a table into a fresh index and swap it in
+        """
+        name = table_name.upper()
+        with self.lock:
+            if name in self.building:
+                return None
+            self.building.add(name)
+            self.changed_while_building.discard(name)
+
+        try:
+            started = time.perf_counter()
+            token = current_token()
+            key_column, columns = self.index_columns(table_name)
+            key_type = self.db_manager.catalog.require(table_name).column(key_column).data_type
+            index = TrigramIndex(name, key_column, columns, numeric_key=key_type in NUMERIC_TYPES)
+
+            query = f"SELECT {', '.join(columns)} FROM {table_name}"
+            with self.db_manager.execute(query, table=table_name) as cursor:
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    index.load(rows)
+                    if token:
+                        token.check()
+
+            with self.lock:
+                if name in self.changed_while_building:
+                    # Rows written meanwhile may or may not be in it; the next search builds again
+                    logging.info(f"Search index for {table_name} discarded: the table changed while it was built")
+                    return None
+                self.indexes[name] = index
+            logging.info(
+                f"Search index for {table_name} built: {len(index.documents)} rows, "
+                f"{len(index.postings)} trigrams in {time.perf_counter() - started:.2f}s"
+            )
+            return index
+        finally:
+            with self.lock:
+                self.building.discard(name)
+
+    def search(self, table_name, term, limit=SEARCH_RESULT_LIMIT):
+        """
+        Ranked keys of matching rows, or None when the table has no warm index
+        """
+        index = self.get_index(table_name)
+        if index is None:
+            return None
+        return index.search(term, limit)
+
+    def record_saved(self, table_name, values, old_values=None):
+        """
+        Index an inserted or updated row (given the old row for an update);
+        values and old_values map column names to values
+        """
+        index = self.get_index(table_name)
+        if index is None:
+            self.note_change(table_name)
+            return
+        values = {col.upper(): value for col, value in values.items()}
+        if old_values:
+            # A changed primary key leaves the row's document under the old key
+            old_key = {col.upper(): value for col, value in old_values.items()}.get(index.key_column)
+            if old_key is not None and index.key_of(old_key) != index.key_of(values[index.key_column]):
+                index.remove(old_key)
+        index.add(values[index.key_column], [values.get(col) for col in index.columns])
+
+    def record_deleted(self, table_name, key):
+        index = self.get_index(table_name)
+        if index is not None:
+            index.remove(key)
+        else:
+            self.note_change(table_name)
+
+        # Rows cascading from the deleted one can no longer be patched in place
+        for name in list(self.indexes):
+            metadata = self.db_manager.catalog.get(name)
+            if metadata and any(fk.ref_table == table_name.upper() for fk in metadata.foreign_keys):
+                self.invalidate(name)
+
+    def invalidate(self, table_name=None):
+        """
+        Drop indexes after bulk changes; they are rebuilt on the next search
+        """
+        with self.lock:
+            if table_name:
+                self.indexes.pop(table_name.upper(), None)
+                if table_name.upper() in self.building:
+                    self.changed_while_building.add(table_name.upper())
+            else:
+                self.indexes.clear()
+                self.changed_while_building.update(self.building)
+
+    def note_change(self, table_name):
+        with self.lock:
+            if table_name.upper() in self.building:
+                self.changed_while_building.add(table_name.upper())
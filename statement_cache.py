@@ -0,0 +1,92 @@
+import logging
+import threading
+from collections import Counter, OrderedDict
+
+RECENT_STATEMENTS = 30
+
+class StatementCache:
+    """
+    Prepared-statement layer in front of the driver. SQL texts are translated
+    to the backend dialect once, and every execution is counted against a
+    model of the per-session client statement cache: a text the session has
+    not cached yet needs a hard parse, a cached one is a soft parse.
+    """
+    def __init__(self, backend, cache_size):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.translated = {}
+        # Per-session LRU of SQL texts, keyed by id(connection)
+        self.session_caches = {}
+        self.executions = Counter()
+        self.hard_parses = 0
+        self.soft_parses = 0
+        # Most recently executed distinct statements, newest last
+        self.recent = OrderedDict()
+        self.lock = threading.Lock()
+
+    def prepare(self, query):
+        """
+        SQL text to execute for query, in the backend's dialect
+        """
+        sql = self.translated.get(query)
+        if sql is None:
+            sql = self.backend.translate(query)
+            with self.lock:
+                # Only bind-variable SQL repeats, so the map stays small; reset it if not
+                if len(self.translated) >= self.cache_size * 20:
+                    self.translated.clear()
+                self.translated[query] = sql
+        return sql
+
+    def record(self, connection, sql):
+        """
+        Count one execution of sql on connection
+        """
+        with self.lock:
+            cache = self.session_caches.setdefault(id(connection), OrderedDict())
+            if sql in cache:
+                cache.move_to_end(sql)
+                self.soft_parses += 1
+            else:
+                cache[sql] = True
+                self.hard_parses += 1
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+            self.executions[sql] += 1
+            self.recent[sql] = True
+            self.recent.move_to_end(sql)
+            if len(self.recent) > RECENT_STATEMENTS:
+                self.recent.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            executions = sum(self.executions.values())
+            return {
+                'executions': executions,
+                'distinct_statements': len(self.executions),
+                'hard_parses': self.hard_parses,
+                'soft_parses': self.soft_parses,
+                'soft_parse_ratio': self.soft_parses / executions if executions else 0.0
+            }
+
+    def recent_statements(self):
+        """
+        Recently executed SQL texts, newest first
+        """
+        with self.lock:
+            return list(reversed(self.recent))
+
+    def top_statements(self, limit=10):
+        """
+        Most executed SQL texts as (count, sql)
+        """
+        with self.lock:
+            return [(count, sql) for sql, count in self.executions.most_common(limit)]
+
+    def log_stats(self):
+        stats = self.stats()
+        logging.info(
+            f"Statement cache: {stats['executions']} executions of {stats['distinct_statements']} "
+            f"distinct statements, {stats['hard_parses']} hard / {stats['soft_parses']} soft parses "
+            f"({stats['soft_parse_ratio']:.0%} soft)"
+        )
@@ -0,0 +1,622 @@
+import tkinter as tk
+from tkinter import ttk
+import logging
+import time
+from schema_catalog import NUMERIC_TYPES
+from result_store import ResultStore, OrderedRows
+from config import PAGE_SIZE, PREFETCH_THRESHOLD
+
+# Comparison operators accepted at the start of a column filter, longest first
+FILTER_OPERATORS = ['>=', '<=', '!=', '>', '<', '=']
+
+class PagedResult:
+    """
+    Keyset-paginated result for a table or a filtered query on it.
+    Rows are fetched one page at a time, ordered by the key column, and
+    kept in a columnar ResultStore once the first page has arrived.
+    """
+    # Loaded rows are in key order, so a key is found by binary search
+    key_ordered = True
+
+    def __init__(self, db_manager, table_name, where=None, params=None, page_size=PAGE_SIZE):
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.where = where
+        self.params = params or {}
+        self.page_size = page_size
+        self.key_column = None
+        self.key_index = 0
+        self.columns = []
+        self.rows = []
+        self.has_more = True
+        self.last_key = None
+        # Bumped on every change to the loaded rows, so derived views can tell they are stale
+        self.version = 0
+        self.memory_version = None
+        self.memory_per_row = 0.0
+
+    def row_id(self, row):
+        return str(row[self.key_index])
+
+    def get_row(self, item_id):
+        position = self.position_of(item_id)
+        return None if position is None else self.rows[position]
+
+    def key_position(self, key):
+        """
+        Position of the first loaded row with a key not below key
+        """
+        low, high = 0, len(self.rows)
+        while low < high:
+            middle = (low + high) // 2
+            if self.rows.value(middle, self.key_index) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def position_of(self, item_id):
+        """
+        Position of the loaded row with the given item id (the primary key as text), or None
+        """
+        if not self.rows:
+            return None
+        if self.key_ordered:
+            key = item_id
+            try:
+                if self.rows.column_types[self.key_index] == 'number':
+                    key = float(item_id) if '.' in item_id else int(item_id)
+                position = self.key_position(key)
+                if position < len(self.rows) and str(self.rows.value(position, self.key_index)) == item_id:
+                    return position
+            except (TypeError, ValueError):
+                # Keys not comparable as the declared type; fall back to a scan
+                pass
+        for position, key in enumerate(self.rows.column_values(self.key_index)):
+            if str(key) == item_id:
+                return position
+        return None
+
+    def fetch_next_page(self):
+        """
+        Fetch the page following the last loaded key
+        """
+        if self.key_column is None:
+            metadata = self.db_manager.catalog.get(self.table_name)
+            if metadata:
+                self.key_column = metadata.key_column
+        return self.db_manager.fetch_page(
+            self.table_name,
+            key_column=self.key_column,
+            after_key=self.last_key,
+            where=self.where,
+            params=self.params,
+            page_size=self.page_size
+        )
+
+    def append_page(self, columns, rows):
+        """
+        Add a fetched page to the loaded rows
+        """
+        if not self.columns:
+            self.columns = columns
+            if self.key_column not in columns:
+                # Unknown table metadata; the first column is the primary key by convention
+                self.key_column = columns[0]
+            self.key_index = columns.index(self.key_column)
+            self.rows = ResultStore(self.column_types())
+        self.rows.extend(rows)
+        self.version += 1
+        self.has_more = len(rows) >= self.page_size
+        if rows:
+            self.last_key = rows[-1][self.key_index]
+
+    def insert_row(self, row):
+        """
+        Add a newly created row at its key position. Returns False when the
+        row is not placed: filtered results cannot tell whether it matches,
+        and keys past the loaded range arrive with a later page.
+        """
+        if self.where is not None or not self.columns:
+            return False
+        key = row[self.key_index]
+        if self.has_more and (self.last_key is None or key > self.last_key):
+            return False
+        self.rows.insert(self.key_position(key), row)
+        self.version += 1
+        return True
+
+    def update_row(self, item_id, row):
+        """
+        Replace the loaded row with the given item id by its new version
+        """
+        position = self.position_of(item_id)
+        if position is None:
+            return False
+        if self.row_id(row) != item_id and self.where is None:
+            # The key changed, so the row moves to its new key position
+            del self.rows[position]
+            self.version += 1
+            return self.insert_row(row)
+        self.rows[position] = row
+        self.version += 1
+        return True
+
+    def remove_row(self, item_id):
+        position = self.position_of(item_id)
+        if position is None:
+            return False
+        del self.rows[position]
+        self.version += 1
+        return True
+
+    def bytes_per_row(self):
+        """
+        Approximate memory held per loaded row, recomputed when the rows change
+        """
+        if self.memory_version != self.version:
+            self.memory_per_row = self.rows.bytes_per_row() if self.rows else 0.0
+            self.memory_version = self.version
+        return self.memory_per_row
+
+    def column_types(self):
+        """
+        'number' or 'text' for each column, from the catalog's declared types
+        """
+        metadata = self.db_manager.catalog.cached(self.table_name)
+        types = []
+        for name in self.columns:
+            column = metadata.column(name) if metadata else None
+            types.append('number' if column and column.data_type in NUMERIC_TYPES else 'text')
+        return types
+
+    def load_next_page(self):
+        """
+        Fetch and append the next page; returns False if the query failed
+        """
+        page = self.fetch_next_page()
+        if page is None:
+            self.has_more = False
+            return False
+        self.append_page(*page)
+        return True
+
+class KeyedResult(PagedResult):
+    """
+    Rows for a ranked list of primary keys (such as search index matches),
+    loaded a page of keys at a time and shown in rank order
+    """
+    key_ordered = False
+    def __init__(self, db_manager, table_name, key_column, keys, page_size=PAGE_SIZE):
+        binds = {f"k{i+1}": key for i, key in enumerate(keys)}
+        # Used when the whole result is exported
+        where = f"{key_column} IN ({', '.join(':' + name for name in binds)})" if keys else "1 = 0"
+        super().__init__(db_manager, table_name, where=where, params=binds, page_size=page_size)
+        self.key_column = key_column
+        self.keys = keys
+        self.position = 0
+
+    def fetch_next_page(self):
+        chunk = self.keys[self.position:self.position + self.page_size]
+        return self.db_manager.fetch_by_keys(self.table_name, self.key_column, chunk)
+
+    def append_page(self, columns, rows):
+        super().append_page(columns, rows)
+        self.position += self.page_size
+        self.has_more = self.position < len(self.keys)
+
+def number_key(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        # NULLs and stray text sort before every number
+        return float('-inf')
+
+def text_key(value):
+    return '' if value is None else str(value).casefold()
+
+class ColumnStore:
+    """
+    Sort keys over the columns of a ResultStore. The key of every value is
+    computed once per column (numbers as floats, text case-folded), so any
+    sort or filter afterwards is plain list work with no database access.
+    """
+    def __init__(self, rows, column_types):
+        self.rows = rows
+        self.column_types = column_types
+        # Columns are extracted on first use; a sort usually touches one or two
+        self.columns = {}
+        self.keys = {}
+
+    def column(self, index):
+        values = self.columns.get(index)
+        if values is None:
+            values = self.columns[index] = self.rows.column_values(index)
+        return values
+
+    def sort_keys(self, index, kind=None):
+        """
+        Typed keys of one column; kind 'text' gives the text keys of a number column
+        """
+        kind = kind or self.column_types[index]
+        keys = self.keys.get((index, kind))
+        if keys is None:
+            values = self.column(index)
+            if kind == 'number':
+                keys = [number_key(value) for value in values]
+            else:
+                # Most values are already str; skip the conversion call for them
+                keys = [value.casefold() if value.__class__ is str else text_key(value) for value in values]
+            self.keys[(index, kind)] = keys
+        return keys
+
+    def matches(self, index, text):
+        """
+        Positions of the rows whose column value passes a filter: an operator
+        (>=, <=, !=, >, <, =) and a value compared by the column's type, or
+        otherwise a case-insensitive substring
+        """
+        text = text.strip()
+        operator = next((op for op in FILTER_OPERATORS if text.startswith(op)), None)
+        if operator is None:
+            needle = text.casefold()
+            return [position for position, key in enumerate(self.sort_keys(index, 'text')) if needle in key]
+
+        operand = text[len(operator):].strip()
+        keys = self.sort_keys(index)
+        operand = number_key(operand) if self.column_types[index] == 'number' else text_key(operand)
+        compare = {
+            '>=': lambda key: key >= operand,
+            '<=': lambda key: key <= operand,
+            '!=': lambda key: key != operand,
+            '>': lambda key: key > operand,
+            '<': lambda key: key < operand,
+            '=': lambda key: key == operand
+        }[operator]
+        return [position for position, key in enumerate(keys) if compare(key)]
+
+    def arrange(self, sort, filters):
+        """
+        Rows passing every filter ({column index: text}), stably sorted by the
+        [(column index, descending)] keys, most significant first. The rows
+        are read from the store as they are displayed.
+        """
+        order = range(len(self.rows))
+        for index, text in filters.items():
+            passing = set(self.matches(index, text))
+            order = [position for position in order if position in passing]
+        order = list(order)
+        # One stable sort per key, least significant first
+        for index, descending in reversed(sort):
+            order.sort(key=self.sort_keys(index).__getitem__, reverse=descending)
+        return OrderedRows(self.rows, order)
+
+class ResultView:
+    """
+    Client-side sort and filter over the rows a PagedResult has loaded.
+    The column store is rebuilt only when the loaded rows change.
+    """
+    def __init__(self, result):
+        self.result = result
+        # [(column name, descending)], most significant first
+        self.sort = []
+        self.filters = {}
+        self.store = None
+        self.store_version = None
+        self.arranged = None
+
+    @property
+    def active(self):
+        return bool(self.sort or self.filters)
+
+    def toggle_sort(self, column, add=False):
+        """
+        Cycle a column through ascending, descending and unsorted. With add
+        it is cycled as one more key; otherwise it becomes the only key.
+        """
+        keys = self.sort if add else [(name, descending) for name, descending in self.sort if name == column]
+        current = dict(keys)
+        if column not in current:
+            keys = keys + [(column, False)]
+        elif not current[column]:
+            keys = [(name, descending or name == column) for name, descending in keys]
+        else:
+            keys = [(name, descending) for name, descending in keys if name != column]
+        self.sort = keys
+        self.arranged = None
+
+    def set_filter(self, column, text):
+        if text and text.strip():
+            self.filters[column] = text
+        else:
+            self.filters.pop(column, None)
+        self.arranged = None
+
+    def clear(self):
+        self.sort = []
+        self.filters = {}
+        self.arranged = None
+
+    def rows(self):
+        """
+        Loaded rows in view order
+        """
+        if not self.active:
+            return self.result.rows
+        if self.store_version != self.result.version:
+            started = time.perf_counter()
+            self.store = ColumnStore(self.result.rows, self.result.column_types())
+            self.store_version = self.result.version
+            self.arranged = None
+            logging.debug(f"Column store of {len(self.store.rows)} rows built in {time.perf_counter() - started:.3f}s")
+        if self.arranged is None:
+            columns = self.result.columns
+            sort = [(columns.index(name), descending) for name, descending in self.sort if name in columns]
+            filters = {columns.index(name): text for name, text in self.filters.items() if name in columns}
+            self.arranged = self.store.arrange(sort, filters)
+        return self.arranged
+
+    def heading(self, column):
+        """
+        Heading text showing the column's sort direction, rank and filter
+        """
+        text = column
+        names = [name for name, _ in self.sort]
+        if column in names:
+            descending = dict(self.sort)[column]
+            text += ' \u25bc' if descending else ' \u25b2'
+            if len(names) > 1:
+                text += str(names.index(column) + 1)
+        if column in self.filters:
+            text += f" [{self.filters[column]}]"
+        return text
+
+class VirtualTreeview:
+    """
+    Renders only the visible window of a result into a ttk.Treeview,
+    so the number of Tk items stays bounded however many rows are loaded.
+    """
+    def __init__(self, tree, scrollbar, on_need_more=None, on_filter_request=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.on_need_more = on_need_more
+        # Called with a column name when its heading is right-clicked
+        self.on_filter_request = on_filter_request
+        self.result = None
+        # Client-side sort and filter of the loaded rows
+        self.view = None
+        self.start = 0
+        self.visible_count = 25
+        self.row_height = 20
+
+        # The scrollbar drives the window position instead of the Treeview itself
+        self.scrollbar.configure(command=self.yview)
+        self.tree.configure(yscrollcommand='')
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<Up>', lambda event: self.on_arrow_key(-1))
+        self.tree.bind('<Down>', lambda event: self.on_arrow_key(1))
+        self.tree.bind('<Prior>', lambda event: self.scroll(-self.visible_count) or 'break')
+        self.tree.bind('<Next>', lambda event: self.scroll(self.visible_count) or 'break')
+        # Heading clicks sort (Shift adds a key); right-clicks ask for a filter
+        self.tree.bind('<ButtonRelease-1>', self.on_heading_click)
+        self.tree.bind('<Button-3>', self.on_heading_menu)
+        self.tree.bind('<Button-2>', self.on_heading_menu)
+
+    def set_result(self, result):
+        """
+        Show a new result, configuring the columns from its metadata
+        """
+        self.result = result
+        self.view = ResultView(result)
+        self.start = 0
+        self.tree['columns'] = result.columns
+        self.tree['show'] = 'headings'
+        for col in result.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        self.render()
+
+    def clear(self):
+        """
+        Remove all rows from the view
+        """
+        self.result = None
+        self.view = None
+        self.start = 0
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.scrollbar.set(0, 1)
+
+    def rows(self):
+        """
+        Loaded rows in display order
+        """
+        if not self.result:
+            return []
+        return self.view.rows()
+
+    def row_count(self):
+        return len(self.rows())
+
+    def has_more(self):
+        # A sorted or filtered view covers the loaded rows only
+        return self.result.has_more and not self.view.active
+
+    def sort_by(self, column, add=False):
+        """
+        Toggle sorting of the loaded rows by a column
+        """
+        if not self.result or column not in self.result.columns:
+            return
+        started = time.perf_counter()
+        self.view.toggle_sort(column, add)
+        self.start = 0
+        self.update_headings()
+        self.render()
+        logging.info(f"Sorted {self.row_count()} rows by {self.view.sort} in {time.perf_counter() - started:.3f}s")
+
+    def filter_by(self, column, text):
+        """
+        Keep only the loaded rows whose column matches text (empty text removes the filter)
+        """
+        if not self.result or column not in self.result.columns:
+            return
+        self.view.set_filter(column, text)
+        self.start = 0
+        self.update_headings()
+        self.render()
+
+    def clear_view(self):
+        if self.view and self.view.active:
+            self.view.clear()
+            self.start = 0
+            self.update_headings()
+            self.render()
+
+    def update_headings(self):
+        for col in self.result.columns:
+            self.tree.heading(col, text=self.view.heading(col))
+
+    def heading_column(self, event):
+        """
+        Column whose heading is under the pointer, or None
+        """
+        if not self.result or self.tree.identify_region(event.x, event.y) != 'heading':
+            return None
+        column = self.tree.identify_column(event.x)
+        try:
+            return self.result.columns[int(column.lstrip('#')) - 1]
+        except (ValueError, IndexError):
+            return None
+
+    def on_heading_click(self, event):
+        column = self.heading_column(event)
+        if column:
+            # State bit 0 is Shift
+            self.sort_by(column, add=bool(event.state & 0x0001))
+
+    def on_heading_menu(self, event):
+        column = self.heading_column(event)
+        if column and self.on_filter_request:
+            self.on_filter_request(column)
+
+    def item_id(self, row):
+        # Rows are keyed by their primary key so selection survives scrolling
+        return self.result.row_id(row)
+
+    def selected_row(self):
+        """
+        Loaded row of the first selected item, or None
+        """
+        selection = self.tree.selection()
+        if not selection or not self.result:
+            return None
+        return self.result.get_row(selection[0])
+
+    def render(self):
+        """
+        Sync the Tk items with the rows inside the current window
+        """
+        if not self.result:
+            return
+
+        rows = self.rows()
+        self.start = max(0, min(self.start, len(rows) - self.visible_count))
+        end = min(len(rows), self.start + self.visible_count)
+        window = rows[self.start:end]
+        wanted = [self.item_id(row) for row in window]
+
+        # Drop items that scrolled out of the window
+        wanted_ids = set(wanted)
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted_ids]
+        if stale:
+            self.tree.delete(*stale)
+
+        for position, (iid, row) in enumerate(zip(wanted, window)):
+            if self.tree.exists(iid):
+                self.tree.move(iid, '', position)
+                self.tree.item(iid, values=row)
+            else:
+                self.tree.insert('', position, iid=iid, values=row)
+
+        self.update_scrollbar(end)
+
+        # Load ahead before the user reaches the last loaded row
+        if self.has_more() and end >= len(rows) - PREFETCH_THRESHOLD and self.on_need_more:
+            self.tree.after_idle(self.on_need_more)
+
+    def update_scrollbar(self, end):
+        total = self.row_count()
+        if self.result and self.has_more():
+            # Leave room for rows that have not been fetched yet
+            total += self.result.page_size
+        if total == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.start / total, end / total)
+
+    def yview(self, *args):
+        """
+        Scrollbar command handler ('moveto' fraction or 'scroll' n units/pages)
+        """
+        if not self.result or not args:
+            return
+        if args[0] == 'moveto':
+            total = self.row_count()
+            if self.has_more():
+                total += self.result.page_size
+            self.start = int(float(args[1]) * total)
+            self.render()
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self.visible_count
+            self.scroll(amount)
+
+    def scroll(self, amount):
+        if not self.result:
+            return
+        self.start += amount
+        self.render()
+
+    def on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return 'break'
+
+    def on_arrow_key(self, direction):
+        """
+        Scroll the window when keyboard navigation reaches its edge
+        """
+        children = self.tree.get_children()
+        focus = self.tree.focus()
+        if not children or not focus:
+            return None
+        edge = children[-1] if direction > 0 else children[0]
+        if focus != edge:
+            return None
+
+        self.scroll(direction)
+        children = self.tree.get_children()
+        if children:
+            edge = children[-1] if direction > 0 else children[0]
+            self.tree.selection_set(edge)
+            self.tree.focus(edge)
+        return 'break'
+
+    def on_resize(self, event):
+        try:
+            style_height = ttk.Style().lookup('Treeview', 'rowheight')
+            self.row_height = int(style_height) if style_height else self.row_height
+        except (tk.TclError, ValueError):
+            pass
+        # One row's worth of height is taken by the column headings
+        visible_count = max(1, event.height // self.row_height - 1)
+        if visible_count != self.visible_count:
+            self.visible_count = visible_count
+            logging.debug(f"Table view shows {visible_count} rows")
+            self.render()
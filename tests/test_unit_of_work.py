@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+import config
+from data_generator import DataGenerator
+from database import DatabaseManager
+from unit_of_work import UnitOfWork
+
+class UnitOfWorkOrderTest(unittest.TestCase):
+    """
+    Held changes against a small generated SQLite database
+    """
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.saved_config = dict(config.DB_CONFIG)
+        config.DB_CONFIG.clear()
+        config.DB_CONFIG.update({'backend': 'sqlite', 'path': os.path.join(self.workdir.name, 'test.db')})
+        self.db_manager = DatabaseManager()
+        self.session = self.db_manager.session()
+        self.session.__enter__()
+        self.db_manager.create_tables()
+        DataGenerator(50, 42).populate(self.db_manager)
+        self.db_manager.catalog.load_all()
+
+    def tearDown(self):
+        self.session.__exit__(None, None, None)
+        self.db_manager.close()
+        config.DB_CONFIG.clear()
+        config.DB_CONFIG.update(self.saved_config)
+        self.workdir.cleanup()
+
+    def rows(self, table, patient_id):
+        columns = self.db_manager.catalog.column_names(table)
+        rows = self.db_manager.fetch_many(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE PatientID = :patient_id", {'patient_id': patient_id}
+        )
+        return columns, [dict(zip(columns, row)) for row in rows]
+
+    def test_parent_delete_after_update_runs_after_child_deletes(self):
+        patient_id = self.db_manager.fetch_one(
+            "SELECT PatientID FROM Billing GROUP BY PatientID ORDER BY COUNT(*) DESC, PatientID"
+        )[0]
+        columns, [patient] = self.rows('Patient', patient_id)
+        changes = UnitOfWork(self.db_manager)
+
+        # Edit the patient, delete its bills and appointments, then the patient itself
+        edited = dict(patient, NAME='Edited Patient')
+        changes.register_update('Patient', 'PATIENTID', patient_id, columns, [edited[col] for col in columns], patient)
+        for table, key_column in (('Billing', 'BILLINGID'), ('Appointment', 'APPOINTMENTID')):
+            for row in self.rows(table, patient_id)[1]:
+                changes.register_delete(table, key_column, row[key_column], row)
+        changes.register_delete('Patient', 'PATIENTID', patient_id, patient)
+
+        self.assertEqual([change.table for change in changes.changes][-1], 'Patient')
+        changes.flush()
+        self.assertEqual(len(changes), 0)
+        for table in ('Patient', 'Billing', 'Appointment'):
+            self.assertEqual(self.rows(table, patient_id)[1], [])
+
+if __name__ == '__main__':
+    unittest.main()
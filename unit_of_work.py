@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+from config import PAGE_SIZE
+
+class PendingChange:
+    """
+    A queued insert, update or delete of one row. key is the primary key the
+    row has in the database before the change (None for an insert); columns
+    and values are the full new row, and old_values the row as it was loaded.
+    """
+    __slots__ = ('kind', 'table', 'key_column', 'key', 'columns', 'values', 'old_values')
+
+    def __init__(self, kind, table, key_column, key=None, columns=None, values=None, old_values=None):
+        self.kind = kind
+        self.table = table
+        self.key_column = key_column
+        self.key = key
+        self.columns = columns
+        self.values = values
+        self.old_values = old_values
+
+    @property
+    def new_key(self):
+        """
+        The row's primary key once the change is written
+        """
+        if self.values is None:
+            return self.key
+        return self.values[self.columns.index(self.key_column)]
+
+    def statement(self):
+        """
+        (SQL, binds) for the change; changes of one kind to one table share the SQL text
+        """
+        if self.kind == 'insert':
+            placeholders = ', '.join(f":{i+1}" for i in range(len(self.columns)))
+            return f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({placeholders})", list(self.values)
+        if self.kind == 'update':
+            # Every column is set, the key included, so edits to different columns batch together
+            assignments = ', '.join(f"{col} = :{i+1}" for i, col in enumerate(self.columns))
+            return (
+                f"UPDATE {self.table} SET {assignments} WHERE {self.key_column} = :{len(self.columns) + 1}",
+                list(self.values) + [self.key]
+            )
+        return f"DELETE FROM {self.table} WHERE {self.key_column} = :1", [self.key]
+
+class UnitOfWork:
+    """
+    Inserts, updates and deletes from the GUI, queued until flush(). Nothing
+    reaches the database (or locks a row) before then. Repeated changes to
+    one row are merged as they are queued; flush() sends each run of changes
+    sharing a statement as one executemany and commits them all together,
+    or rolls all of them back.
+    """
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.changes = []
+        # Pending change of each row, by (table, primary key as text): the key
+        # the row has in the database, or for inserts the key it will have
+        self.by_row = {}
+        self.flushing = False
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.changes)
+
+    def row_key(self, table, key):
+        return table.upper(), str(key)
+
+    def pending(self, table, key):
+        """
+        The pending change to a row, by the key it has in the database (or
+        will have, for a pending insert), or None
+        """
+        return self.by_row.get(self.row_key(table, key))
+
+    def pending_values(self, table, key):
+        """
+        The new values queued for a row, or None if it has no pending insert or update
+        """
+        change = self.pending(table, key)
+        if change is None or change.values is None:
+            return None
+        return dict(zip(change.columns, change.values))
+
+    def check_idle(self):
+        if self.flushing:
+            raise ValueError("Pending changes are being saved; try again when they are done")
+
+    def register_insert(self, table, key_column, columns, values):
+        with self.lock:
+            self.check_idle()
+            change = PendingChange('insert', table, key_column, columns=list(columns), values=list(values))
+            existing = self.pending(table, change.new_key)
+            if existing is not None and existing.kind != 'delete':
+                raise ValueError(f"{table} row {change.new_key} already has pending changes")
+            self.changes.append(change)
+            self.by_row[self.row_key(table, change.new_key)] = change
+
+    def register_update(self, table, key_column, key, columns, values, old_values=None):
+        with self.lock:
+            self.check_idle()
+            existing = self.pending(table, key)
+            if existing is not None and existing.kind == 'delete':
+                raise ValueError(f"{table} row {key} is already marked for deletion")
+            if existing is None:
+                existing = PendingChange('update', table, key_column, key=key, old_values=old_values)
+                self.changes.append(existing)
+                self.by_row[self.row_key(table, key)] = existing
+            existing.columns = list(columns)
+            existing.values = list(values)
+            if existing.kind == 'insert':
+                # A pending insert inserts the new values, under its new key; an
+                # update stays filed under the key the row has in the database
+                del self.by_row[self.row_key(table, key)]
+                self.by_row[self.row_key(table, existing.new_key)] = existing
+
+    def register_delete(self, table, key_column, key, old_values=None):
+        with self.lock:
+            self.check_idle()
+            existing = self.pending(table, key)
+            if existing is not None and existing.kind == 'delete':
+                raise ValueError(f"{table} row {key} is already marked for deletion")
+            if existing is not None:
+                if existing.kind == 'insert':
+                    # Never written, so there is nothing to delete
+                    del self.by_row[self.row_key(table, key)]
+                    self.changes.remove(existing)
+                    return
+                # The update is dropped; the delete targets the row as the database
+                # has it, queued last so it runs after deletes of the rows referencing it
+                self.changes.remove(existing)
+                key, old_values = existing.key, existing.old_values or old_values
+            change = PendingChange('delete', table, key_column, key=key, old_values=old_values)
+            self.changes.append(change)
+            self.by_row[self.row_key(table, key)] = change
+
+    def discard(self):
+        with self.lock:
+            self.check_idle()
+            self.changes = []
+            self.by_row = {}
+
+    def batches(self, changes):
+        """
+        [(kind, table, SQL, changes, binds)] for runs of consecutive changes
+        sharing a statement; keeping the queued order keeps parent rows
+        inserted before, and deleted after, the rows referencing them
+        """
+        batches = []
+        for change in changes:
+            sql, binds = change.statement()
+            if batches and batches[-1][2] == sql:
+                batches[-1][3].append(change)
+                batches[-1][4].append(binds)
+            else:
+                batches.append((change.kind, change.table, sql, [change], [binds]))
+        return batches
+
+    def start_flush(self):
+        """
+        Claim the pending changes for a flush(started=True) handed to a
+        worker: until it is done, queueing changes or starting another flush
+        raises ValueError
+        """
+        with self.lock:
+            self.check_idle()
+            self.flushing = True
+
+    def end_flush(self):
+        """
+        Release a claim whose flush never ran, e.g. because no session could be had
+        """
+        self.flushing = False
+
+    def flush(self, started=False):
+        """
+        Write every pending change in one transaction on the current session.
+        Returns [(change, row)] in queued order, row being the inserted or
+        updated row read back after the commit (None for deletes and rows
+        that could not be read). On failure all of it is rolled back, the
+        changes stay pending and the error is raised.
+        """
+        if not started:
+            self.start_flush()
+        with self.lock:
+            changes = list(self.changes)
+        try:
+            if not changes:
+                return []
+            began = time.perf_counter()
+            batches = self.batches(changes)
+            with self.db_manager.transaction():
+                for kind, table, sql, batch, binds in batches:
+                    affected = self.db_manager.execute_many(sql, binds)
+                    if kind != 'insert' and 0 <= affected < len(binds):
+                        raise RuntimeError(
+                            f"{len(binds) - affected} of the {len(binds)} {table} rows to {kind} "
+                            f"no longer exist; nothing was saved"
+                        )
+            flushed = set(map(id, changes))
+            with self.lock:
+                del self.changes[:len(changes)]
+                self.by_row = {key: change for key, change in self.by_row.items() if id(change) not in flushed}
+        finally:
+            self.end_flush()
+
+        logging.info(f"Committed {len(changes)} changes in {len(batches)} batches in {time.perf_counter() - began:.2f}s")
+        outcome = self.read_back(changes)
+        for change, row in outcome:
+            # Keep the search indexes and patient summaries in step with the commit
+            if change.kind == 'delete':
+                if change.old_values:
+                    self.db_manager.record_deleted(change.table, change.old_values)
+            elif row is not None:
+                self.db_manager.record_saved(change.table, dict(zip(row[0], row[1])), change.old_values)
+        return [(change, row[1] if row else None) for change, row in outcome]
+
+    def read_back(self, changes):
+        """
+        [(change, (columns, row))] with the inserted and updated rows as
+        stored, read with one query per table and page of keys
+        """
+        keys_by_table = {}
+        for change in changes:
+            if change.kind != 'delete':
+                keys_by_table.setdefault(change.table, (change.key_column, []))[1].append(change.new_key)
+
+        stored = {}
+        for table, (key_column, keys) in keys_by_table.items():
+            for start in range(0, len(keys), PAGE_SIZE):
+                page = self.db_manager.fetch_by_keys(table, key_column, keys[start:start + PAGE_SIZE])
+                if not page:
+                    continue
+                columns, rows = page
+                key_index = columns.index(key_column)
+                for row in rows:
+                    stored[self.row_key(table, row[key_index])] = (columns, row)
+
+        return [
+            (change, None if change.kind == 'delete' else stored.get(self.row_key(change.table, change.new_key)))
+            for change in changes
+        ]
@@ -1,122 +1,145 @@
-import re
-import logging
-from datetime import datetime
-
-class Validator:
-    @staticmethod
-    def validate_email(email):
-        """
-        Validate email format
-        """
-        email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(email_regex, email) is not None
-
-    @staticmethod
-    def validate_phone(phone):
-        """
-        Validate phone number format
-        """
-        phone_regex = r'^\+?1?\d{10,14}$'
-        return re.match(phone_regex, phone) is not None
-
-    @staticmethod
-    def validate_date(date_string):
-        """
-        Validate date format
-        """
-        try:
-            datetime.strptime(date_string, '%Y-%m-%d')
-            return True
-        except ValueError:
-            return False
-
-class Logger:
-    @staticmethod
-    def log_action(action, details=None):
-        """
-        Log application actions
-        """
-        log_message = f"Action: {action}"
-        if details:
-            log_message += f" - Details: {details}"
-        logging.info(log_message)
-
-class ReportGenerator:
-    @staticmethod
-    def generate_patient_report(db_manager):
-        """
-        Generate a comprehensive patient report
-        """
-        try:
-            query = """
-            SELECT 
-                p.PatientID, 
-                p.Name, 
-                COUNT(a.AppointmentID) as Total_Appointments,
-                SUM(t.Cost) as Total_Treatment_Cost
-            FROM 
-                Patient p
-            LEFT JOIN 
-                Appointment a ON p.PatientID = a.PatientID
-            LEFT JOIN 
-                Treatment t ON a.AppointmentID = t.AppointmentID
-            GROUP BY 
-                p.PatientID, p.Name
-            ORDER BY 
-                Total_Appointments DESC
-            """
-            
-            cursor = db_manager.execute_query(query)
-            if cursor:
-                return cursor.fetchall()
-            return []
-        except Exception as e:
-            logging.error(f"Error generating patient report: {e}")
-            return []
-
-class DataFormatter:
-    @staticmethod
-    def format_currency(amount):
-        """
-        Format numeric value as currency
-        """
-        return f"${amount:,.2f}"
-
-    @staticmethod
-    def format_date(date):
-        """
-        Format date to a readable string
-        """
-        if isinstance(date, datetime):
-            return date.strftime('%Y-%m-%d')
-        return str(date)
-
-class ConfigurationManager:
-    @staticmethod
-    def load_configuration():
-        """
-        Load application configuration
-        """
-        # In a real-world scenario, this might load from a config file
-        return {
-            'database': {
-                'host': 'oracle.scs.ryerson.ca',
-                'port': 1521,
-                'sid': 'orcl'
-            },
-            'logging': {
-                'level': logging.INFO,
-                'file': 'dental_clinic.log'
-            }
-        }
-
-def singleton(cls):
-    """
-    ensure only one instance of a class
-    """
-    instances = {}
-    def get_instance(*args, **kwargs):
-        if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
-        return instances[cls]
-    return get_instance
+import re
+import logging
+from datetime import date, datetime
+
+class Validator:
+    # Compiled once; the batch methods apply them to whole columns
+    EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+    PHONE_PATTERN = re.compile(r'^\+?1?\d{10,14}$')
+    # Separators allowed in phone numbers, removed before checking the digits
+    PHONE_SEPARATORS = str.maketrans('', '', ' \t\r\n().-')
+    # YYYY-MM-DD, as strptime's %Y-%m-%d reads it
+    DATE_PATTERN = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+
+    @staticmethod
+    def validate_email(email):
+        """
+        Validate email format
+        """
+        return Validator.EMAIL_PATTERN.match(email) is not None
+
+    @staticmethod
+    def validate_phone(phone):
+        """
+        Validate phone number format (separators such as dashes and spaces are allowed)
+        """
+        # One rule for single values and whole columns
+        return not Validator.invalid_phones([phone])
+
+    @staticmethod
+    def validate_date(date_string):
+        """
+        Validate date format
+        """
+        return not Validator.invalid_dates([date_string])
+
+    @staticmethod
+    def invalid_emails(values):
+        """
+        Positions of the values that are not valid email addresses (None is skipped)
+        """
+        match = Validator.EMAIL_PATTERN.match
+        return [i for i, value in enumerate(values) if value is not None and match(value) is None]
+
+    @staticmethod
+    def invalid_phones(values):
+        """
+        Positions of the values that are not valid phone numbers once separators are removed
+        """
+        match, separators = Validator.PHONE_PATTERN.match, Validator.PHONE_SEPARATORS
+        return [i for i, value in enumerate(values) if value is not None and match(value.translate(separators)) is None]
+
+    @staticmethod
+    def invalid_dates(values):
+        """
+        Positions of the values that are not YYYY-MM-DD dates
+        """
+        match = Validator.DATE_PATTERN.match
+        # The pattern rules out most bad values; only its matches need a calendar check
+        invalid = []
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            found = match(value)
+            if found is None:
+                invalid.append(i)
+                continue
+            year, month, day = found.groups()
+            # Every month has 28 days; year 0 does not exist
+            if not (year != '0000' and '01' <= month.zfill(2) <= '12' and '01' <= day.zfill(2) <= '28'):
+                try:
+                    date(int(year), int(month), int(day))
+                except ValueError:
+                    invalid.append(i)
+        return invalid
+
+class Logger:
+    @staticmethod
+    def log_action(action, details=None, latency_ms=None):
+        """
+        Log application actions
+        """
+        log_message = f"Action: {action}"
+        if details:
+            log_message += f" - Details: {details}"
+        logging.info(log_message, extra={'action': action, 'latency_ms': latency_ms})
+
+class ReportGenerator:
+    @staticmethod
+    def generate_patient_report(db_manager):
+        """
+        Generate a comprehensive patient report from the pre-aggregated
+        patient summaries (rebuilt first if they are stale)
+        """
+        try:
+            return db_manager.summaries.report()
+        except Exception as e:
+            logging.error(f"Error generating patient report: {e}")
+            return []
+
+class DataFormatter:
+    @staticmethod
+    def format_currency(amount):
+        """
+        Format numeric value as currency
+        """
+        return f"${amount:,.2f}"
+
+    @staticmethod
+    def format_date(date):
+        """
+        Format date to a readable string
+        """
+        if isinstance(date, datetime):
+            return date.strftime('%Y-%m-%d')
+        return str(date)
+
+class ConfigurationManager:
+    @staticmethod
+    def load_configuration():
+        """
+        Load application configuration
+        """
+        # In a real-world scenario, this might load from a config file
+        return {
+            'database': {
+                'host': 'oracle.scs.ryerson.ca',
+                'port': 1521,
+                'sid': 'orcl'
+            },
+            'logging': {
+                'level': logging.INFO,
+                'file': 'dental_clinic.log'
+            }
+        }
+
+def singleton(cls):
+    """
+    ensure only one instance of a class
+    """
+    instances = {}
+    def get_instance(*args, **kwargs):
+        if cls not in instances:
+            instances[cls] = cls(*args, **kwargs)
+        return instances[cls]
+    return get_instance